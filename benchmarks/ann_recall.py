@@ -0,0 +1,99 @@
+"""Benchmark of IVF recall@k and latency against exact NumPy search.
+
+Usage:
+    uv run python -m benchmarks.ann_recall --rows 200000 --n-probe 4 \
+        --n-probe 8 --n-probe 16
+"""
+
+import statistics
+import time
+from typing import Annotated
+
+import numpy as np
+import typer
+from langchain_core.embeddings import DeterministicFakeEmbedding
+from rich import print
+from rich.table import Table
+
+from movie_recommender.ivf_vectorstore import IVFVectorStore
+from movie_recommender.numpy_vectorstore import NumpyVectorStore
+
+
+def clustered_vectors(
+    rows: int, dim: int, clusters: int, rng: np.random.Generator
+) -> np.ndarray:
+    """Generate vectors around random centers, like topic-clustered overviews."""
+    centers = rng.normal(size=(clusters, dim)).astype(np.float32)
+    noise = rng.normal(scale=0.5, size=(rows, dim)).astype(np.float32)
+    return centers[rng.integers(0, clusters, rows)] + noise
+
+
+def run_queries(
+    store: NumpyVectorStore, queries: np.ndarray, k: int
+) -> tuple[list[set[str]], list[float]]:
+    """Return the result ids and latencies in milliseconds of every query."""
+    results, latencies = [], []
+    for query in queries:
+        start = time.perf_counter()
+        docs = store.similarity_search_by_vector(query, k=k)
+        latencies.append(1000 * (time.perf_counter() - start))
+        results.append({doc.id for doc in docs})
+    return results, latencies
+
+
+def latency_percentiles(latencies: list[float]) -> tuple[str, str]:
+    """Format the p50 and p95 of latencies in milliseconds for a table row."""
+    p50, p95 = np.percentile(latencies, [50, 95])
+    return f"{p50:.2f}", f"{p95:.2f}"
+
+
+def main(
+    rows: Annotated[int, typer.Option(help="Number of indexed vectors.")] = 100_000,
+    dim: Annotated[int, typer.Option(help="Vector dimension.")] = 384,
+    queries: Annotated[int, typer.Option(help="Number of queries.")] = 200,
+    k: Annotated[int, typer.Option(help="Neighbours per query.")] = 10,
+    n_lists: Annotated[int, typer.Option(help="IVF lists (0 for auto).")] = 0,
+    n_probe: Annotated[
+        list[int] | None, typer.Option(help="n_probe values to benchmark.")
+    ] = None,
+) -> None:
+    """Print recall@k and p50/p95 latency of IVF search per n_probe."""
+    n_probe = n_probe or [1, 4, 8, 16, 32]
+    rng = np.random.default_rng(0)
+    vectors = clustered_vectors(rows, dim, clusters=max(1, rows // 500), rng=rng)
+    # Queries land near indexed movies, like paraphrases of known overviews.
+    query_vectors = vectors[rng.choice(rows, queries)] + rng.normal(
+        scale=0.5, size=(queries, dim)
+    ).astype(np.float32)
+    texts = [str(i) for i in range(rows)]
+    embedding = DeterministicFakeEmbedding(size=dim)
+
+    exact = NumpyVectorStore(embedding=embedding)
+    exact.add_embeddings(texts, vectors, ids=texts)
+    ivf = IVFVectorStore(embedding=embedding, n_lists=n_lists or None)
+    ivf.add_embeddings(texts, vectors, ids=texts)
+    start = time.perf_counter()
+    ivf.build_index()
+    build_seconds = time.perf_counter() - start
+
+    truth, latencies = run_queries(exact, query_vectors, k)
+    table = Table(
+        title=f"recall@{k} on {rows} x {dim} vectors (IVF build {build_seconds:.1f}s)"
+    )
+    for column in ("search", f"recall@{k}", "p50 ms", "p95 ms"):
+        table.add_column(column, justify="right")
+    table.add_row("exact", "1.000", *latency_percentiles(latencies))
+    for probes in n_probe:
+        ivf.n_probe = probes
+        found, latencies = run_queries(ivf, query_vectors, k)
+        recall = statistics.mean(
+            len(f & t) / len(t) for f, t in zip(found, truth, strict=True)
+        )
+        table.add_row(
+            f"ivf n_probe={probes}", f"{recall:.3f}", *latency_percentiles(latencies)
+        )
+    print(table)
+
+
+if __name__ == "__main__":
+    typer.run(main)
@@ -0,0 +1,90 @@
+"""Benchmark of the embedding backends: parity, query latency and throughput.
+
+Every backend is compared against the full-precision "torch" model on the
+benchmark queries and synthetic overviews. The ONNX backends need the ``onnx``
+extra: ``uv sync --extra onnx``.
+
+Usage:
+    uv run python -m benchmarks.embedding_backends --backend torch \
+        --backend onnx --backend onnx-int8 --documents 2048
+"""
+
+import time
+from typing import Annotated
+
+import numpy as np
+import typer
+from rich import print
+from rich.table import Table
+
+from benchmarks.hybrid_retrieval import QUERIES
+from benchmarks.parallel_embeddings import measure, synthetic_overviews
+from movie_recommender import config
+from movie_recommender.embedding_backends import BACKENDS, check_parity
+from movie_recommender.vectorstore import get_embeddings
+
+
+def main(
+    backend: Annotated[
+        list[str] | None, typer.Option(help=f"Backends to compare: {BACKENDS}.")
+    ] = None,
+    documents: Annotated[
+        int, typer.Option(help="Overviews embedded for throughput.")
+    ] = 2048,
+    batch_size: Annotated[
+        int, typer.Option(help="Documents per batch.")
+    ] = config.INDEX_BATCH_SIZE,
+    rounds: Annotated[int, typer.Option(help="Repetitions of the query set.")] = 5,
+    threshold: Annotated[
+        float, typer.Option(help="Minimum cosine agreement with torch.")
+    ] = 0.99,
+) -> None:
+    """Print load time, parity with torch, query latency and docs/s per backend."""
+    queries = [query for query, _ in QUERIES]
+    overviews = synthetic_overviews(documents)
+    baseline = get_embeddings(use_cache=False, backend="torch")
+
+    table = Table(title=f"{config.EMBEDDING_MODEL} on {len(queries)} queries")
+    for column in (
+        "backend",
+        "load s",
+        "mean cos",
+        "min cos",
+        "NN agree",
+        "query p50 ms",
+        "query p95 ms",
+        "docs/s",
+    ):
+        table.add_column(column, justify="right")
+    for name in backend or list(BACKENDS):
+        start = time.perf_counter()
+        embedding = get_embeddings(use_cache=False, backend=name)
+        load_seconds = time.perf_counter() - start
+        parity = check_parity(baseline, embedding, queries + overviews[:256])
+
+        embedding.embed_query(queries[0])  # Warm up kernels and caches.
+        latencies = []
+        for _ in range(rounds):
+            for query in queries:
+                start = time.perf_counter()
+                embedding.embed_query(query)
+                latencies.append(1000 * (time.perf_counter() - start))
+        p50, p95 = np.percentile(latencies, [50, 95])
+        docs_per_second = measure(embedding, overviews, batch_size)
+
+        color = "green" if parity.passed(threshold) else "red"
+        table.add_row(
+            name,
+            f"{load_seconds:.1f}",
+            f"[{color}]{parity.mean_cosine:.4f}[/]",
+            f"[{color}]{parity.min_cosine:.4f}[/]",
+            f"{parity.neighbor_agreement:.2f}",
+            f"{p50:.1f}",
+            f"{p95:.1f}",
+            f"{docs_per_second:.0f}",
+        )
+    print(table)
+
+
+if __name__ == "__main__":
+    typer.run(main)
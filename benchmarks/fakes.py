@@ -0,0 +1,39 @@
+"""Offline stand-ins for model providers, shared by benchmarks and tests."""
+
+from collections.abc import Callable, Sequence
+from typing import Any
+
+from langchain_core.language_models.base import LanguageModelInput
+from langchain_core.language_models.fake_chat_models import FakeListChatModel
+from langchain_core.messages import AIMessage
+from langchain_core.runnables import Runnable
+from langchain_core.tools import BaseTool
+
+
+class FakeChatModelWithTools(FakeListChatModel):
+    """Fake chat model that supports tool binding for testing.
+
+    Extends FakeListChatModel to implement bind_tools() method, which is
+    required when creating LangGraph agents. This allows the fake model
+    to work with create_agent() function.
+    """
+
+    def bind_tools(
+        self,
+        tools: Sequence[dict[str, Any] | type | Callable | BaseTool],
+        *,
+        tool_choice: str | None = None,
+        **kwargs: Any,
+    ) -> Runnable[LanguageModelInput, AIMessage]:
+        """Mock bind_tools method to support agent creation.
+
+        Args:
+            tools: Sequence of tools to bind to the model.
+            **kwargs: Additional keyword arguments.
+
+        Returns:
+            Runnable: Returns self to maintain the fake responses behavior.
+        """
+        # Return self to maintain the fake responses behavior
+        # The agent will use this model which will return predefined responses
+        return self
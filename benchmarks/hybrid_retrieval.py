@@ -0,0 +1,128 @@
+"""Benchmark of vector, BM25 and hybrid retrieval on a fixed query set.
+
+Runs against the configured vector store and the lexical index written by
+``index`` at ``LEXICAL_INDEX_PATH``, so index the dataset first.
+
+Usage:
+    uv run python -m benchmarks.hybrid_retrieval --k 5
+"""
+
+import os
+import time
+from collections.abc import Callable
+from typing import Annotated
+
+import numpy as np
+import typer
+from langchain_core.documents import Document
+from rich import print
+from rich.table import Table
+
+from movie_recommender import config
+from movie_recommender.bm25 import BM25Index
+from movie_recommender.tools import make_movie_recommendation_tool
+from movie_recommender.vectorstore import get_embeddings, get_vector_store
+
+# Queries naming people, titles or plots, with the titles counting as a hit.
+QUERIES: list[tuple[str, tuple[str, ...]]] = [
+    ("something by Jodorowsky", ("The Holy Mountain", "El Topo", "Santa Sangre")),
+    ("a Kubrick movie about a haunted hotel", ("The Shining",)),
+    ("Tarantino heist gone wrong", ("Reservoir Dogs",)),
+    ("Miyazaki girl works in a bathhouse for spirits", ("Spirited Away",)),
+    ("Keanu Reeves hacker discovers simulated reality", ("The Matrix",)),
+    ("Amélie in Montmartre", ("Amélie",)),
+    ("Wong Kar-wai neighbours fall in love in Hong Kong", ("In the Mood for Love",)),
+    ("Bong Joon-ho poor family infiltrates a rich household", ("Parasite",)),
+    ("Tarkovsky space station above an ocean planet", ("Solaris",)),
+    ("Werner Herzog hauls a steamship over a mountain", ("Fitzcarraldo",)),
+    ("Sigourney Weaver hunted by a creature on a spaceship", ("Alien",)),
+    ("Kurosawa samurai defend a farming village", ("Seven Samurai",)),
+    ("Coen brothers kidnapping in snowy Minnesota", ("Fargo",)),
+    (
+        "Jim Carrey erases memories of a relationship",
+        ("Eternal Sunshine of the Spotless Mind",),
+    ),
+    ("Villeneuve linguist communicates with aliens", ("Arrival",)),
+    ("Agnès Varda singer awaits test results in Paris", ("Cléo from 5 to 7",)),
+]
+
+
+def evaluate(
+    search: Callable[[str], list[Document]], rounds: int
+) -> tuple[float, float, list[float]]:
+    """Return hit rate, mean reciprocal rank and latencies in ms of a retriever."""
+    hits, reciprocal_ranks, latencies = 0, [], []
+    for _ in range(rounds):
+        for query, expected in QUERIES:
+            start = time.perf_counter()
+            docs = search(query)
+            latencies.append(1000 * (time.perf_counter() - start))
+            titles = [str(doc.metadata.get("title", "")).lower() for doc in docs]
+            ranks = [
+                rank
+                for rank, title in enumerate(titles, start=1)
+                if title in {e.lower() for e in expected}
+            ]
+            hits += bool(ranks)
+            reciprocal_ranks.append(1 / ranks[0] if ranks else 0.0)
+    total = rounds * len(QUERIES)
+    return hits / total, float(np.mean(reciprocal_ranks)), latencies
+
+
+def main(
+    k: Annotated[int, typer.Option(help="Movies returned per query.")] = 5,
+    candidates: Annotated[
+        int, typer.Option(help="Candidates per retriever in hybrid search.")
+    ] = config.HYBRID_CANDIDATES,
+    rounds: Annotated[int, typer.Option(help="Repetitions of the query set.")] = 3,
+) -> None:
+    """Print hit@k, MRR and p50/p95 latency of every retrieval mode."""
+    store = get_vector_store(
+        config.VECTOR_STORE_NAME,
+        embedding=get_embeddings(use_cache=False),
+        read_only=True,
+    )
+    lexical_index = BM25Index.load(config.LEXICAL_INDEX_PATH)
+    size_mb = os.path.getsize(config.LEXICAL_INDEX_PATH) / 1024**2
+
+    def tool_search(**options) -> Callable[[str], list[Document]]:
+        tool = make_movie_recommendation_tool(store, k=k, **options)
+        return lambda query: (
+            tool.invoke(
+                {
+                    "type": "tool_call",
+                    "id": "benchmark",
+                    "name": tool.name,
+                    "args": {"query": query},
+                }
+            ).artifact
+        )
+
+    def lexical_search(query: str) -> list[Document]:
+        ids = [doc_id for doc_id, _ in lexical_index.search(query, k)]
+        found = {doc.id: doc for doc in store.get_by_ids(ids)}
+        return [found[doc_id] for doc_id in ids if doc_id in found]
+
+    modes = {
+        "vector": tool_search(),
+        "bm25": lexical_search,
+        "hybrid": tool_search(
+            lexical_index=lexical_index, hybrid_candidates=candidates
+        ),
+    }
+    table = Table(
+        title=f"{len(QUERIES)} queries on {len(lexical_index)} movies "
+        f"(BM25 index {size_mb:.1f} MiB)"
+    )
+    for column in ("retrieval", f"hit@{k}", "MRR", "p50 ms", "p95 ms"):
+        table.add_column(column, justify="right")
+    for name, search in modes.items():
+        search(QUERIES[0][0])  # Warm up models and caches.
+        hit_rate, mrr, latencies = evaluate(search, rounds)
+        p50, p95 = np.percentile(latencies, [50, 95])
+        table.add_row(name, f"{hit_rate:.2f}", f"{mrr:.2f}", f"{p50:.1f}", f"{p95:.1f}")
+    print(table)
+
+
+if __name__ == "__main__":
+    typer.run(main)
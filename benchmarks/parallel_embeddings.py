@@ -0,0 +1,72 @@
+"""Benchmark of embedding throughput against the number of worker processes.
+
+Usage:
+    uv run python -m benchmarks.parallel_embeddings --workers 1 --workers 2 \
+        --workers 4 --documents 4096
+"""
+
+import time
+from functools import partial
+from typing import Annotated
+
+import typer
+from langchain_core.embeddings import Embeddings
+from rich import print
+from rich.table import Table
+
+from movie_recommender import config
+from movie_recommender.parallel_embeddings import ProcessPoolEmbeddings
+
+
+def synthetic_overviews(count: int) -> list[str]:
+    """Generate distinct movie-overview-like texts of realistic length."""
+    return [
+        f"Movie {i}: a weary detective returns to her hometown on the coast, "
+        f"where a string of disappearances in summer {1950 + i % 70} forces her "
+        "to confront the family secrets she once ran away from."
+        for i in range(count)
+    ]
+
+
+def measure(embedding: Embeddings, texts: list[str], batch_size: int) -> float:
+    """Embed all texts in indexer-sized batches and return docs per second."""
+    # Warm up so model loading is not part of the measurement.
+    embedding.embed_documents(texts[:batch_size])
+    start = time.perf_counter()
+    for offset in range(0, len(texts), batch_size):
+        embedding.embed_documents(texts[offset : offset + batch_size])
+    return len(texts) / (time.perf_counter() - start)
+
+
+def main(
+    workers: Annotated[
+        list[int] | None, typer.Option(help="Worker counts to benchmark.")
+    ] = None,
+    documents: Annotated[int, typer.Option(help="Number of texts.")] = 2048,
+    batch_size: Annotated[int, typer.Option(help="Indexer batch size.")] = 256,
+    model_name: Annotated[
+        str, typer.Option(help="Sentence-transformers model.")
+    ] = config.EMBEDDING_MODEL,
+) -> None:
+    """Print docs/s and speed-up over a single process per worker count."""
+    from langchain_huggingface import HuggingFaceEmbeddings
+
+    workers = workers or [1, 2, 4]
+    texts = synthetic_overviews(documents)
+    factory = partial(HuggingFaceEmbeddings, model_name=model_name)
+
+    table = Table(title=f"Embedding throughput ({documents} documents)")
+    table.add_column("workers", justify="right")
+    table.add_column("docs/s", justify="right")
+    table.add_column("speed-up", justify="right")
+    baseline = measure(factory(), texts, batch_size)
+    table.add_row("in-process", f"{baseline:.1f}", "1.00x")
+    for count in workers:
+        with ProcessPoolEmbeddings(factory, workers=count) as embedding:
+            throughput = measure(embedding, texts, batch_size)
+        table.add_row(str(count), f"{throughput:.1f}", f"{throughput / baseline:.2f}x")
+    print(table)
+
+
+if __name__ == "__main__":
+    typer.run(main)
@@ -0,0 +1,126 @@
+"""Benchmark of row-wise INSERT against binary COPY loads into pgvector.
+
+Both paths load the same synthetic movies with a fake embedding, so only the
+database writes are measured, into a scratch table next to ``TABLE_NAME``.
+Start Postgres with ``docker compose up -d`` and set ``VECTOR_STORE`` to
+"pgvectorstore" first.
+
+Usage:
+    uv run python -m benchmarks.pg_bulk_load --rows 20000 --index hnsw
+"""
+
+import time
+from collections.abc import Iterator
+from typing import Annotated
+
+import typer
+from langchain_core.document_loaders import BaseLoader
+from langchain_core.documents import Document
+from langchain_core.embeddings import DeterministicFakeEmbedding
+from langchain_postgres import Column, PGVectorStore
+from langchain_postgres.v2.indexes import HNSWIndex, IVFFlatIndex
+from rich import print
+from rich.table import Table
+
+from movie_recommender import config
+from movie_recommender.indexer import MovieIndexer
+from movie_recommender.pg_bulk_load import PGBulkLoader
+from movie_recommender.vectorstore import (
+    PG_FILTER_COLUMNS,
+    _pg_connection_string,
+    get_pg_engine,
+)
+
+LANGUAGES = ("en", "fr", "ja", "de", "es")
+GENRES = ("Drama", "Comedy", "Thriller", "Horror, Mystery", "Animation, Family")
+
+
+class SyntheticMovieLoader(BaseLoader):
+    """Loader yielding movies with the metadata fields of the TMDB dataset."""
+
+    def __init__(self, rows: int) -> None:
+        self.rows = rows
+
+    def lazy_load(self) -> Iterator[Document]:
+        for i in range(self.rows):
+            yield Document(
+                page_content=f"Overview of movie {i} about a journey and a secret.",
+                metadata={
+                    "id": i,
+                    "title": f"Movie {i}",
+                    "release_year": 1950 + i % 75,
+                    "original_language": LANGUAGES[i % len(LANGUAGES)],
+                    "genres": GENRES[i % len(GENRES)],
+                    "popularity": (i * 7919) % 1000 / 10,
+                    "vote_average": (i % 100) / 10,
+                },
+            )
+
+
+def main(
+    rows: Annotated[int, typer.Option(help="Movies loaded by each path.")] = 20_000,
+    batch_size: Annotated[
+        int, typer.Option(help="Documents per batch.")
+    ] = config.INDEX_BATCH_SIZE,
+    index: Annotated[
+        str, typer.Option(help="Vector index built after COPY: hnsw or ivfflat.")
+    ] = "hnsw",
+) -> None:
+    """Print rows/s of both load paths and the deferred index build time."""
+    table_name = f"{config.TABLE_NAME}_load_benchmark"
+    embedding = DeterministicFakeEmbedding(size=config.VECTOR_SIZE)
+    engine = get_pg_engine()
+
+    def fresh_table() -> None:
+        engine.init_vectorstore_table(
+            table_name=table_name,
+            vector_size=config.VECTOR_SIZE,
+            metadata_columns=[Column(n, t) for n, t in PG_FILTER_COLUMNS.items()],
+            overwrite_existing=True,
+        )
+
+    fresh_table()
+    store = PGVectorStore.create_sync(
+        engine=engine,
+        table_name=table_name,
+        embedding_service=embedding,
+        metadata_columns=list(PG_FILTER_COLUMNS),
+    )
+    indexer = MovieIndexer(SyntheticMovieLoader(rows), store)
+    insert = indexer.index(batch_size=batch_size, id_key="id")
+
+    fresh_table()
+    with PGBulkLoader(
+        _pg_connection_string("postgresql"),
+        table_name,
+        embedding,
+        metadata_columns=PG_FILTER_COLUMNS,
+        maintenance_work_mem=config.PG_MAINTENANCE_WORK_MEM,
+    ) as loader:
+        copy = indexer.index(batch_size=batch_size, id_key="id", writer=loader)
+        start = time.perf_counter()
+        loader.create_vector_index(
+            IVFFlatIndex(lists=max(rows // 1000, 1))
+            if index == "ivfflat"
+            else HNSWIndex()
+        )
+        index_seconds = time.perf_counter() - start
+
+    results = Table(title=f"Loading {rows} movies in batches of {batch_size}")
+    for column in ("path", "load s", "rows/s", "speedup"):
+        results.add_column(column, justify="right")
+    results.add_row(
+        "INSERT", f"{insert.elapsed:.1f}", f"{insert.docs_per_second:.0f}", "1.0x"
+    )
+    results.add_row(
+        "COPY",
+        f"{copy.elapsed:.1f}",
+        f"{copy.docs_per_second:.0f}",
+        f"{copy.docs_per_second / insert.docs_per_second:.1f}x",
+    )
+    print(results)
+    print(f"{index} index built after COPY in {index_seconds:.1f} s")
+
+
+if __name__ == "__main__":
+    typer.run(main)
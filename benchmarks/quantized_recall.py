@@ -0,0 +1,97 @@
+"""Benchmark of int8 quantized search with re-ranking against exact search.
+
+Reports the memory of the vectors searched per query, float32 against the
+int8 codes, and recall@k and latency per number of re-ranked candidates.
+``--rerank 0`` ranks on the codes alone, to show what re-ranking recovers.
+
+Usage:
+    uv run python -m benchmarks.quantized_recall --rows 200000 --rerank 0 \
+        --rerank 50 --rerank 100
+"""
+
+import statistics
+import time
+from typing import Annotated
+
+import numpy as np
+import typer
+from langchain_core.embeddings import DeterministicFakeEmbedding
+from rich import print
+from rich.table import Table
+
+from benchmarks.ann_recall import (
+    clustered_vectors,
+    latency_percentiles,
+    run_queries,
+)
+from movie_recommender.numpy_vectorstore import NumpyVectorStore
+from movie_recommender.quantized_vectorstore import QuantizedVectorStore
+
+
+def main(
+    rows: Annotated[int, typer.Option(help="Number of indexed vectors.")] = 100_000,
+    dim: Annotated[int, typer.Option(help="Vector dimension.")] = 384,
+    queries: Annotated[int, typer.Option(help="Number of queries.")] = 200,
+    k: Annotated[int, typer.Option(help="Neighbours per query.")] = 10,
+    rerank: Annotated[
+        list[int] | None,
+        typer.Option(help="Re-ranked candidates to benchmark, 0 for none."),
+    ] = None,
+) -> None:
+    """Print the memory, recall@k and p50/p95 latency of int8 search."""
+    rerank = rerank if rerank is not None else [0, 20, 50, 100, 200]
+    rng = np.random.default_rng(0)
+    vectors = clustered_vectors(rows, dim, clusters=max(1, rows // 500), rng=rng)
+    # Queries land near indexed movies, like paraphrases of known overviews.
+    query_vectors = vectors[rng.choice(rows, queries)] + rng.normal(
+        scale=0.5, size=(queries, dim)
+    ).astype(np.float32)
+    texts = [str(i) for i in range(rows)]
+    embedding = DeterministicFakeEmbedding(size=dim)
+
+    exact = NumpyVectorStore(embedding=embedding)
+    exact.add_embeddings(texts, vectors, ids=texts)
+    quantized = QuantizedVectorStore(embedding=embedding)
+    quantized.add_embeddings(texts, vectors, ids=texts)
+    start = time.perf_counter()
+    quantized.build_codes()
+    build_seconds = time.perf_counter() - start
+
+    memory = Table(title=f"Memory of {rows} x {dim} vectors")
+    for column in ("representation", "MiB", "bytes/vector", "reduction"):
+        memory.add_column(column, justify="right")
+    float32_bytes = exact.vectors.nbytes
+    for name, nbytes in (
+        ("float32", float32_bytes),
+        ("float16", float32_bytes // 2),
+        ("int8 codes", quantized.codes_nbytes),
+    ):
+        memory.add_row(
+            name,
+            f"{nbytes / 1024**2:.1f}",
+            f"{nbytes / rows:.0f}",
+            f"{float32_bytes / nbytes:.2f}x",
+        )
+    print(memory)
+
+    truth, latencies = run_queries(exact, query_vectors, k)
+    table = Table(
+        title=f"recall@{k} on {rows} x {dim} vectors "
+        f"(int8 codes built in {build_seconds:.2f}s)"
+    )
+    for column in ("search", f"recall@{k}", "p50 ms", "p95 ms"):
+        table.add_column(column, justify="right")
+    table.add_row("exact float32", "1.000", *latency_percentiles(latencies))
+    for candidates in rerank:
+        quantized.rerank_candidates = candidates
+        found, latencies = run_queries(quantized, query_vectors, k)
+        recall = statistics.mean(
+            len(f & t) / len(t) for f, t in zip(found, truth, strict=True)
+        )
+        name = f"int8 rerank={candidates}" if candidates else "int8 codes only"
+        table.add_row(name, f"{recall:.3f}", *latency_percentiles(latencies))
+    print(table)
+
+
+if __name__ == "__main__":
+    typer.run(main)
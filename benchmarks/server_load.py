@@ -0,0 +1,166 @@
+"""Load test of the multi-session server with the fake chat model.
+
+Starts the server of ``cli.server`` in-process on a free port, with the fake
+chat model of the tests and no tools, so it measures the server and the
+per-session state rather than a model provider. Concurrent clients each open
+a session, chat for a few turns and, unless ``--keep``, close it again.
+Reports sessions/s, turn latency and resident memory per open session.
+
+Usage:
+    uv run python -m benchmarks.server_load --sessions 2000 --concurrency 64
+"""
+
+import asyncio
+import gc
+import time
+from typing import Annotated
+
+import aiohttp
+import numpy as np
+import typer
+from aiohttp import web
+from rich import print
+from rich.table import Table
+
+from benchmarks.fakes import FakeChatModelWithTools
+from cli.server import SESSIONS, create_app
+from movie_recommender import config
+from movie_recommender.llm import MovieRecommenderLLM
+
+REPLIES = [
+    "Do you prefer something recent or a classic?",
+    "What about [yellow bold]The Holy Mountain[/]? It is a surreal classic.",
+]
+MESSAGES = [
+    "Something weird and colorful for tonight.",
+    "A classic is fine, I like surreal movies.",
+    "Anything similar but in Spanish?",
+]
+
+
+def _rss_mb() -> float:
+    try:
+        with open("/proc/self/status") as file:
+            for line in file:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return float("nan")
+
+
+async def _client(
+    http: aiohttp.ClientSession,
+    base_url: str,
+    queue: asyncio.Queue[int],
+    turns: int,
+    keep: bool,
+    latencies: list[float],
+) -> None:
+    while True:
+        try:
+            queue.get_nowait()
+        except asyncio.QueueEmpty:
+            return
+        async with http.post(f"{base_url}/sessions") as response:
+            session_id = (await response.json())["session_id"]
+        for turn in range(turns):
+            start = time.perf_counter()
+            async with http.post(
+                f"{base_url}/sessions/{session_id}/messages",
+                json={"message": MESSAGES[turn % len(MESSAGES)]},
+            ) as response:
+                response.raise_for_status()
+                await response.json()
+            latencies.append(1000 * (time.perf_counter() - start))
+        if not keep:
+            async with http.delete(f"{base_url}/sessions/{session_id}"):
+                pass
+
+
+async def run_load(
+    sessions: int, concurrency: int, turns: int, keep: bool
+) -> dict[str, float]:
+    """Drive the server with concurrent sessions and measure it.
+
+    Args:
+        sessions: Number of sessions to run.
+        concurrency: Number of concurrent clients.
+        turns: Messages sent per session.
+        keep: Whether sessions stay open, so memory per session is measured.
+
+    Returns:
+        dict[str, float]: The measurements by name.
+    """
+    llm = MovieRecommenderLLM(
+        model=FakeChatModelWithTools(responses=REPLIES),
+        history_token_budget=config.HISTORY_TOKEN_BUDGET or None,
+    )
+    app = create_app(llm, max_sessions=sessions + 1)
+    runner = web.AppRunner(app, access_log=None)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = runner.addresses[0][1]
+    base_url = f"http://127.0.0.1:{port}"
+
+    queue: asyncio.Queue[int] = asyncio.Queue()
+    for i in range(sessions):
+        queue.put_nowait(i)
+    latencies: list[float] = []
+    gc.collect()
+    rss_before = _rss_mb()
+    start = time.perf_counter()
+    connector = aiohttp.TCPConnector(limit=concurrency)
+    async with aiohttp.ClientSession(connector=connector) as http:
+        await asyncio.gather(
+            *(
+                _client(http, base_url, queue, turns, keep, latencies)
+                for _ in range(concurrency)
+            )
+        )
+    seconds = time.perf_counter() - start
+    gc.collect()
+    rss_after = _rss_mb()
+    open_sessions = len(app[SESSIONS])
+    await runner.cleanup()
+
+    p50, p95, p99 = np.percentile(latencies, [50, 95, 99])
+    return {
+        "sessions": sessions,
+        "seconds": seconds,
+        "sessions/s": sessions / seconds,
+        "turns/s": len(latencies) / seconds,
+        "turn p50 ms": float(p50),
+        "turn p95 ms": float(p95),
+        "turn p99 ms": float(p99),
+        "open sessions": open_sessions,
+        "RSS growth MiB": rss_after - rss_before,
+        "KiB per open session": (
+            1024 * (rss_after - rss_before) / open_sessions
+            if open_sessions
+            else float("nan")
+        ),
+    }
+
+
+def main(
+    sessions: Annotated[int, typer.Option(help="Sessions to run.")] = 1000,
+    concurrency: Annotated[int, typer.Option(help="Concurrent clients.")] = 32,
+    turns: Annotated[int, typer.Option(help="Messages per session.")] = 3,
+    keep: Annotated[
+        bool, typer.Option(help="Keep sessions open to measure memory per session.")
+    ] = True,
+) -> None:
+    """Print the throughput, latency and memory of the server under load."""
+    results = asyncio.run(run_load(sessions, concurrency, turns, keep))
+    table = Table(title=f"{concurrency} concurrent clients, {turns} turns each")
+    table.add_column("measure")
+    table.add_column("value", justify="right")
+    for name, value in results.items():
+        table.add_row(name, f"{value:.2f}" if isinstance(value, float) else str(value))
+    print(table)
+
+
+if __name__ == "__main__":
+    typer.run(main)
@@ -0,0 +1,375 @@
+"""Offline benchmark suite of loading, indexing, retrieval and chat turns.
+
+Runs every stage of the pipeline on a synthetic TMDB-shaped CSV file with a
+deterministic fake embedding model and the fake chat model of the tests, so
+it needs neither a network connection nor model weights. Every stage reports
+throughput, p50/p95 latency and peak RSS. Results are saved as JSON, and
+``--compare`` prints the change against the results of an earlier commit.
+
+Usage:
+    uv run python -m benchmarks.suite --scale 100k
+    uv run python -m benchmarks.suite --scale 100k \
+        --compare .cache/benchmarks/bench_100k_numpy.json
+"""
+
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import time
+from collections.abc import Callable, Generator
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, field
+from typing import Annotated, Any
+from unittest.mock import patch
+
+import numpy as np
+import typer
+from langchain_core.embeddings import DeterministicFakeEmbedding
+from rich import print
+from rich.table import Table
+
+from benchmarks.fakes import FakeChatModelWithTools
+from benchmarks.synthetic_tmdb import GENRES, HEROES, PLOTS, write_synthetic_csv
+from movie_recommender import config
+from movie_recommender.bm25 import BM25IndexBuilder
+from movie_recommender.data_sources import KaggleCSVDataSource
+from movie_recommender.indexer import MovieIndexer
+from movie_recommender.ivf_vectorstore import IVFVectorStore
+from movie_recommender.llm import MovieRecommenderLLM
+from movie_recommender.neighbors import build_neighbor_graph
+from movie_recommender.numpy_vectorstore import NumpyVectorStore
+from movie_recommender.quantized_vectorstore import QuantizedVectorStore
+from movie_recommender.tools import (
+    build_filter,
+    make_movie_recommendation_tool,
+    make_similar_movies_tool,
+)
+
+SCALES = {"10k": 10_000, "100k": 100_000, "1M": 1_000_000}
+CHAT_REPLIES = [
+    "Do you prefer something recent or a classic?",
+    "I recommend [yellow bold]Hidden Station 1[/]",
+]
+
+
+@dataclass
+class StageResult:
+    """Measurements of one benchmark stage.
+
+    Attributes:
+        items: Number of rows, documents, queries or turns processed.
+        seconds: Wall-clock duration of the stage.
+        throughput: Items per second.
+        p50_ms: Median latency of one operation, if the stage has operations.
+        p95_ms: 95th percentile latency of one operation.
+        peak_rss_mb: Peak resident memory of the process during the stage.
+    """
+
+    items: int
+    seconds: float
+    throughput: float
+    p50_ms: float | None
+    p95_ms: float | None
+    peak_rss_mb: float
+
+
+@dataclass
+class _Stage:
+    items: int = 0
+    latencies: list[float] = field(default_factory=list)
+
+    @contextmanager
+    def operation(self) -> Generator[None, None, None]:
+        start = time.perf_counter()
+        yield
+        self.latencies.append(1000 * (time.perf_counter() - start))
+        self.items += 1
+
+
+class Suite:
+    """Runs stages and collects their :class:`StageResult`."""
+
+    def __init__(self) -> None:
+        self.results: dict[str, StageResult] = {}
+
+    @contextmanager
+    def stage(self, name: str) -> Generator[_Stage, None, None]:
+        """Measure the enclosed block as a stage.
+
+        Args:
+            name: The name of the stage.
+
+        Yields:
+            _Stage: Counts items and times operations of the stage.
+        """
+        stage = _Stage()
+        _reset_peak_rss()
+        start = time.perf_counter()
+        yield stage
+        seconds = time.perf_counter() - start
+        p50 = p95 = None
+        if stage.latencies:
+            p50, p95 = (float(p) for p in np.percentile(stage.latencies, [50, 95]))
+        self.results[name] = StageResult(
+            items=stage.items,
+            seconds=seconds,
+            throughput=stage.items / seconds if seconds > 0 else 0.0,
+            p50_ms=p50,
+            p95_ms=p95,
+            peak_rss_mb=_peak_rss_mb(),
+        )
+        print(f"[dim]{name}: {stage.items} items in {seconds:.2f} s[/]")
+
+
+def _reset_peak_rss() -> None:
+    # Linux resets the VmHWM high-water mark on request, so each stage reports
+    # its own peak. Elsewhere the peak of the whole process is reported.
+    try:
+        with open("/proc/self/clear_refs", "w") as file:
+            file.write("5")
+    except OSError:
+        pass
+
+
+def _peak_rss_mb() -> float:
+    try:
+        with open("/proc/self/status") as file:
+            for line in file:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and in kilobytes elsewhere.
+    return peak / 1024**2 if sys.platform == "darwin" else peak / 1024
+
+
+def _git_commit() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            check=True,
+            text=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _queries(count: int) -> list[str]:
+    rng = np.random.default_rng(1)
+    return [
+        f"{HEROES[rng.integers(len(HEROES))]} who {PLOTS[rng.integers(len(PLOTS))]}"
+        for _ in range(count)
+    ]
+
+
+def run_suite(
+    csv_path: str, store_name: str, queries: int, turns: int
+) -> dict[str, StageResult]:
+    """Run every stage on a CSV file and return the results by stage name.
+
+    Args:
+        csv_path: The synthetic TMDB CSV file.
+        store_name: Vector store to index into, "numpy", "ivf" or "int8".
+        queries: Number of queries per retrieval stage.
+        turns: Number of chat turns.
+
+    Returns:
+        dict[str, StageResult]: The results of every stage, in run order.
+    """
+    suite = Suite()
+    embedding = DeterministicFakeEmbedding(size=384)
+    data_source = KaggleCSVDataSource(
+        dataset_handle="synthetic/tmdb",
+        csv_filename=os.path.basename(csv_path),
+        content_column=config.CSV_CONTENT_COLUMN,
+        metadata_columns=[c for c in config.CSV_METADATA_COLUMNS.split(",") if c],
+        required_columns=[c for c in config.CSV_REQUIRED_COLUMNS.split(",") if c],
+        chunksize=config.CSV_CHUNKSIZE,
+    )
+    offline = patch(
+        "movie_recommender.data_sources.kagglehub.dataset_download",
+        return_value=os.path.dirname(os.path.abspath(csv_path)),
+    )
+
+    with offline, suite.stage("load") as stage:
+        for _ in data_source.get_loader().lazy_load():
+            stage.items += 1
+
+    store_cls = {"ivf": IVFVectorStore, "int8": QuantizedVectorStore}.get(
+        store_name, NumpyVectorStore
+    )
+    store = store_cls(embedding=embedding)
+    lexical_builder = BM25IndexBuilder()
+    with offline, suite.stage("index") as stage:
+        indexer = MovieIndexer(data_source.get_loader(), store, lexical_builder)
+        last = [time.perf_counter()]
+
+        def on_batch(stats: Any) -> None:
+            now = time.perf_counter()
+            stage.latencies.append(1000 * (now - last[0]))
+            stage.items = stats.documents
+            last[0] = now
+
+        indexer.index(batch_size=config.INDEX_BATCH_SIZE, on_progress=on_batch)
+
+    with suite.stage("bm25_build") as stage:
+        lexical_index = lexical_builder.build()
+        stage.items = len(lexical_index)
+
+    texts = _queries(queries)
+    filters = [
+        build_filter(year_from=1990, language="fr"),
+        build_filter(genres=[GENRES[3]], popularity="indie"),
+    ]
+    searches: dict[str, Callable[[int, str], Any]] = {
+        "search": lambda i, query: store.similarity_search(query, k=5),
+        "filtered_search": lambda i, query: store.similarity_search(
+            query, k=5, filter=filters[i % len(filters)]
+        ),
+    }
+    for name, search in searches.items():
+        with suite.stage(name) as stage:
+            for i, query in enumerate(texts):
+                with stage.operation():
+                    search(i, query)
+
+    tool = make_movie_recommendation_tool(store, lexical_index=lexical_index)
+    with suite.stage("hybrid_tool") as stage:
+        for query in texts:
+            with stage.operation():
+                tool.invoke({"query": query})
+
+    with suite.stage("neighbor_graph") as stage:
+        graph = build_neighbor_graph(
+            store.ids,
+            store.vectors,
+            k=config.NEIGHBOR_GRAPH_K,
+            titles=store.metadata_values("title"),
+        )
+        stage.items = len(graph)
+
+    similar_tool = make_similar_movies_tool(store, graph)
+    titles = [title for title in store.metadata_values("title")[:queries] if title]
+    with suite.stage("similar_tool") as stage:
+        for title in titles:
+            with stage.operation():
+                similar_tool.invoke({"title": title})
+
+    llm = MovieRecommenderLLM(
+        model=FakeChatModelWithTools(responses=CHAT_REPLIES),
+        history_token_budget=config.HISTORY_TOKEN_BUDGET or None,
+    )
+    llm.set_tools([tool])
+    with suite.stage("chat_turn") as stage:
+        for query in texts[:turns]:
+            with stage.operation():
+                llm.chat(query)
+    return suite.results
+
+
+def print_results(
+    results: dict[str, StageResult], baseline: dict[str, Any] | None = None
+) -> None:
+    """Print the results, with the change against a baseline if given.
+
+    Args:
+        results: The results of every stage.
+        baseline: The "stages" of an earlier results file.
+    """
+    table = Table(title="Benchmark results")
+    columns = ["stage", "items", "items/s", "p50 ms", "p95 ms", "peak RSS MiB"]
+    if baseline is not None:
+        columns += ["Δ items/s", "Δ p95"]
+    for column in columns:
+        table.add_column(column, justify="left" if column == "stage" else "right")
+
+    def change(new: float | None, old: float | None) -> str:
+        if new is None or not old:
+            return ""
+        return f"{100 * (new - old) / old:+.1f}%"
+
+    for name, result in results.items():
+        row = [
+            name,
+            str(result.items),
+            f"{result.throughput:.1f}",
+            "" if result.p50_ms is None else f"{result.p50_ms:.2f}",
+            "" if result.p95_ms is None else f"{result.p95_ms:.2f}",
+            f"{result.peak_rss_mb:.0f}",
+        ]
+        if baseline is not None:
+            old = baseline.get(name, {})
+            row += [
+                change(result.throughput, old.get("throughput")),
+                change(result.p95_ms, old.get("p95_ms")),
+            ]
+        table.add_row(*row)
+    print(table)
+
+
+def parse_scale(scale: str) -> int:
+    """Return the number of rows of a scale like "100k" or a plain number."""
+    return SCALES.get(scale) or int(scale)
+
+
+def main(
+    scale: Annotated[
+        str, typer.Option(help="Rows of the synthetic dataset: 10k, 100k or 1M.")
+    ] = "10k",
+    store: Annotated[
+        str, typer.Option(help="Vector store to index into: numpy, ivf or int8.")
+    ] = "numpy",
+    queries: Annotated[int, typer.Option(help="Queries per retrieval stage.")] = 200,
+    turns: Annotated[int, typer.Option(help="Chat turns.")] = 50,
+    data_dir: Annotated[
+        str, typer.Option(help="Directory of the generated CSV files.")
+    ] = ".cache/bench",
+    output: Annotated[
+        str | None,
+        typer.Option(help="Results file, by default in .cache/benchmarks."),
+    ] = None,
+    compare: Annotated[
+        str | None, typer.Option(help="Earlier results file to compare with.")
+    ] = None,
+) -> None:
+    """Run the benchmark suite and save the results as JSON."""
+    rows = parse_scale(scale)
+    csv_path = os.path.join(data_dir, f"tmdb_{scale}.csv")
+    if not os.path.exists(csv_path):
+        print(f"Generating {rows} synthetic movies into {csv_path}")
+        write_synthetic_csv(csv_path, rows)
+
+    results = run_suite(csv_path, store, queries, turns)
+
+    baseline = None
+    if compare is not None:
+        with open(compare) as file:
+            baseline = json.load(file)["stages"]
+    print_results(results, baseline)
+
+    output = output or os.path.join(".cache/benchmarks", f"bench_{scale}_{store}.json")
+    os.makedirs(os.path.dirname(output) or ".", exist_ok=True)
+    with open(output, "w") as file:
+        json.dump(
+            {
+                "commit": _git_commit(),
+                "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+                "python": platform.python_version(),
+                "machine": platform.machine(),
+                "rows": rows,
+                "store": store,
+                "stages": {name: asdict(r) for name, r in results.items()},
+            },
+            file,
+            indent=2,
+        )
+    print(f"Saved results to {output}")
+
+
+if __name__ == "__main__":
+    typer.run(main)
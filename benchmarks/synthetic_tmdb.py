@@ -0,0 +1,199 @@
+"""Generator of synthetic CSV files shaped like Kaggle's TMDB_all_movies.csv.
+
+The files have every column of ``TMDB_DTYPES`` with plausible values, missing
+values and skewed distributions, so loading, indexing and filtering behave as
+on the real dataset without downloading it. Output is deterministic per seed.
+
+Usage:
+    uv run python -m benchmarks.synthetic_tmdb .cache/bench/tmdb_100k.csv \
+        --rows 100000
+"""
+
+import os
+from typing import Annotated
+
+import numpy as np
+import pandas as pd
+import typer
+
+from movie_recommender.data_sources import TMDB_DTYPES
+
+CHUNK_ROWS = 100_000
+
+ADJECTIVES = (
+    "Silent", "Broken", "Golden", "Last", "Hidden", "Burning", "Frozen", "Lost",
+    "Crimson", "Endless", "Wild", "Secret", "Distant", "Midnight", "Hollow",
+)  # fmt: skip
+NOUNS = (
+    "River", "Empire", "Garden", "Station", "Horizon", "Harbor", "Machine",
+    "Kingdom", "Summer", "Mirror", "Voyage", "Forest", "Signal", "Island",
+)  # fmt: skip
+HEROES = (
+    "a retired detective", "a runaway bride", "a young pilot",
+    "an aging rock star", "a village doctor", "a rookie astronaut",
+    "a disgraced chef", "a teenage hacker", "a grieving widower", "a street cat",
+)  # fmt: skip
+PLOTS = (
+    "uncovers a conspiracy that reaches the highest levels of power",
+    "must survive a winter alone in the mountains",
+    "falls in love during a summer on the coast",
+    "plans one last heist before leaving the city for good",
+    "is haunted by visions of a house that burned decades ago",
+    "leads a crew to a distant planet in search of a new home",
+    "returns home to settle a family feud over an old vineyard",
+    "enters a dance competition to save the neighborhood school",
+)  # fmt: skip
+SETTINGS = (
+    "in 1970s Paris", "in a small town in Texas", "aboard a space station",
+    "in post-war Tokyo", "on a remote Scottish island", "in modern Seoul",
+    "in the Amazon rainforest", "during the Great Depression",
+)  # fmt: skip
+GENRES = (
+    "Drama", "Comedy", "Thriller", "Action", "Romance", "Horror",
+    "Documentary", "Animation", "Science Fiction", "Crime", "Family", "Fantasy",
+)  # fmt: skip
+LANGUAGES = ("en", "fr", "es", "ja", "de", "it", "ko", "hi", "zh", "pt", "ru", "sv")
+COUNTRIES = ("United States of America", "France", "Japan", "Germany", "India")
+FIRST_NAMES = (
+    "Ana", "Ben", "Chloe", "David", "Elena", "Farid", "Grace", "Hiro", "Ines",
+    "Jonas", "Kira", "Luca", "Maya", "Noah", "Olga", "Pedro", "Rin", "Sofia",
+)  # fmt: skip
+LAST_NAMES = (
+    "Almeida", "Berg", "Chen", "Dubois", "Eriksen", "Fischer", "Garcia",
+    "Haddad", "Ito", "Jensen", "Kowalski", "Laurent", "Moreau", "Nakamura",
+    "Okafor", "Petrov", "Rossi", "Silva", "Tanaka", "Varga",
+)  # fmt: skip
+
+
+def _pick(rng: np.random.Generator, values: tuple[str, ...], size: int) -> np.ndarray:
+    # Zipf-like weights, so a few values are common as in the real data.
+    weights = 1 / np.arange(1, len(values) + 1)
+    return np.asarray(values, dtype=object)[
+        rng.choice(len(values), size=size, p=weights / weights.sum())
+    ]
+
+
+def _names(rng: np.random.Generator, size: int) -> np.ndarray:
+    first = np.asarray(FIRST_NAMES, dtype=object)[
+        rng.integers(len(FIRST_NAMES), size=size)
+    ]
+    last = np.asarray(LAST_NAMES, dtype=object)[
+        rng.integers(len(LAST_NAMES), size=size)
+    ]
+    return first + " " + last
+
+
+def _joined(columns: list[np.ndarray], counts: np.ndarray) -> list[str]:
+    return [
+        ", ".join(dict.fromkeys(values[:count]))
+        for *values, count in zip(*columns, counts, strict=True)
+    ]
+
+
+def _missing(rng: np.random.Generator, values: np.ndarray, rate: float) -> np.ndarray:
+    values = values.astype(object)
+    values[rng.random(len(values)) < rate] = None
+    return values
+
+
+def synthetic_frame(start: int, rows: int, rng: np.random.Generator) -> pd.DataFrame:
+    """Generate ``rows`` movies with ids starting after ``start``.
+
+    Args:
+        start: Number of movies generated before, so ids stay unique.
+        rows: Number of movies.
+        rng: The random generator.
+
+    Returns:
+        pd.DataFrame: One row per movie with the columns of ``TMDB_DTYPES``.
+    """
+    ids = np.arange(start + 1, start + rows + 1)
+    titles = (
+        _pick(rng, ADJECTIVES, rows)
+        + " "
+        + _pick(rng, NOUNS, rows)
+        + " "
+        + ids.astype(str)
+    )
+    overviews = (
+        np.char.capitalize(_pick(rng, HEROES, rows).astype(str)).astype(object)
+        + " "
+        + _pick(rng, PLOTS, rows)
+        + " "
+        + _pick(rng, SETTINGS, rows)
+        + "."
+    )
+    years = rng.integers(1920, 2026, size=rows)
+    months = rng.integers(1, 13, size=rows)
+    days = rng.integers(1, 29, size=rows)
+    dates = [
+        f"{y}-{m:02d}-{d:02d}" for y, m, d in zip(years, months, days, strict=True)
+    ]
+    genre_columns = [_pick(rng, GENRES, rows) for _ in range(3)]
+    cast_columns = [_names(rng, rows) for _ in range(4)]
+    vote_count = rng.zipf(1.6, size=rows).clip(max=40_000)
+    frame = pd.DataFrame(
+        {
+            "id": ids,
+            "title": titles,
+            "vote_average": np.round(rng.uniform(0, 10, size=rows), 1),
+            "vote_count": vote_count,
+            "status": "Released",
+            "release_date": _missing(rng, np.asarray(dates, dtype=object), 0.05),
+            "revenue": np.round(rng.lognormal(13, 3, size=rows)),
+            "runtime": rng.integers(5, 240, size=rows),
+            "budget": np.round(rng.lognormal(12, 3, size=rows)),
+            "imdb_id": [f"tt{i:07d}" for i in ids],
+            "original_language": _pick(rng, LANGUAGES, rows),
+            "original_title": titles,
+            "overview": _missing(rng, overviews, 0.05),
+            "popularity": np.round(rng.lognormal(0.5, 1.5, size=rows), 3),
+            "tagline": _missing(
+                rng, "The " + _pick(rng, NOUNS, rows) + " awaits.", 0.6
+            ),
+            "genres": _joined(genre_columns, rng.integers(1, 4, size=rows)),
+            "production_companies": _pick(rng, NOUNS, rows) + " Pictures",
+            "production_countries": _pick(rng, COUNTRIES, rows),
+            "spoken_languages": _pick(rng, ("English", "French", "Japanese"), rows),
+            "cast": _joined(cast_columns, rng.integers(1, 5, size=rows)),
+            "director": _names(rng, rows),
+            "director_of_photography": _names(rng, rows),
+            "writers": _names(rng, rows),
+            "producers": _names(rng, rows),
+            "music_composer": _names(rng, rows),
+            "imdb_rating": np.round(rng.uniform(1, 10, size=rows), 1),
+            "imdb_votes": vote_count * 3,
+            "poster_path": [f"/{i:x}.jpg" for i in ids],
+        }
+    )
+    return frame[list(TMDB_DTYPES)]
+
+
+def write_synthetic_csv(path: str, rows: int, seed: int = 0) -> None:
+    """Write a synthetic TMDB CSV file in chunks of ``CHUNK_ROWS`` movies.
+
+    Args:
+        path: The CSV file path. Parent directories are created if needed.
+        rows: Number of movies.
+        seed: Seed of the random generator.
+    """
+    rng = np.random.default_rng(seed)
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(f"{path}.tmp", "w", newline="") as file:
+        for start in range(0, rows, CHUNK_ROWS):
+            frame = synthetic_frame(start, min(CHUNK_ROWS, rows - start), rng)
+            frame.to_csv(file, header=start == 0, index=False)
+    os.replace(f"{path}.tmp", path)
+
+
+def main(
+    path: Annotated[str, typer.Argument(help="Output CSV file.")],
+    rows: Annotated[int, typer.Option(help="Number of movies.")] = 10_000,
+    seed: Annotated[int, typer.Option(help="Random seed.")] = 0,
+) -> None:
+    """Write a synthetic TMDB-shaped CSV file."""
+    write_synthetic_csv(path, rows, seed)
+
+
+if __name__ == "__main__":
+    typer.run(main)
@@ -1,44 +1,292 @@
-from typing import Annotated
+import logging
+import os
+import threading
+import time
+from collections.abc import Iterable
+from concurrent.futures import Future
+from contextlib import nullcontext
+from typing import TYPE_CHECKING, Annotated
 
 import typer
-from langchain_community.embeddings import HuggingFaceEmbeddings
 from rich import print
+from rich.console import Group
+from rich.errors import MarkupError
+from rich.live import Live
+from rich.markup import escape
 from rich.panel import Panel
+from rich.table import Table
+from rich.text import Text
 
 import movie_recommender.config as config
-from movie_recommender.llm import MovieRecommenderLLM
-from movie_recommender.tools import make_movie_recommendation_tool
-from movie_recommender.vectorstore import get_vector_store
+from cli.startup import StartupProfile
 
+# LangChain, torch and the stores take seconds to import, so they are imported
+# on first use, partly on the warm-up thread, see start_warm_up.
+if TYPE_CHECKING:
+    from langchain_core.tools import BaseTool
 
-def question_loop(llm: MovieRecommenderLLM) -> None:
+    from movie_recommender.llm import ChatEvent, MovieRecommenderLLM
+    from movie_recommender.metrics import HistogramSink
+    from movie_recommender.query_cache import QueryCache
+
+logger = logging.getLogger(__name__)
+
+
+def build_tools(
+    profile: StartupProfile,
+) -> tuple[list["BaseTool"], "QueryCache | None"]:
+    """Load the embedding model and the stores and create the agent's tools.
+
+    Args:
+        profile: Profile recording the duration of every step.
+
+    Returns:
+        tuple[list[BaseTool], QueryCache | None]: The movie recommendation
+            tool, followed by the similar movies tool if a neighbour graph was
+            built, and the query cache, if enabled.
+    """
+    with profile.stage("import stores and tools"):
+        from movie_recommender.bm25 import BM25Index
+        from movie_recommender.neighbors import NeighborGraph
+        from movie_recommender.query_cache import QueryCache
+        from movie_recommender.tools import (
+            make_movie_recommendation_tool,
+            make_similar_movies_tool,
+        )
+        from movie_recommender.vectorstore import get_embeddings, get_vector_store
+    with profile.stage("load embedding model"):
+        embedding = get_embeddings(use_cache=False)
+        # The first call initializes the model's lazy state and kernels.
+        embedding.embed_query("warm up")
+    with profile.stage("open vector store"):
+        vector_store = get_vector_store(
+            vector_store_name=config.VECTOR_STORE_NAME,
+            embedding=embedding,
+            read_only=True,
+        )
+    cache = None
+    if config.QUERY_CACHE_SIZE > 0:
+        cache = QueryCache(
+            embedding,
+            max_entries=config.QUERY_CACHE_SIZE,
+            ttl_seconds=config.QUERY_CACHE_TTL,
+            similarity_threshold=config.QUERY_CACHE_THRESHOLD,
+        )
+    lexical_index = None
+    if config.HYBRID_SEARCH and os.path.isfile(config.LEXICAL_INDEX_PATH):
+        with profile.stage("load lexical index"):
+            lexical_index = BM25Index.load(config.LEXICAL_INDEX_PATH)
+    fields = [f for f in config.TOOL_RESULT_FIELDS.split(",") if f]
+    tools = [
+        make_movie_recommendation_tool(
+            vector_store,
+            cache=cache,
+            lexical_index=lexical_index,
+            hybrid_candidates=config.HYBRID_CANDIDATES,
+            k=config.TOOL_RESULT_K,
+            fields=fields,
+            overview_chars=config.TOOL_OVERVIEW_CHARS,
+        )
+    ]
+    if config.NEIGHBOR_GRAPH_PATH and os.path.isfile(config.NEIGHBOR_GRAPH_PATH):
+        with profile.stage("load neighbour graph"):
+            graph = NeighborGraph.load(config.NEIGHBOR_GRAPH_PATH)
+        tools.append(
+            make_similar_movies_tool(
+                vector_store,
+                graph,
+                k=config.TOOL_RESULT_K,
+                fields=fields,
+                overview_chars=config.TOOL_OVERVIEW_CHARS,
+            )
+        )
+    return tools, cache
+
+
+def start_warm_up(
+    profile: StartupProfile,
+) -> Future[tuple[list["BaseTool"], "QueryCache | None"]]:
+    """Build the tools on a background thread.
+
+    The embedding model and the stores load while the main thread imports
+    LangChain and the model generates the introduction.
+
+    Args:
+        profile: Profile recording the duration of every step.
+
+    Returns:
+        Future: Resolves to the result of :func:`build_tools`.
+    """
+    future: Future[tuple[list[BaseTool], QueryCache | None]] = Future()
+
+    def run() -> None:
+        start = time.perf_counter()
+        try:
+            future.set_result(build_tools(profile))
+        except BaseException as err:
+            future.set_exception(err)
+        profile.mark("warm-up total", start)
+
+    threading.Thread(target=run, name="warm-up", daemon=True).start()
+    return future
+
+
+def answer_panel(text: str, tool_calls: list[str], finished: int) -> Panel:
+    """Render a possibly incomplete answer with the progress of its tool calls.
+
+    Args:
+        text: The answer so far, with rich console markup.
+        tool_calls: Descriptions of the tool calls of the answer so far.
+        finished: How many of the tool calls returned.
+
+    Returns:
+        Panel: The bot's panel.
+    """
+    lines = [
+        f"[dim]{':white_check_mark:' if i < finished else ':mag:'} {call}[/]"
+        for i, call in enumerate(tool_calls)
+    ]
+    try:
+        body = Text.from_markup(text or "[dim]…[/]")
+    except MarkupError:
+        # Streamed text may contain a closing tag before its opening tag.
+        body = Text(text)
+    return Panel(Group(*lines, body), title="Cinephile Bot")
+
+
+def stream_answer(events: Iterable["ChatEvent"], footer: str = "") -> None:
+    """Show an answer in a panel that updates live while it is generated.
+
+    Args:
+        events: The events of the answer, see ``MovieRecommenderLLM.stream_chat``.
+        footer: Text appended to the complete answer.
+    """
+    text, tool_calls, finished = "", [], 0
+    with Live(answer_panel(text, tool_calls, finished), refresh_per_second=12) as live:
+        for event in events:
+            if event.kind == "token":
+                text += event.text
+            elif event.kind == "tool_call":
+                args = ", ".join(f"{k}={v!r}" for k, v in event.args.items())
+                tool_calls.append(escape(f"{event.text}({args})"))
+                # Text before a tool call is preamble; the answer follows it.
+                text = ""
+            elif event.kind == "tool_result":
+                finished += 1
+            else:
+                text = event.text + footer
+            live.update(answer_panel(text, tool_calls, finished))
+
+
+def turn_stats_table(totals: dict[str, tuple[int, float]], seconds: float) -> Table:
+    """Render the time spent per stage in one chat turn.
+
+    Args:
+        totals: Calls and seconds per stage, see ``metrics.breakdown``.
+        seconds: Wall-clock duration of the turn.
+
+    Returns:
+        Table: One row per stage. Stages may nest, e.g. "vector_search"
+            includes "embed_query", so the shares do not add up to 100%.
+    """
+    table = Table(title=f"Turn took {seconds:.2f} s", title_justify="left")
+    table.add_column("stage")
+    table.add_column("calls", justify="right")
+    table.add_column("ms", justify="right")
+    table.add_column("share", justify="right")
+    for stage, (calls, total) in totals.items():
+        share = 100 * total / seconds if seconds > 0 else 0.0
+        table.add_row(stage, str(calls), f"{1000 * total:.1f}", f"{share:.0f}%")
+    return table
+
+
+def session_stats_table(histograms: "HistogramSink") -> Table:
+    """Render the latency distribution per stage over the whole session.
+
+    Args:
+        histograms: Sink that recorded the stages of the session.
+
+    Returns:
+        Table: Calls and estimated p50/p95 latency per stage.
+    """
+    table = Table(title="Session latency", title_justify="left")
+    table.add_column("stage")
+    table.add_column("calls", justify="right")
+    table.add_column("p50 ms", justify="right")
+    table.add_column("p95 ms", justify="right")
+    for stage in histograms.stages():
+        table.add_row(
+            stage,
+            str(histograms.count(stage)),
+            f"{1000 * histograms.quantile(stage, 0.5):.1f}",
+            f"{1000 * histograms.quantile(stage, 0.95):.1f}",
+        )
+    return table
+
+
+def question_loop(
+    llm: "MovieRecommenderLLM",
+    warm_up: Future[tuple[list["BaseTool"], "QueryCache | None"]],
+    profile: StartupProfile | None = None,
+    stats: "HistogramSink | None" = None,
+) -> None:
     """Run the main conversation loop with the movie recommender bot.
 
+    Answers are streamed into a live panel token by token. The introduction
+    is generated without tools, so it does not wait for the warm-up. The tools
+    are attached before the first answer, by which time the warm-up has
+    usually finished.
+
     Args:
         llm: The MovieRecommenderLLM instance to interact with.
+        warm_up: The tools being built, see :func:`start_warm_up`.
+        profile: Startup profile to print after the introduction, once the
+            warm-up has finished.
+        stats: Sink recording the stages of the session. If given, the time
+            spent per stage is printed after every answer and the latency per
+            stage when the session ends.
 
     Raises:
         typer.Exit: When the user types 'exit' or 'quit'.
     """
-    embedding = HuggingFaceEmbeddings(model_name=config.EMBEDDING_MODEL)
-    vector_store = get_vector_store(
-        vector_store_name=config.VECTOR_STORE_NAME,
-        embedding=embedding,
-        initialize_table=True,  # TODO: Remove this after the indexer runs
-    )
-    llm.set_tools([make_movie_recommendation_tool(vector_store)])
-    intro = (
-        llm.introduce()
-        + "\n\nType [italic yellow]exit[/italic yellow] to [red]quit[/red].\n"
-    )
-    print(Panel(intro, title="Cinephile Bot"))
+    with profile.stage("generate introduction") if profile else nullcontext():
+        stream_answer(
+            llm.stream_introduce(),
+            footer="\n\nType [italic yellow]exit[/italic yellow] to [red]quit[/red].\n",
+        )
+    if profile is not None:
+        first_prompt = profile.elapsed()
+        warm_up.exception()  # Waits for the warm-up without raising.
+        print(profile.table())
+        print(f"First prompt after {first_prompt:.2f} s")
+
+    from movie_recommender.metrics import breakdown, collect
+
+    tool_attached = False
     while True:
         user_input = input(">> ")
         if user_input.lower() in {"exit", "quit"}:
             print(Panel("Goodbye! :wave:", title="Cinephile Bot"))
+            if stats is not None:
+                print(session_stats_table(stats))
+            if warm_up.done() and warm_up.exception() is None:
+                _, cache = warm_up.result()
+                if cache is not None:
+                    logger.info(
+                        "Query cache: %s, hit rate %.1f%%",
+                        cache.stats,
+                        cache.stats.hit_rate * 100,
+                    )
             raise typer.Exit()
-        response = llm.chat(user_input)
-        print(Panel(response, title="Cinephile Bot"))
+        if not tool_attached:
+            tools, _ = warm_up.result()
+            llm.set_tools(tools)
+            tool_attached = True
+        start = time.perf_counter()
+        with collect() as spans:
+            stream_answer(llm.stream_chat(user_input))
+        if stats is not None:
+            print(turn_stats_table(breakdown(spans), time.perf_counter() - start))
 
 
 def main(
@@ -46,20 +294,50 @@ def main(
         bool,
         typer.Option(help="Shows verbose messages for easier debugging."),
     ] = False,
+    profile_startup: Annotated[
+        bool,
+        typer.Option(help="Prints how long imports and initialization took."),
+    ] = False,
+    stats: Annotated[
+        bool,
+        typer.Option(help="Prints the time spent per stage after every answer."),
+    ] = False,
 ) -> None:
     """Main entry point for the movie recommender CLI application.
 
-    Initializes the MovieRecommenderLLM with configuration from environment
-    variables and starts the interactive question loop.
+    Starts warming up the embedding model and the vector store in the
+    background, initializes the MovieRecommenderLLM with configuration from
+    environment variables and starts the interactive question loop. Stage
+    timings go to the sinks configured by ``METRICS_SINKS``.
 
     Args:
         debug: Enable debug mode for verbose LangChain output.
+        profile_startup: Print the startup profile after the introduction.
+        stats: Print the time spent per stage after every answer.
 
     Raises:
         typer.Exit: If MODEL_NAME is not set in environment variables.
     """
+    profile = StartupProfile()
+    warm_up = start_warm_up(profile)
+    with profile.stage("import llm"):
+        from movie_recommender import metrics
+        from movie_recommender.llm import MovieRecommenderLLM
+    metrics.configure(
+        [name for name in config.METRICS_SINKS.split(",") if name],
+        config.METRICS_PORT,
+    )
+    session_stats = None
+    if stats:
+        session_stats = metrics.HistogramSink()
+        metrics.add_sink(session_stats)
     try:
-        llm = MovieRecommenderLLM(model_name=config.MODEL_NAME, do_set_debug=debug)
+        llm = MovieRecommenderLLM(
+            model_name=config.MODEL_NAME,
+            do_set_debug=debug,
+            history_token_budget=config.HISTORY_TOKEN_BUDGET or None,
+            summarize_history=config.HISTORY_SUMMARIZE,
+        )
     except ValueError as err:
         print(
             """
@@ -67,7 +345,7 @@ def main(
             """
         )
         raise typer.Exit(code=1) from err
-    question_loop(llm)
+    question_loop(llm, warm_up, profile if profile_startup else None, session_stats)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,191 @@
+"""HTTP server holding many conversations with one shared model and store.
+
+The embedding model, the vector store and the compiled agent are loaded once
+and shared by all sessions; a session only holds its conversation history,
+see :class:`~movie_recommender.sessions.SessionTable`. Needs the ``server``
+extra: ``uv sync --extra server``.
+
+Endpoints:
+    POST   /sessions                 Start a session, optionally introduced.
+    POST   /sessions/{id}/messages   Send a message and get the answer, or
+                                     stream its events as NDJSON.
+    DELETE /sessions/{id}            End a session.
+    GET    /health                   Session counts.
+    GET    /metrics                  Stage latencies in the Prometheus format.
+
+Usage:
+    uv run python -m cli.server --port 8080
+"""
+
+import asyncio
+import json
+import logging
+from collections.abc import AsyncIterator
+from dataclasses import asdict
+from typing import Annotated, Any
+
+import typer
+from aiohttp import web
+
+import movie_recommender.config as config
+from cli.main import build_tools
+from cli.startup import StartupProfile
+from movie_recommender import metrics
+from movie_recommender.llm import MovieRecommenderLLM
+from movie_recommender.sessions import SessionTable
+
+logger = logging.getLogger(__name__)
+
+SESSIONS = web.AppKey("sessions", SessionTable)
+PROMETHEUS = web.AppKey("prometheus", metrics.PrometheusSink)
+
+
+def create_app(
+    llm: MovieRecommenderLLM,
+    max_sessions: int = config.SESSION_MAX,
+    idle_timeout: float = config.SESSION_IDLE_TIMEOUT,
+    sweep_interval: float = 60.0,
+) -> web.Application:
+    """Create the server application around a shared bot.
+
+    Args:
+        llm: The bot whose model, tools and agent all sessions share. Its own
+            history is never used.
+        max_sessions: Maximum number of sessions held at once.
+        idle_timeout: Seconds without a message after which a session ends.
+        sweep_interval: Seconds between evictions of idle sessions.
+
+    Returns:
+        web.Application: The application, with one stage latency sink added
+            for ``/metrics`` while it runs.
+    """
+    app = web.Application()
+    app[SESSIONS] = SessionTable(
+        llm.new_session, max_sessions=max_sessions, idle_timeout=idle_timeout
+    )
+    app[PROMETHEUS] = metrics.PrometheusSink()
+
+    async def lifecycle(app: web.Application) -> AsyncIterator[None]:
+        metrics.add_sink(app[PROMETHEUS])
+        sweeper = asyncio.create_task(_sweep(app[SESSIONS], sweep_interval))
+        yield
+        sweeper.cancel()
+        metrics.remove_sink(app[PROMETHEUS])
+
+    app.cleanup_ctx.append(lifecycle)
+    app.add_routes(
+        [
+            web.post("/sessions", create_session),
+            web.post("/sessions/{session_id}/messages", send_message),
+            web.delete("/sessions/{session_id}", close_session),
+            web.get("/health", health),
+            web.get("/metrics", prometheus_metrics),
+        ]
+    )
+    return app
+
+
+async def _sweep(sessions: SessionTable, interval: float) -> None:
+    while True:
+        await asyncio.sleep(interval)
+        if expired := sessions.expire_idle():
+            logger.info("Expired %d idle sessions", expired)
+
+
+async def _json_body(request: web.Request) -> dict[str, Any]:
+    if not request.can_read_body:
+        return {}
+    try:
+        body = await request.json()
+    except json.JSONDecodeError as err:
+        raise web.HTTPBadRequest(text="Body is not valid JSON.") from err
+    if not isinstance(body, dict):
+        raise web.HTTPBadRequest(text="Body must be a JSON object.")
+    return body
+
+
+async def create_session(request: web.Request) -> web.Response:
+    """Start a session; with ``{"introduce": true}`` the bot greets first."""
+    body = await _json_body(request)
+    session = request.app[SESSIONS].create()
+    answer = None
+    if body.get("introduce"):
+        async with session.lock:
+            answer = await session.llm.aintroduce()
+    return web.json_response(
+        {"session_id": session.id, "answer": answer}, status=web.HTTPCreated.status_code
+    )
+
+
+async def send_message(request: web.Request) -> web.StreamResponse:
+    """Answer ``{"message": ...}``, streamed as NDJSON events with ``"stream"``."""
+    session = request.app[SESSIONS].get(request.match_info["session_id"])
+    if session is None:
+        raise web.HTTPNotFound(text="Unknown or expired session.")
+    body = await _json_body(request)
+    message = body.get("message")
+    if not isinstance(message, str) or not message.strip():
+        raise web.HTTPBadRequest(text='Body needs a non-empty "message".')
+
+    async with session.lock:
+        session.turns += 1
+        if not body.get("stream"):
+            return web.json_response({"answer": await session.llm.achat(message)})
+        response = web.StreamResponse(headers={"Content-Type": "application/x-ndjson"})
+        await response.prepare(request)
+        async for event in session.llm.astream_chat(message):
+            await response.write(json.dumps(asdict(event)).encode() + b"\n")
+        await response.write_eof()
+        return response
+
+
+async def close_session(request: web.Request) -> web.Response:
+    """End a session."""
+    if not request.app[SESSIONS].close(request.match_info["session_id"]):
+        raise web.HTTPNotFound(text="Unknown or expired session.")
+    return web.Response(status=web.HTTPNoContent.status_code)
+
+
+async def health(request: web.Request) -> web.Response:
+    """Report the number of open sessions and the session counters."""
+    sessions = request.app[SESSIONS]
+    return web.json_response({"sessions": len(sessions), **asdict(sessions.stats)})
+
+
+async def prometheus_metrics(request: web.Request) -> web.Response:
+    """Serve the stage latencies in the Prometheus text exposition format."""
+    return web.Response(
+        text=request.app[PROMETHEUS].exposition(),
+        content_type="text/plain",
+        charset="utf-8",
+    )
+
+
+def main(
+    host: Annotated[str, typer.Option(help="Address to bind.")] = config.SERVER_HOST,
+    port: Annotated[int, typer.Option(help="Port to listen on.")] = config.SERVER_PORT,
+    debug: Annotated[
+        bool, typer.Option(help="Shows verbose messages for easier debugging.")
+    ] = False,
+) -> None:
+    """Load the shared model and store once and serve conversations over HTTP."""
+    logging.basicConfig(level=logging.INFO)
+    metrics.configure(
+        [name for name in config.METRICS_SINKS.split(",") if name],
+        config.METRICS_PORT,
+    )
+    profile = StartupProfile()
+    tools, _ = build_tools(profile)
+    llm = MovieRecommenderLLM(
+        model_name=config.MODEL_NAME,
+        do_set_debug=debug,
+        history_token_budget=config.HISTORY_TOKEN_BUDGET or None,
+        summarize_history=config.HISTORY_SUMMARIZE,
+    )
+    llm.set_tools(tools)
+    logger.info("Loaded model and stores in %.1f s", profile.elapsed())
+    web.run_app(create_app(llm), host=host, port=port)
+
+
+if __name__ == "__main__":
+    typer.run(main)
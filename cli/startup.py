@@ -0,0 +1,92 @@
+import threading
+import time
+from collections.abc import Generator
+from contextlib import contextmanager
+from dataclasses import dataclass
+
+from rich.table import Table
+
+
+@dataclass
+class StartupStage:
+    """One timed step of the CLI startup.
+
+    Attributes:
+        name: What the step did, e.g. "import llm".
+        thread: Name of the thread the step ran on.
+        start: Seconds since the profile started when the step began.
+        seconds: Duration of the step.
+    """
+
+    name: str
+    thread: str
+    start: float
+    seconds: float
+
+
+class StartupProfile:
+    """Records how long the imports and initialization steps of startup take.
+
+    Steps may run on several threads, e.g. the embedding model warming up in
+    the background while the introduction is generated, so every stage keeps
+    its thread and its start offset to show the overlap.
+    """
+
+    def __init__(self) -> None:
+        """Initialize the profile, measuring offsets from now."""
+        self._started = time.perf_counter()
+        self._lock = threading.Lock()
+        self.stages: list[StartupStage] = []
+
+    def elapsed(self) -> float:
+        """Seconds since the profile started."""
+        return time.perf_counter() - self._started
+
+    @contextmanager
+    def stage(self, name: str) -> Generator[None, None, None]:
+        """Time the enclosed block as a startup stage.
+
+        Args:
+            name: The name of the stage.
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.mark(name, start)
+
+    def mark(self, name: str, start: float) -> None:
+        """Record a stage that started at a ``time.perf_counter()`` value.
+
+        Args:
+            name: The name of the stage.
+            start: When the stage started.
+        """
+        stage = StartupStage(
+            name=name,
+            thread=threading.current_thread().name,
+            start=start - self._started,
+            seconds=time.perf_counter() - start,
+        )
+        with self._lock:
+            self.stages.append(stage)
+
+    def table(self) -> Table:
+        """Render the stages in order of their start.
+
+        Returns:
+            Table: A rich table with one row per stage.
+        """
+        table = Table(title="Startup profile")
+        for column in ("stage", "thread", "start s", "duration s"):
+            table.add_column(column, justify="left" if column == "stage" else "right")
+        with self._lock:
+            stages = sorted(self.stages, key=lambda stage: stage.start)
+        for stage in stages:
+            table.add_row(
+                stage.name,
+                stage.thread,
+                f"{stage.start:.2f}",
+                f"{stage.seconds:.2f}",
+            )
+        return table
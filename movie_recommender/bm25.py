@@ -0,0 +1,308 @@
+import os
+import re
+import unicodedata
+from array import array
+from collections import Counter
+from collections.abc import Iterable, Sequence
+from itertools import repeat
+
+import numpy as np
+from langchain_core.documents import Document
+
+from movie_recommender.numpy_vectorstore import top_k
+
+DEFAULT_FIELDS = ("title", "original_title", "director", "cast")
+# Rank constant of reciprocal-rank fusion, as in Cormack et al. (2009).
+RRF_K = 60
+
+_TOKEN_PATTERN = re.compile(r"\w+")
+# Very common English words, dropped so their long posting lists are neither
+# stored nor scanned at query time. BM25 would weigh them close to zero anyway.
+_STOPWORDS = frozenset(
+    {
+        "a", "an", "and", "are", "as", "at", "be", "by", "for", "from", "has",
+        "he", "her", "his", "in", "is", "it", "its", "of", "on", "or", "she",
+        "that", "the", "their", "they", "this", "to", "was", "were", "who",
+        "with",
+    }
+)  # fmt: skip
+
+
+def tokenize(text: str) -> list[str]:
+    """Split text into lowercase, accent-free word tokens without stopwords.
+
+    Args:
+        text: The text to tokenize.
+
+    Returns:
+        list[str]: The tokens, e.g. ["amelie", "paris"] for "Amélie in Paris".
+    """
+    folded = text.lower()
+    if not folded.isascii():
+        folded = unicodedata.normalize("NFKD", folded)
+        folded = "".join(char for char in folded if not unicodedata.combining(char))
+    return [
+        token for token in _TOKEN_PATTERN.findall(folded) if token not in _STOPWORDS
+    ]
+
+
+def document_text(doc: Document, fields: Sequence[str] = DEFAULT_FIELDS) -> str:
+    """Return the text of a movie that is indexed for lexical search.
+
+    Args:
+        doc: The movie document.
+        fields: Metadata fields indexed in addition to the page content.
+
+    Returns:
+        str: The metadata fields and the page content, one per line.
+    """
+    values = [doc.metadata.get(field) for field in fields]
+    return "\n".join([*(str(v) for v in values if v is not None), doc.page_content])
+
+
+class BM25Index:
+    """Read-only BM25 inverted index over movie documents.
+
+    Postings are stored term by term in flat arrays: the rows of the documents
+    containing a term and the precomputed BM25 weight of the term in each of
+    them, as float16. A query only gathers and sums the postings of its terms,
+    so its cost depends on the number of matching postings, not on the number
+    of documents. Build an index with :class:`BM25IndexBuilder`.
+    """
+
+    def __init__(
+        self,
+        ids: Sequence[str],
+        terms: Sequence[str],
+        offsets: np.ndarray,
+        rows: np.ndarray,
+        weights: np.ndarray,
+    ) -> None:
+        """Initialize the index from its posting arrays.
+
+        Args:
+            ids: The document id of every row.
+            terms: The vocabulary, indexed by term number.
+            offsets: Start of the postings of every term in ``rows`` and
+                ``weights``, plus the end of the last one.
+            rows: Row of every posting.
+            weights: BM25 weight of every posting.
+        """
+        self._ids = list(ids)
+        self._term_of = {term: number for number, term in enumerate(terms)}
+        self._offsets = offsets
+        self._rows = rows
+        self._weights = weights
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def search(self, query: str, k: int = 10) -> list[tuple[str, float]]:
+        """Return the documents with the highest BM25 score for a query.
+
+        Args:
+            query: The query text.
+            k: Number of documents to return.
+
+        Returns:
+            list[tuple[str, float]]: Document ids and scores, best first. Only
+                documents containing at least one query term are returned.
+        """
+        numbers = {self._term_of.get(token) for token in tokenize(query)}
+        slices = [
+            slice(self._offsets[n], self._offsets[n + 1])
+            for n in numbers
+            if n is not None
+        ]
+        if not slices or k <= 0:
+            return []
+        rows = np.concatenate([self._rows[s] for s in slices])
+        weights = np.concatenate([self._weights[s] for s in slices])
+        # Sum per document: densely for long posting lists, sparsely otherwise.
+        if 8 * len(rows) > len(self._ids):
+            scores = np.bincount(rows, weights, minlength=len(self._ids))
+            candidates, best = top_k(scores, min(k, int(np.count_nonzero(scores))))
+        else:
+            unique_rows, inverse = np.unique(rows, return_inverse=True)
+            positions, best = top_k(np.bincount(inverse, weights), k)
+            candidates = unique_rows[positions]
+        return [
+            (self._ids[row], float(score))
+            for row, score in zip(candidates, best, strict=True)
+        ]
+
+    def save(self, path: str) -> None:
+        """Write the index to a single compressed ``.npz`` file.
+
+        The file is written under a temporary name and moved into place, so
+        readers never see a half-written index.
+
+        Args:
+            path: The file path. Parent directories are created if needed.
+        """
+        terms = sorted(self._term_of, key=self._term_of.__getitem__)
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(f"{path}.tmp", "wb") as file:
+            np.savez_compressed(
+                file,
+                ids=pack_strings(self._ids),
+                terms=pack_strings(terms),
+                offsets=self._offsets,
+                rows=self._rows,
+                weights=self._weights,
+            )
+        os.replace(f"{path}.tmp", path)
+
+    @classmethod
+    def load(cls, path: str) -> "BM25Index":
+        """Load an index written by :meth:`save`.
+
+        Args:
+            path: The file path.
+
+        Returns:
+            BM25Index: The loaded index.
+        """
+        with np.load(path) as data:
+            return cls(
+                ids=unpack_strings(data["ids"]),
+                terms=unpack_strings(data["terms"]),
+                offsets=data["offsets"],
+                rows=data["rows"],
+                weights=data["weights"],
+            )
+
+
+class BM25IndexBuilder:
+    """Accumulates documents and builds a :class:`BM25Index` from them.
+
+    Term counts are appended to compact arrays while documents stream in, so
+    the builder can follow the indexer batch by batch. Adding a document id
+    again replaces the earlier document.
+    """
+
+    def __init__(
+        self, fields: Sequence[str] = DEFAULT_FIELDS, k1: float = 1.2, b: float = 0.75
+    ) -> None:
+        """Initialize the builder.
+
+        Args:
+            fields: Metadata fields indexed in addition to the page content.
+            k1: BM25 term frequency saturation.
+            b: BM25 document length normalization.
+        """
+        self._fields = fields
+        self._k1 = k1
+        self._b = b
+        self._term_of: dict[str, int] = {}
+        self._ids: list[str] = []
+        self._row_of: dict[str, int] = {}
+        self._lengths = array("i")
+        self._rows = array("i")
+        self._terms = array("i")
+        self._counts = array("H")
+
+    def add_documents(self, documents: Iterable[Document], ids: Sequence[str]) -> None:
+        """Add documents to the index.
+
+        Args:
+            documents: The documents to add.
+            ids: The id of every document, as stored in the vector store.
+        """
+        for doc, doc_id in zip(documents, ids, strict=True):
+            tokens = tokenize(document_text(doc, self._fields))
+            replaced = self._row_of.get(doc_id)
+            if replaced is not None:
+                # Rows of replaced documents are dropped when building.
+                self._lengths[replaced] = -1
+            row = len(self._ids)
+            self._row_of[doc_id] = row
+            self._ids.append(doc_id)
+            self._lengths.append(len(tokens))
+            counts = Counter(tokens)
+            term_of = self._term_of
+            self._terms.extend(
+                [term_of.setdefault(token, len(term_of)) for token in counts]
+            )
+            self._rows.extend(repeat(row, len(counts)))
+            self._counts.extend([min(count, 0xFFFF) for count in counts.values()])
+
+    def build(self) -> BM25Index:
+        """Build the index from the documents added so far.
+
+        Returns:
+            BM25Index: The index.
+        """
+        lengths = np.frombuffer(self._lengths, dtype=np.int32)
+        rows = np.frombuffer(self._rows, dtype=np.int32)
+        terms = np.frombuffer(self._terms, dtype=np.int32)
+        counts = np.frombuffer(self._counts, dtype=np.uint16).astype(np.float32)
+
+        live = lengths >= 0
+        new_row = np.cumsum(live, dtype=np.int64).astype(np.int32) - 1
+        keep = live[rows]
+        rows, terms, counts = new_row[rows[keep]], terms[keep], counts[keep]
+        lengths = lengths[live].astype(np.float32)
+        ids = [doc_id for doc_id, alive in zip(self._ids, live, strict=True) if alive]
+
+        order = np.argsort(terms, kind="stable")
+        rows, terms, counts = rows[order], terms[order], counts[order]
+        frequencies = np.bincount(terms, minlength=len(self._term_of))
+        offsets = np.concatenate([[0], np.cumsum(frequencies)]).astype(np.int64)
+
+        n_docs = max(len(ids), 1)
+        idf = np.log1p((n_docs - frequencies + 0.5) / (frequencies + 0.5))
+        average = max(float(lengths.mean()) if len(lengths) else 0.0, 1.0)
+        norm = self._k1 * (1 - self._b + self._b * lengths[rows] / average)
+        weights = idf[terms] * counts * (self._k1 + 1) / (counts + norm)
+
+        vocabulary = sorted(self._term_of, key=self._term_of.__getitem__)
+        return BM25Index(ids, vocabulary, offsets, rows, weights.astype(np.float16))
+
+
+def reciprocal_rank_fusion(
+    rankings: Iterable[Sequence[str]], k: int = RRF_K
+) -> list[str]:
+    """Merge rankings of document ids by reciprocal-rank fusion.
+
+    Every document scores ``sum(1 / (k + rank))`` over the rankings it appears
+    in, with ranks starting at 1, so documents ranked well by several
+    retrievers rise to the top without having to calibrate their scores.
+
+    Args:
+        rankings: Document ids of every ranking, best first.
+        k: Rank constant damping the influence of top ranks.
+
+    Returns:
+        list[str]: All document ids, best fused score first.
+    """
+    scores: dict[str, float] = {}
+    for ranking in rankings:
+        for rank, doc_id in enumerate(ranking, start=1):
+            scores[doc_id] = scores.get(doc_id, 0.0) + 1 / (k + rank)
+    return sorted(scores, key=scores.__getitem__, reverse=True)
+
+
+def pack_strings(strings: Sequence[str]) -> np.ndarray:
+    """Pack strings without newlines into one byte array for ``.npz`` files.
+
+    Args:
+        strings: The strings.
+
+    Returns:
+        np.ndarray: The newline-separated UTF-8 bytes as uint8.
+    """
+    return np.frombuffer("\n".join(strings).encode(), dtype=np.uint8)
+
+
+def unpack_strings(packed: np.ndarray) -> list[str]:
+    """Unpack strings packed by :func:`pack_strings`.
+
+    Args:
+        packed: The packed bytes.
+
+    Returns:
+        list[str]: The strings.
+    """
+    text = packed.tobytes().decode()
+    return text.split("\n") if text else []
@@ -24,11 +24,45 @@ def required_env_var(name: str) -> str:
 
 
 MODEL_NAME: str = os.getenv("MODEL_NAME", "claude-sonnet-4-6")
+HISTORY_TOKEN_BUDGET: int = int(os.getenv("HISTORY_TOKEN_BUDGET", "6000"))
+HISTORY_SUMMARIZE: bool = os.getenv("HISTORY_SUMMARIZE", "false").lower() == "true"
 EMBEDDING_MODEL: str = os.getenv(
     "EMBEDDING_MODEL", "sentence-transformers/all-MiniLM-L6-v2"
 )
+EMBEDDING_BACKEND: str = os.getenv("EMBEDDING_BACKEND", "torch")
+EMBEDDING_ONNX_FILE: str = os.getenv("EMBEDDING_ONNX_FILE", "")
+EMBEDDING_WORKERS: int = int(os.getenv("EMBEDDING_WORKERS", "1"))
+EMBEDDING_CACHE_PATH: str = os.getenv(
+    "EMBEDDING_CACHE_PATH", ".cache/embeddings.sqlite3"
+)
+EMBEDDING_CACHE_MAX_BYTES: int = int(
+    os.getenv("EMBEDDING_CACHE_MAX_BYTES", str(2 * 1024**3))
+)
 
-VECTOR_STORE_NAME: str = os.getenv("VECTOR_STORE", "in_memory")
+VECTOR_STORE_NAME: str = os.getenv("VECTOR_STORE", "numpy")
+VECTOR_STORE_PATH: str = os.getenv("VECTOR_STORE_PATH", ".cache/vector_store")
+IVF_N_LISTS: int = int(os.getenv("IVF_N_LISTS", "0"))
+IVF_N_PROBE: int = int(os.getenv("IVF_N_PROBE", "8"))
+QUANTIZED_RERANK_CANDIDATES: int = int(os.getenv("QUANTIZED_RERANK_CANDIDATES", "100"))
+TOOL_RESULT_K: int = int(os.getenv("TOOL_RESULT_K", "5"))
+TOOL_RESULT_FIELDS: str = os.getenv(
+    "TOOL_RESULT_FIELDS", "title,release_date,genres,vote_average"
+)
+TOOL_OVERVIEW_CHARS: int = int(os.getenv("TOOL_OVERVIEW_CHARS", "240"))
+LEXICAL_INDEX_PATH: str = os.getenv("LEXICAL_INDEX_PATH", ".cache/bm25.npz")
+HYBRID_SEARCH: bool = os.getenv("HYBRID_SEARCH", "true").lower() == "true"
+HYBRID_CANDIDATES: int = int(os.getenv("HYBRID_CANDIDATES", "30"))
+NEIGHBOR_GRAPH_PATH: str = os.getenv("NEIGHBOR_GRAPH_PATH", "")
+NEIGHBOR_GRAPH_K: int = int(os.getenv("NEIGHBOR_GRAPH_K", "20"))
+QUERY_CACHE_SIZE: int = int(os.getenv("QUERY_CACHE_SIZE", "1024"))
+QUERY_CACHE_TTL: float = float(os.getenv("QUERY_CACHE_TTL", "3600"))
+QUERY_CACHE_THRESHOLD: float = float(os.getenv("QUERY_CACHE_THRESHOLD", "0.95"))
+METRICS_SINKS: str = os.getenv("METRICS_SINKS", "")
+METRICS_PORT: int = int(os.getenv("METRICS_PORT", "0"))
+SERVER_HOST: str = os.getenv("SERVER_HOST", "127.0.0.1")
+SERVER_PORT: int = int(os.getenv("SERVER_PORT", "8080"))
+SESSION_MAX: int = int(os.getenv("SESSION_MAX", "1000"))
+SESSION_IDLE_TIMEOUT: float = float(os.getenv("SESSION_IDLE_TIMEOUT", "1800"))
 
 if VECTOR_STORE_NAME == "pgvectorstore":
     PG_USER = required_env_var("POSTGRES_USER")
@@ -38,8 +72,31 @@ if VECTOR_STORE_NAME == "pgvectorstore":
     PG_DB = required_env_var("POSTGRES_DB")
     TABLE_NAME = required_env_var("TABLE_NAME")
     VECTOR_SIZE = int(required_env_var("VECTOR_SIZE"))
+    PG_POOL_SIZE = int(os.getenv("PG_POOL_SIZE", "5"))
+    PG_MAX_OVERFLOW = int(os.getenv("PG_MAX_OVERFLOW", "5"))
+    PG_POOL_PRE_PING = os.getenv("PG_POOL_PRE_PING", "true").lower() == "true"
+    PG_POOL_RECYCLE = int(os.getenv("PG_POOL_RECYCLE", "1800"))
+    PG_STATEMENT_CACHE_SIZE = int(os.getenv("PG_STATEMENT_CACHE_SIZE", "100"))
+    PG_BULK_LOAD = os.getenv("PG_BULK_LOAD", "false").lower() == "true"
+    PG_VECTOR_INDEX = os.getenv("PG_VECTOR_INDEX", "hnsw")
+    PG_MAINTENANCE_WORK_MEM = os.getenv("PG_MAINTENANCE_WORK_MEM", "512MB")
 
 
 KAGGLE_DATASET_PATH: str = os.getenv("KAGGLE_DATASET_PATH", "user/dataset-name")
 CSV_FILENAME: str = os.getenv("CSV_FILENAME", "TMDB_all_movies.csv")
 CSV_CONTENT_COLUMN: str = os.getenv("CSV_CONTENT_COLUMN", "overview")
+INDEX_BATCH_SIZE: int = int(os.getenv("INDEX_BATCH_SIZE", "256"))
+INDEX_MODE: str = os.getenv("INDEX_MODE", "full")
+INDEX_MANIFEST_PATH: str = os.getenv(
+    "INDEX_MANIFEST_PATH", ".cache/index_manifest.sqlite3"
+)
+CSV_ID_COLUMN: str = os.getenv("CSV_ID_COLUMN", "id")
+CSV_METADATA_COLUMNS: str = os.getenv(
+    "CSV_METADATA_COLUMNS",
+    "id,title,release_date,original_language,genres,popularity,vote_average,"
+    "vote_count,runtime,director,cast",
+)
+CSV_REQUIRED_COLUMNS: str = os.getenv("CSV_REQUIRED_COLUMNS", "id,title")
+CSV_CHUNKSIZE: int = int(os.getenv("CSV_CHUNKSIZE", "50000"))
+CSV_ENGINE: str = os.getenv("CSV_ENGINE", "")
+DATASET_SNAPSHOT_DIR: str = os.getenv("DATASET_SNAPSHOT_DIR", ".cache/snapshots")
@@ -1,12 +1,253 @@
+import hashlib
+import logging
 import os
-from typing import Any
+from collections.abc import Iterator
+from typing import Any, Literal
 
 import kagglehub
 import pandas as pd
 from langchain_community.document_loaders.dataframe import DataFrameLoader
 from langchain_core.document_loaders import BaseLoader
+from langchain_core.documents import Document
 
-from movie_recommender import config
+from movie_recommender import config, metrics
+
+logger = logging.getLogger(__name__)
+
+# Parser engines of pandas.read_csv.
+CSVEngine = Literal["c", "python", "pyarrow"]
+
+# Explicit dtypes of the TMDB_all_movies.csv columns, so pandas does not have to
+# infer them and does not fall back to object columns.
+TMDB_DTYPES: dict[str, str] = {
+    "id": "Int64",
+    "title": "string",
+    "vote_average": "float64",
+    "vote_count": "Int64",
+    "status": "category",
+    "release_date": "string",
+    "revenue": "float64",
+    "runtime": "Int64",
+    "budget": "float64",
+    "imdb_id": "string",
+    "original_language": "category",
+    "original_title": "string",
+    "overview": "string",
+    "popularity": "float64",
+    "tagline": "string",
+    "genres": "string",
+    "production_companies": "string",
+    "production_countries": "string",
+    "spoken_languages": "string",
+    "cast": "string",
+    "director": "string",
+    "director_of_photography": "string",
+    "writers": "string",
+    "producers": "string",
+    "music_composer": "string",
+    "imdb_rating": "float64",
+    "imdb_votes": "Int64",
+    "poster_path": "string",
+}
+
+
+class CSVChunkLoader(BaseLoader):
+    """Loader that lazily streams documents from selected columns of a CSV file.
+
+    Only the content and metadata columns are parsed, with explicit dtypes, and
+    the file is read in chunks, so peak memory is bounded by the chunk size
+    rather than the file size. Rows are dropped only if one of the required
+    columns is null.
+    """
+
+    def __init__(
+        self,
+        csv_path: str,
+        content_column: str,
+        metadata_columns: list[str],
+        required_columns: list[str] | None = None,
+        dtypes: dict[str, str] | None = None,
+        chunksize: int = 50_000,
+        engine: CSVEngine | None = None,
+    ) -> None:
+        """Initialize the loader.
+
+        Args:
+            csv_path: Path of the CSV file.
+            content_column: Column to use as document content.
+            metadata_columns: Columns to copy into the document metadata.
+            required_columns: Columns that must not be null, in addition to the
+                content column.
+            dtypes: Dtypes of the selected columns. Defaults to TMDB_DTYPES.
+            chunksize: Number of rows parsed at a time.
+            engine: Optional pandas parser engine. The "pyarrow" engine parses
+                the selected columns in one multi-threaded pass instead of in
+                chunks.
+        """
+        self._csv_path = csv_path
+        self._content_column = content_column
+        self._metadata_columns = [
+            column for column in metadata_columns if column != content_column
+        ]
+        self._required_columns = list(
+            dict.fromkeys([content_column, *(required_columns or [])])
+        )
+        self._dtypes = TMDB_DTYPES if dtypes is None else dtypes
+        self._chunksize = chunksize
+        self._engine = engine
+
+    def _read_chunks(self) -> Iterator[pd.DataFrame]:
+        columns = [self._content_column, *self._metadata_columns]
+        options: dict[str, Any] = {
+            "usecols": columns,
+            "dtype": {c: t for c, t in self._dtypes.items() if c in columns},
+        }
+        if self._engine == "pyarrow":
+            yield pd.read_csv(self._csv_path, engine="pyarrow", **options)
+        else:
+            yield from pd.read_csv(
+                self._csv_path,
+                chunksize=self._chunksize,
+                engine=self._engine,
+                **options,
+            )
+
+    def lazy_load(self) -> Iterator[Document]:
+        """Lazily load documents, one parsed chunk at a time.
+
+        Yields:
+            Document: One document per row with non-null required columns.
+        """
+        for chunk in self._read_chunks():
+            yield from _frame_to_documents(
+                chunk,
+                self._content_column,
+                self._metadata_columns,
+                self._required_columns,
+            )
+
+
+class ParquetSnapshotLoader(BaseLoader):
+    """Loader that lazily streams documents from a Parquet snapshot.
+
+    The file is memory-mapped and only the content and metadata columns are
+    read, one record batch at a time, so loading skips CSV parsing entirely.
+    Requires the optional ``pyarrow`` dependency.
+    """
+
+    def __init__(
+        self,
+        parquet_path: str,
+        content_column: str,
+        metadata_columns: list[str],
+        required_columns: list[str] | None = None,
+        batch_size: int = 50_000,
+    ) -> None:
+        """Initialize the loader.
+
+        Args:
+            parquet_path: Path of the Parquet snapshot.
+            content_column: Column to use as document content.
+            metadata_columns: Columns to copy into the document metadata.
+            required_columns: Columns that must not be null, in addition to the
+                content column.
+            batch_size: Number of rows converted to documents at a time.
+        """
+        self._parquet_path = parquet_path
+        self._content_column = content_column
+        self._metadata_columns = [
+            column for column in metadata_columns if column != content_column
+        ]
+        self._required_columns = list(
+            dict.fromkeys([content_column, *(required_columns or [])])
+        )
+        self._batch_size = batch_size
+
+    def lazy_load(self) -> Iterator[Document]:
+        """Lazily load documents, one record batch at a time.
+
+        Yields:
+            Document: One document per row with non-null required columns.
+        """
+        import pyarrow.parquet as pq
+
+        parquet_file = pq.ParquetFile(self._parquet_path, memory_map=True)
+        for batch in parquet_file.iter_batches(
+            batch_size=self._batch_size,
+            columns=[self._content_column, *self._metadata_columns],
+        ):
+            yield from _frame_to_documents(
+                batch.to_pandas(),
+                self._content_column,
+                self._metadata_columns,
+                self._required_columns,
+            )
+
+
+def write_parquet_snapshot(
+    csv_path: str, parquet_path: str, chunksize: int = 100_000
+) -> None:
+    """Convert a CSV file into a Parquet snapshot with typed columns.
+
+    All columns are kept, so later loads can project any of them. Known TMDB
+    columns get their explicit dtypes, all others are stored as strings. The
+    snapshot is written to a temporary file first and moved into place once
+    complete, so an interrupted conversion never leaves a partial snapshot.
+
+    Args:
+        csv_path: Path of the CSV file to convert.
+        parquet_path: Destination path of the snapshot.
+        chunksize: Number of CSV rows converted at a time.
+    """
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    header = pd.read_csv(csv_path, nrows=0).columns
+    dtypes = {
+        column: (
+            "string"
+            if TMDB_DTYPES.get(column, "category") == "category"
+            else TMDB_DTYPES[column]
+        )
+        for column in header
+    }
+    os.makedirs(os.path.dirname(parquet_path) or ".", exist_ok=True)
+    tmp_path = f"{parquet_path}.tmp"
+    writer = None
+    try:
+        for chunk in pd.read_csv(csv_path, dtype=dtypes, chunksize=chunksize):
+            table = pa.Table.from_pandas(
+                chunk,
+                schema=writer.schema if writer is not None else None,
+                preserve_index=False,
+            )
+            if writer is None:
+                writer = pq.ParquetWriter(tmp_path, table.schema, compression="zstd")
+            writer.write_table(table)
+    finally:
+        if writer is not None:
+            writer.close()
+    os.replace(tmp_path, parquet_path)
+
+
+def _frame_to_documents(
+    frame: pd.DataFrame,
+    content_column: str,
+    metadata_columns: list[str],
+    required_columns: list[str],
+) -> Iterator[Document]:
+    frame = frame.dropna(subset=required_columns)
+    contents = frame[content_column].tolist()
+    metadata = frame[metadata_columns]
+    if "release_date" in metadata.columns:
+        # Stored separately, so searches can filter on it numerically.
+        years = frame["release_date"].astype("string").str.slice(0, 4)
+        metadata = metadata.assign(
+            release_year=pd.to_numeric(years, errors="coerce").astype("Int64")
+        )
+    records = metadata.astype(object).where(metadata.notna(), None)
+    for content, record in zip(contents, records.to_dict("records"), strict=True):
+        yield Document(page_content=content, metadata=record)
 
 
 class KaggleCSVDataSource:
@@ -29,22 +270,62 @@ class KaggleCSVDataSource:
             dataset_handle: Kaggle dataset identifier (e.g., "user/dataset-name").
             csv_filename: Name of the CSV file within the dataset.
             content_column: Column name to use as document content.
-            **kwargs: Additional keyword arguments (e.g., drop_na).
+            **kwargs: Additional keyword arguments. "drop_na" (bool) drops rows
+                with a null in any column when loading the whole frame.
+                "metadata_columns" (list[str]) switches to the chunked, typed
+                CSVChunkLoader over only these columns, which also accepts
+                "required_columns", "chunksize" and "engine". With
+                "snapshot_dir" (str) set as well, the CSV is converted once per
+                dataset version into a Parquet snapshot that later loads read.
         """
         self._dataset_handle = dataset_handle
         self._csv_filename = csv_filename
         self._content_column = content_column
         self._drop_na = kwargs.get("drop_na", True)
+        self._metadata_columns: list[str] | None = kwargs.get("metadata_columns")
+        self._required_columns: list[str] = kwargs.get("required_columns", [])
+        self._chunksize: int = kwargs.get("chunksize", 50_000)
+        self._engine: CSVEngine | None = kwargs.get("engine")
+        self._snapshot_dir: str | None = kwargs.get("snapshot_dir")
 
     def get_loader(self) -> BaseLoader:
-        """Download the Kaggle dataset and return a configured DataFrameLoader.
+        """Download the Kaggle dataset and return a loader for the CSV file.
 
         Returns:
-            BaseLoader: A DataFrameLoader configured with the CSV data.
+            BaseLoader: A CSVChunkLoader streaming the selected columns if
+                metadata columns are configured, otherwise a DataFrameLoader
+                over the whole CSV data.
         """
-        data_dir = kagglehub.dataset_download(self._dataset_handle)
+        with metrics.timer("download"):
+            data_dir = kagglehub.dataset_download(self._dataset_handle)
 
         csv_path = os.path.join(data_dir, self._csv_filename)
+        if self._metadata_columns is not None and self._snapshot_dir:
+            parquet_path = self._snapshot_path(data_dir, csv_path)
+            try:
+                if not os.path.exists(parquet_path):
+                    logger.info("Writing Parquet snapshot %s", parquet_path)
+                    write_parquet_snapshot(csv_path, parquet_path)
+            except ImportError:
+                logger.warning("pyarrow is not installed, reading the CSV instead")
+            else:
+                return ParquetSnapshotLoader(
+                    parquet_path,
+                    content_column=self._content_column,
+                    metadata_columns=self._metadata_columns,
+                    required_columns=self._required_columns,
+                    batch_size=self._chunksize,
+                )
+        if self._metadata_columns is not None:
+            return CSVChunkLoader(
+                csv_path,
+                content_column=self._content_column,
+                metadata_columns=self._metadata_columns,
+                required_columns=self._required_columns,
+                chunksize=self._chunksize,
+                engine=self._engine,
+            )
+
         df = pd.read_csv(csv_path)
 
         if self._drop_na:
@@ -52,6 +333,29 @@ class KaggleCSVDataSource:
 
         return DataFrameLoader(df, page_content_column=self._content_column)
 
+    def _snapshot_path(self, data_dir: str, csv_path: str) -> str:
+        """Return the snapshot path for the downloaded dataset version.
+
+        kagglehub downloads into ``.../<owner>/<dataset>/versions/<n>``; if the
+        directory does not follow that layout, the CSV size and modification
+        time stand in for the version.
+        """
+        parent, version = os.path.split(os.path.normpath(data_dir))
+        if os.path.basename(parent) == "versions":
+            version = f"v{version}"
+        else:
+            stat = os.stat(csv_path)
+            version = hashlib.sha256(
+                f"{csv_path}:{stat.st_size}:{stat.st_mtime_ns}".encode()
+            ).hexdigest()[:16]
+        stem = os.path.splitext(self._csv_filename)[0]
+        return os.path.join(
+            self._snapshot_dir or "",
+            self._dataset_handle.replace("/", "__"),
+            version,
+            f"{stem}.parquet",
+        )
+
     @classmethod
     def from_env(cls) -> "KaggleCSVDataSource":
         """Factory method to create a KaggleCSVDataSource from environment variables.
@@ -60,13 +364,34 @@ class KaggleCSVDataSource:
             - KAGGLE_DATASET_HANDLE: Kaggle dataset identifier
             - CSV_FILENAME: Name of the CSV file (default: TMDB_all_movies.csv)
             - CSV_CONTENT_COLUMN: Column to use as content (default: overview)
+            - CSV_METADATA_COLUMNS: Comma-separated metadata columns to read
+              (empty to load every column)
+            - CSV_REQUIRED_COLUMNS: Comma-separated columns that must not be null
+            - CSV_CHUNKSIZE: Number of rows parsed at a time
+            - CSV_ENGINE: Optional pandas parser engine (e.g. pyarrow)
+            - DATASET_SNAPSHOT_DIR: Directory of Parquet snapshots (empty to
+              always parse the CSV)
 
         Returns:
             KaggleCSVDataSource: Configured instance from environment variables.
         """
+        metadata_columns = _split_columns(
+            os.getenv("CSV_METADATA_COLUMNS", config.CSV_METADATA_COLUMNS)
+        )
         return cls(
             dataset_handle=os.getenv("KAGGLE_DATASET_PATH", config.KAGGLE_DATASET_PATH),
             csv_filename=os.getenv("CSV_FILENAME", config.CSV_FILENAME),
             content_column=os.getenv("CSV_CONTENT_COLUMN", config.CSV_CONTENT_COLUMN),
             drop_na=True,
+            metadata_columns=metadata_columns or None,
+            required_columns=_split_columns(
+                os.getenv("CSV_REQUIRED_COLUMNS", config.CSV_REQUIRED_COLUMNS)
+            ),
+            chunksize=int(os.getenv("CSV_CHUNKSIZE", str(config.CSV_CHUNKSIZE))),
+            engine=os.getenv("CSV_ENGINE", config.CSV_ENGINE) or None,
+            snapshot_dir=os.getenv("DATASET_SNAPSHOT_DIR", config.DATASET_SNAPSHOT_DIR),
         )
+
+
+def _split_columns(value: str) -> list[str]:
+    return [column.strip() for column in value.split(",") if column.strip()]
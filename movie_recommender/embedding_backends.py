@@ -0,0 +1,103 @@
+from collections.abc import Sequence
+from dataclasses import dataclass
+from typing import Any
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+
+from movie_recommender.numpy_vectorstore import normalize
+
+# Quantized weights shipped in the "onnx/" folder of sentence-transformers
+# models, with int8 kernels for AVX2 CPUs. Other files of the folder, e.g.
+# "onnx/model_qint8_avx512_vnni.onnx", can be chosen with EMBEDDING_ONNX_FILE.
+DEFAULT_INT8_FILE = "onnx/model_quint8_avx2.onnx"
+BACKENDS = ("torch", "onnx", "onnx-int8")
+
+
+def backend_model_kwargs(backend: str, onnx_file: str = "") -> dict[str, Any]:
+    """Return the SentenceTransformer arguments selecting an inference backend.
+
+    "torch" runs the full-precision PyTorch model. "onnx" runs the same weights
+    exported to ONNX with onnxruntime, and "onnx-int8" runs dynamically
+    quantized int8 weights, which are several times faster on CPUs. Both ONNX
+    backends need the ``onnx`` extra (``sentence-transformers[onnx]``).
+
+    Args:
+        backend: One of ``BACKENDS``.
+        onnx_file: ONNX file of the model repository to load. Defaults to the
+            exported model for "onnx" and to ``DEFAULT_INT8_FILE`` for
+            "onnx-int8".
+
+    Returns:
+        dict[str, Any]: Keyword arguments for ``HuggingFaceEmbeddings``'s
+            ``model_kwargs``.
+
+    Raises:
+        ValueError: If the backend is not supported.
+    """
+    if backend == "torch":
+        return {}
+    if backend not in BACKENDS:
+        raise ValueError(
+            f"Unsupported embedding backend: {backend}, expected one of {BACKENDS}"
+        )
+    kwargs: dict[str, Any] = {"backend": "onnx"}
+    onnx_file = onnx_file or (DEFAULT_INT8_FILE if backend == "onnx-int8" else "")
+    if onnx_file:
+        kwargs["model_kwargs"] = {"file_name": onnx_file}
+    return kwargs
+
+
+@dataclass
+class ParityReport:
+    """Agreement of an embedding backend with a baseline model.
+
+    Attributes:
+        mean_cosine: Mean cosine similarity between the two embeddings of the
+            same text.
+        min_cosine: Lowest cosine similarity over all texts.
+        neighbor_agreement: Fraction of texts whose nearest other text is the
+            same under both models.
+    """
+
+    mean_cosine: float
+    min_cosine: float
+    neighbor_agreement: float
+
+    def passed(self, threshold: float = 0.99) -> bool:
+        """Whether every text's embeddings agree at least to ``threshold``."""
+        return self.min_cosine >= threshold
+
+
+def check_parity(
+    baseline: Embeddings, candidate: Embeddings, texts: Sequence[str]
+) -> ParityReport:
+    """Compare the embeddings of a candidate backend with a baseline model.
+
+    Vectors written by one backend are searched with queries embedded by the
+    other, e.g. after switching the CLI to int8 without re-indexing, so both
+    must agree closely on every text, not only on average.
+
+    Args:
+        baseline: The reference model, usually the "torch" backend.
+        candidate: The model to check.
+        texts: Sample texts, e.g. movie overviews and queries. At least two.
+
+    Returns:
+        ParityReport: How closely the candidate agrees with the baseline.
+    """
+    expected = normalize(np.asarray(baseline.embed_documents(list(texts))))
+    actual = normalize(np.asarray(candidate.embed_documents(list(texts))))
+    cosines = np.einsum("ij,ij->i", expected, actual)
+
+    def nearest_other(vectors: np.ndarray) -> np.ndarray:
+        scores = vectors @ vectors.T
+        np.fill_diagonal(scores, -np.inf)
+        return scores.argmax(axis=1)
+
+    agreement = nearest_other(expected) == nearest_other(actual)
+    return ParityReport(
+        mean_cosine=float(cosines.mean()),
+        min_cosine=float(cosines.min()),
+        neighbor_agreement=float(agreement.mean()),
+    )
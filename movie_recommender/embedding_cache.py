@@ -0,0 +1,210 @@
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS embeddings (
+    model TEXT NOT NULL,
+    text_hash BLOB NOT NULL,
+    vector BLOB NOT NULL,
+    last_used REAL NOT NULL,
+    PRIMARY KEY (model, text_hash)
+) WITHOUT ROWID
+"""
+_LRU_INDEX = "CREATE INDEX IF NOT EXISTS embeddings_lru ON embeddings (last_used)"
+_SQLITE_MAX_VARIABLES = 900
+
+
+@dataclass
+class CacheStats:
+    """Hit and miss counters of an embedding cache.
+
+    Attributes:
+        hits: Number of texts served from the cache.
+        misses: Number of texts that had to be embedded.
+        evictions: Number of entries removed to stay within the size limit.
+    """
+
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        """Fraction of lookups served from the cache."""
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+
+def text_hash(text: str) -> bytes:
+    """Return the binary SHA-256 digest used as the cache key of a text.
+
+    Args:
+        text: The text to hash.
+
+    Returns:
+        bytes: The 32-byte digest of the UTF-8 encoded text.
+    """
+    return hashlib.sha256(text.encode("utf-8")).digest()
+
+
+class CachedEmbeddings(Embeddings):
+    """Embeddings wrapper that persists document embeddings in SQLite.
+
+    Vectors are stored as float32 blobs keyed by model name and the SHA-256 of
+    the text, so re-indexing only embeds texts that have not been seen before.
+    When the cache grows beyond ``max_bytes`` the least recently used entries
+    are evicted. Query embeddings are passed through uncached.
+    """
+
+    def __init__(
+        self,
+        embeddings: Embeddings,
+        model_name: str,
+        path: str,
+        max_bytes: int | None = None,
+    ) -> None:
+        """Initialize the cache.
+
+        Args:
+            embeddings: The underlying embeddings model used on cache misses.
+            model_name: Name of the embedding model, part of every cache key.
+            path: Path of the SQLite database file. Parent directories are
+                created if needed.
+            max_bytes: Maximum total size of stored vectors in bytes. No
+                eviction takes place if None.
+        """
+        self._embeddings = embeddings
+        self._model_name = model_name
+        self._max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self.stats = CacheStats()
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(_SCHEMA)
+        self._conn.execute(_LRU_INDEX)
+        self._conn.commit()
+        self._size_bytes = self._conn.execute(
+            "SELECT COALESCE(SUM(LENGTH(vector)), 0) FROM embeddings"
+        ).fetchone()[0]
+
+    @property
+    def size_bytes(self) -> int:
+        """Total size of the vectors currently stored in the cache."""
+        return self._size_bytes
+
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        """Embed documents, serving previously seen texts from the cache.
+
+        Args:
+            texts: The texts to embed.
+
+        Returns:
+            list[list[float]]: One embedding per input text, in input order.
+        """
+        hashes = [text_hash(text) for text in texts]
+        with self._lock:
+            cached = self._lookup(set(hashes))
+
+        missing: dict[bytes, str] = {}
+        for digest, text in zip(hashes, texts, strict=True):
+            if digest not in cached and digest not in missing:
+                missing[digest] = text
+        self.stats.hits += len(texts) - len(missing)
+        self.stats.misses += len(missing)
+
+        if missing:
+            vectors = self._embeddings.embed_documents(list(missing.values()))
+            computed = {
+                digest: np.asarray(vector, dtype=np.float32)
+                for digest, vector in zip(missing, vectors, strict=True)
+            }
+            with self._lock:
+                self._store(computed)
+            cached.update(computed)
+
+        return [cached[digest].tolist() for digest in hashes]
+
+    def embed_query(self, text: str) -> list[float]:
+        """Embed a query text without caching it.
+
+        Args:
+            text: The text to embed.
+
+        Returns:
+            list[float]: The embedding of the query.
+        """
+        return self._embeddings.embed_query(text)
+
+    def close(self) -> None:
+        """Close the SQLite connection, and the wrapped model if it can be."""
+        self._conn.close()
+        close = getattr(self._embeddings, "close", None)
+        if close is not None:
+            close()
+
+    def _lookup(self, hashes: set[bytes]) -> dict[bytes, np.ndarray]:
+        found: dict[bytes, np.ndarray] = {}
+        keys = list(hashes)
+        for start in range(0, len(keys), _SQLITE_MAX_VARIABLES):
+            chunk = keys[start : start + _SQLITE_MAX_VARIABLES]
+            placeholders = ",".join("?" * len(chunk))
+            rows = self._conn.execute(
+                "SELECT text_hash, vector FROM embeddings "
+                f"WHERE model = ? AND text_hash IN ({placeholders})",
+                [self._model_name, *chunk],
+            )
+            for digest, blob in rows:
+                found[digest] = np.frombuffer(blob, dtype=np.float32)
+        if found:
+            now = time.time()
+            self._conn.executemany(
+                "UPDATE embeddings SET last_used = ? WHERE model = ? AND text_hash = ?",
+                [(now, self._model_name, digest) for digest in found],
+            )
+            self._conn.commit()
+        return found
+
+    def _store(self, vectors: dict[bytes, np.ndarray]) -> None:
+        now = time.time()
+        rows = [
+            (self._model_name, digest, vector.tobytes(), now)
+            for digest, vector in vectors.items()
+        ]
+        self._conn.executemany(
+            "INSERT OR REPLACE INTO embeddings (model, text_hash, vector, last_used) "
+            "VALUES (?, ?, ?, ?)",
+            rows,
+        )
+        self._size_bytes += sum(len(row[2]) for row in rows)
+        self._evict()
+        self._conn.commit()
+
+    def _evict(self) -> None:
+        if self._max_bytes is None or self._size_bytes <= self._max_bytes:
+            return
+        excess = self._size_bytes - self._max_bytes
+        victims = []
+        freed = 0
+        for model, digest, size in self._conn.execute(
+            "SELECT model, text_hash, LENGTH(vector) FROM embeddings ORDER BY last_used"
+        ):
+            victims.append((model, digest))
+            freed += size
+            if freed >= excess:
+                break
+        self._conn.executemany(
+            "DELETE FROM embeddings WHERE model = ? AND text_hash = ?", victims
+        )
+        self._size_bytes -= freed
+        self.stats.evictions += len(victims)
@@ -0,0 +1,186 @@
+import asyncio
+import re
+from collections.abc import Awaitable, Callable, Iterator, Sequence
+
+from langchain_core.messages import (
+    AIMessage,
+    BaseMessage,
+    HumanMessage,
+    SystemMessage,
+    ToolMessage,
+)
+from langchain_core.messages.utils import count_tokens_approximately
+
+# Matches titles in the repr of Document lists, JSON-like renderings and the
+# compact "title: ...; release_date: ..." lines of the recommendation tool.
+_TITLE_PATTERN = re.compile(
+    r"""['"]?\btitle['"]?\s*[:=]\s*(?:['"]([^'"]+)['"]|([^;\n]+))"""
+)
+_MAX_COMPACT_TOOL_CHARS = 200
+
+SUMMARY_PREFIX = "Summary of the earlier conversation:"
+
+
+def compact_tool_output(content: str) -> str:
+    """Shrink a consumed tool result to the movie titles it contained.
+
+    Args:
+        content: The content of the tool message.
+
+    Returns:
+        str: The titles found in the content, or a truncated copy of it if it
+            contains no titles.
+    """
+    titles = list(
+        dict.fromkeys(
+            quoted or bare.strip() for quoted, bare in _TITLE_PATTERN.findall(content)
+        )
+    )
+    if titles:
+        return "Previously found movies: " + ", ".join(titles)
+    if len(content) <= _MAX_COMPACT_TOOL_CHARS:
+        return content
+    return content[:_MAX_COMPACT_TOOL_CHARS] + "…"
+
+
+class ConversationHistory:
+    """Conversation messages kept within a token budget.
+
+    The leading system messages are pinned. After every turn, tool results
+    from earlier turns are reduced to the titles they contained, and if the
+    history still exceeds ``token_budget`` the oldest turns are dropped,
+    optionally folding them into a running summary first. A turn starts with a
+    human message and includes the tool calls and answers that follow it.
+    """
+
+    def __init__(
+        self,
+        system_messages: Sequence[SystemMessage],
+        token_budget: int | None = None,
+        keep_last_turns: int = 2,
+        token_counter: Callable[
+            [Sequence[BaseMessage]], int
+        ] = count_tokens_approximately,
+        summarizer: Callable[[str, Sequence[BaseMessage]], str] | None = None,
+        asummarizer: Callable[[str, Sequence[BaseMessage]], Awaitable[str]]
+        | None = None,
+    ) -> None:
+        """Initialize the history.
+
+        Args:
+            system_messages: Messages pinned at the start of the history.
+            token_budget: Maximum number of tokens of the history. Unbounded if
+                None.
+            keep_last_turns: Number of most recent turns that are never dropped.
+            token_counter: Function counting the tokens of a list of messages.
+            summarizer: Optional function receiving the previous summary and the
+                messages about to be dropped, returning an updated summary.
+            asummarizer: Optional async variant of ``summarizer`` used by
+                :meth:`aadd_messages`. Without it, :meth:`aadd_messages` runs
+                ``summarizer`` in a worker thread.
+        """
+        self._system_messages = list(system_messages)
+        self._token_budget = token_budget
+        self._keep_last_turns = keep_last_turns
+        self._token_counter = token_counter
+        self._summarizer = summarizer
+        self._asummarizer = asummarizer
+        self._summary = ""
+        self._turns: list[list[BaseMessage]] = []
+
+    @property
+    def messages(self) -> list[BaseMessage]:
+        """All messages to send to the model, in order."""
+        messages: list[BaseMessage] = list(self._system_messages)
+        if self._summary:
+            messages.append(SystemMessage(f"{SUMMARY_PREFIX} {self._summary}"))
+        for turn in self._turns:
+            messages.extend(turn)
+        return messages
+
+    def count_tokens(self) -> int:
+        """Return the number of tokens of the current history."""
+        return self._token_counter(self.messages)
+
+    def add_user_message(self, message: HumanMessage) -> None:
+        """Start a new turn with the user's message.
+
+        Args:
+            message: The user's message.
+        """
+        self._turns.append([message])
+
+    def add_messages(self, messages: Sequence[BaseMessage]) -> None:
+        """Append the agent's messages to the current turn and compact.
+
+        Args:
+            messages: The tool calls, tool results and answer of the turn.
+        """
+        self._append(messages)
+        for dropped in self._drop_over_budget():
+            if self._summarizer is not None:
+                self._summary = self._summarizer(self._summary, dropped)
+
+    async def aadd_messages(self, messages: Sequence[BaseMessage]) -> None:
+        """Append the agent's messages without blocking the event loop.
+
+        Like :meth:`add_messages`, but dropped turns are summarized with the
+        async summarizer, so other conversations on the loop keep running.
+
+        Args:
+            messages: The tool calls, tool results and answer of the turn.
+        """
+        self._append(messages)
+        for dropped in self._drop_over_budget():
+            if self._asummarizer is not None:
+                self._summary = await self._asummarizer(self._summary, dropped)
+            elif self._summarizer is not None:
+                self._summary = await asyncio.to_thread(
+                    self._summarizer, self._summary, dropped
+                )
+
+    def _append(self, messages: Sequence[BaseMessage]) -> None:
+        if not self._turns:
+            self._turns.append([])
+        self._turns[-1].extend(messages)
+        for turn in self._turns[:-1]:
+            for i, message in enumerate(turn):
+                if isinstance(message, ToolMessage) and isinstance(
+                    message.content, str
+                ):
+                    compact = compact_tool_output(message.content)
+                    if compact != message.content:
+                        turn[i] = message.model_copy(update={"content": compact})
+
+    def _drop_over_budget(self) -> Iterator[list[BaseMessage]]:
+        # Yields every dropped turn; the caller folds it into the summary
+        # before the budget is checked again.
+        if self._token_budget is None:
+            return
+        while (
+            len(self._turns) > self._keep_last_turns
+            and self.count_tokens() > self._token_budget
+        ):
+            yield self._turns.pop(0)
+
+
+def transcript(messages: Sequence[BaseMessage]) -> str:
+    """Render messages as a plain-text transcript, e.g. for summarization.
+
+    Args:
+        messages: The messages to render.
+
+    Returns:
+        str: One line per human or AI message with text content.
+    """
+    lines = []
+    for message in messages:
+        if isinstance(message, HumanMessage):
+            role = "User"
+        elif isinstance(message, AIMessage):
+            role = "Assistant"
+        else:
+            continue
+        if message.text:
+            lines.append(f"{role}: {message.text}")
+    return "\n".join(lines)
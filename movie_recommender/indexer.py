@@ -1,35 +1,270 @@
+import logging
+import time
+from collections.abc import Callable, Iterable, Iterator
+from dataclasses import dataclass
+from itertools import batched, islice
+from typing import Any, Protocol
+
 from langchain_core.document_loaders import BaseLoader
+from langchain_core.documents import Document
 from langchain_core.vectorstores import VectorStore
 
+from movie_recommender import metrics
+from movie_recommender.bm25 import BM25IndexBuilder
+from movie_recommender.manifest import IndexManifest, document_id, fingerprint
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BATCH_SIZE = 256
+
+
+class DocumentWriter(Protocol):
+    """Anything that stores document batches like ``VectorStore.add_documents``."""
+
+    def add_documents(self, documents: list[Document], **kwargs: Any) -> list[str]: ...
+
+
+@dataclass
+class IndexingStats:
+    """Progress and throughput of an indexing run.
+
+    Attributes:
+        documents: Number of documents written to the vector store so far.
+        batches: Number of batches written to the vector store so far.
+        elapsed: Seconds elapsed since the indexing run started.
+    """
+
+    documents: int = 0
+    batches: int = 0
+    elapsed: float = 0.0
+
+    @property
+    def docs_per_second(self) -> float:
+        """Average indexing throughput in documents per second."""
+        if self.elapsed <= 0:
+            return 0.0
+        return self.documents / self.elapsed
+
+
+@dataclass
+class IncrementalIndexingStats(IndexingStats):
+    """Progress of an incremental indexing run.
+
+    Attributes:
+        inserted: Number of documents added that were not in the store before.
+        updated: Number of documents whose content changed and were re-written.
+        deleted: Number of documents removed because they left the dataset.
+        skipped: Number of unchanged documents that were not re-written.
+    """
+
+    inserted: int = 0
+    updated: int = 0
+    deleted: int = 0
+    skipped: int = 0
+
+
+def batch_documents(
+    documents: Iterable[Document], batch_size: int
+) -> Iterator[list[Document]]:
+    """Group a document stream into fixed-size batches.
+
+    Args:
+        documents: The documents to group. Consumed lazily.
+        batch_size: Maximum number of documents per batch.
+
+    Yields:
+        list[Document]: Consecutive batches of at most ``batch_size`` documents.
+
+    Raises:
+        ValueError: If ``batch_size`` is smaller than 1.
+    """
+    if batch_size < 1:
+        raise ValueError(f"batch_size must be at least 1, got {batch_size}")
+    for batch in batched(documents, batch_size):
+        yield list(batch)
+
 
 class MovieIndexer:
     """Indexes movie data using a provided loader and vector store.
 
-    This class takes a document loader and vector store, loads movie documents,
-    and indexes them into the vector store for similarity search.
+    This class takes a document loader and vector store, streams movie documents
+    from the loader in fixed-size batches, and indexes each batch into the vector
+    store as it arrives, so memory stays bounded regardless of dataset size.
+    Optionally, every document is also fed to a lexical index builder.
     """
 
-    def __init__(self, loader: BaseLoader, vector_store: VectorStore) -> None:
+    def __init__(
+        self,
+        loader: BaseLoader,
+        vector_store: VectorStore,
+        lexical_index: BM25IndexBuilder | None = None,
+    ) -> None:
         """Initialize the MovieIndexer.
 
         Args:
             loader: The data loader to load movie data.
             vector_store: The vector store to index the data into.
+            lexical_index: Optional BM25 index builder receiving every document
+                with its vector store id, including unchanged documents of an
+                incremental run.
         """
         self._loader = loader
         self._vector_store = vector_store
+        self._lexical_index = lexical_index
 
-    def index(self, **kwargs) -> None:
+    def index(
+        self,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        add_limit: int | None = None,
+        on_progress: Callable[[IndexingStats], None] | None = None,
+        id_key: str | None = None,
+        writer: DocumentWriter | None = None,
+        manifest: IndexManifest | None = None,
+    ) -> IndexingStats:
         """Index the movie data.
 
-        Loads documents using the loader and adds them to the vector store.
+        Lazily loads documents using the loader and adds them to the vector store
+        one batch at a time. Progress and throughput are logged after each batch.
+        Parsing, writing and lexical indexing of every batch are timed as the
+        "index_parse", "index_write" and "index_lexical" stages, see
+        :mod:`movie_recommender.metrics`.
+
         Args:
-            **kwargs: Additional keyword arguments for loading or indexing, if needed.
-        """
-        documents = self._loader.load()
+            batch_size: Number of documents sent to the vector store per call.
+            add_limit: Maximum number of documents to index, if any.
+            on_progress: Optional callback invoked with the running statistics
+                after every batch.
+            id_key: Metadata key holding a stable source id. If given, documents
+                are stored under ids derived from it, so a later incremental
+                run updates them in place.
+            writer: Optional writer receiving the batches instead of the vector
+                store, e.g. a :class:`~movie_recommender.pg_bulk_load.PGBulkLoader`
+                copying them into the store's table.
+            manifest: Optional manifest recording the fingerprint of every
+                written document, so a later incremental run skips unchanged
+                documents. Requires ``id_key``.
+
+        Returns:
+            IndexingStats: Totals and throughput of the indexing run.
 
-        add_limit = kwargs.get("add_limit")
+        Raises:
+            ValueError: If a manifest is given without ``id_key``.
+        """
+        if manifest is not None and id_key is None:
+            raise ValueError("Recording a manifest requires an id_key.")
+        documents: Iterable[Document] = self._loader.lazy_load()
         if add_limit is not None:
-            documents = documents[:add_limit]
+            documents = islice(documents, add_limit)
+
+        sink: DocumentWriter = self._vector_store if writer is None else writer
+        stats = IndexingStats()
+        run = manifest.start_run() if manifest is not None else 0
+        start = time.perf_counter()
+        batches = metrics.timed(batch_documents(documents, batch_size), "index_parse")
+        for batch in batches:
+            ids = None
+            if id_key is not None:
+                ids = [document_id(doc, id_key) for doc in batch]
+            fingerprints: dict[str, bytes] = {}
+            if manifest is not None and ids is not None:
+                fingerprints = {
+                    doc_id: fingerprint(doc)
+                    for doc_id, doc in zip(ids, batch, strict=True)
+                }
+            with metrics.timer("index_write"):
+                ids = sink.add_documents(batch, ids=ids)
+            if manifest is not None:
+                manifest.record(fingerprints, run)
+            if self._lexical_index is not None:
+                with metrics.timer("index_lexical"):
+                    self._lexical_index.add_documents(batch, ids)
+            stats.documents += len(batch)
+            stats.batches += 1
+            stats.elapsed = time.perf_counter() - start
+            logger.info(
+                "Indexed %d documents in %d batches (%.1f docs/s)",
+                stats.documents,
+                stats.batches,
+                stats.docs_per_second,
+            )
+            if on_progress is not None:
+                on_progress(stats)
+
+        stats.elapsed = time.perf_counter() - start
+        return stats
+
+    def index_incremental(
+        self,
+        manifest: IndexManifest,
+        id_key: str = "id",
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        on_progress: Callable[[IncrementalIndexingStats], None] | None = None,
+    ) -> IncrementalIndexingStats:
+        """Bring the vector store in line with the current dataset snapshot.
+
+        Every document gets a stable id derived from its ``id_key`` metadata and
+        a content fingerprint. Documents that are new or whose fingerprint
+        changed are upserted, unchanged documents are skipped and documents
+        recorded in the manifest but missing from the dataset are deleted.
+
+        Args:
+            manifest: Record of the documents currently held in the store.
+            id_key: Metadata key holding the stable source id (e.g. TMDB id).
+            batch_size: Number of documents compared and written per batch.
+            on_progress: Optional callback invoked with the running statistics
+                after every batch.
+
+        Returns:
+            IncrementalIndexingStats: Counts of inserts, updates, deletes and
+                skips of the run.
+        """
+        stats = IncrementalIndexingStats()
+        run = manifest.start_run()
+        start = time.perf_counter()
+        batches = metrics.timed(
+            batch_documents(self._loader.lazy_load(), batch_size), "index_parse"
+        )
+        for batch in batches:
+            latest = {document_id(doc, id_key): doc for doc in batch}
+            fingerprints = {doc_id: fingerprint(doc) for doc_id, doc in latest.items()}
+            known = manifest.fingerprints(list(latest))
+
+            changed_ids = [
+                doc_id for doc_id, fp in fingerprints.items() if known.get(doc_id) != fp
+            ]
+            if changed_ids:
+                with metrics.timer("index_write"):
+                    self._vector_store.add_documents(
+                        [latest[doc_id] for doc_id in changed_ids], ids=changed_ids
+                    )
+            manifest.record(fingerprints, run)
+            if self._lexical_index is not None:
+                self._lexical_index.add_documents(latest.values(), list(latest))
+
+            updated = sum(1 for doc_id in changed_ids if doc_id in known)
+            stats.updated += updated
+            stats.inserted += len(changed_ids) - updated
+            stats.skipped += len(latest) - len(changed_ids)
+            stats.documents += len(batch)
+            stats.batches += 1
+            stats.elapsed = time.perf_counter() - start
+            logger.info(
+                "Compared %d documents: %d inserted, %d updated, %d skipped "
+                "(%.1f docs/s)",
+                stats.documents,
+                stats.inserted,
+                stats.updated,
+                stats.skipped,
+                stats.docs_per_second,
+            )
+            if on_progress is not None:
+                on_progress(stats)
+
+        while stale := manifest.stale_ids(run, batch_size):
+            self._vector_store.delete(ids=stale)
+            manifest.remove(stale)
+            stats.deleted += len(stale)
+        logger.info("Deleted %d documents no longer in the dataset", stats.deleted)
 
-        self._vector_store.add_documents(documents)
+        stats.elapsed = time.perf_counter() - start
+        return stats
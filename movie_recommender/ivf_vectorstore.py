@@ -0,0 +1,211 @@
+import math
+import os
+from collections.abc import Sequence
+from typing import Any
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+
+from movie_recommender.numpy_vectorstore import NumpyVectorStore, normalize, top_k
+
+# Number of rows assigned to their nearest centroid per matrix product.
+_ASSIGN_BLOCK_ROWS = 65_536
+_INDEX_FILE = "ivf_index.npz"
+
+
+def spherical_kmeans(
+    vectors: np.ndarray, n_clusters: int, iterations: int = 10, seed: int = 0
+) -> np.ndarray:
+    """Cluster unit vectors by cosine similarity.
+
+    Args:
+        vectors: Unit row vectors to cluster.
+        n_clusters: Number of clusters.
+        iterations: Number of Lloyd iterations.
+        seed: Seed of the random centroid initialization.
+
+    Returns:
+        np.ndarray: Unit centroids of shape (n_clusters, dim).
+    """
+    rng = np.random.default_rng(seed)
+    vectors = vectors.astype(np.float32, copy=False)
+    centroids = vectors[rng.choice(len(vectors), n_clusters, replace=False)].copy()
+    for _ in range(iterations):
+        assignments = assign(vectors, centroids)
+        order = np.argsort(assignments, kind="stable")
+        counts = np.bincount(assignments, minlength=n_clusters)
+        empty = counts == 0
+        starts = np.concatenate([[0], np.cumsum(counts)[:-1]])
+        sums = np.zeros_like(centroids)
+        sums[~empty] = np.add.reduceat(vectors[order], starts[~empty], axis=0)
+        # Re-seed empty clusters with random vectors instead of dropping them.
+        sums[empty] = vectors[rng.choice(len(vectors), int(empty.sum()))]
+        centroids = normalize(sums)
+    return centroids
+
+
+def assign(vectors: np.ndarray, centroids: np.ndarray) -> np.ndarray:
+    """Assign each vector to the centroid with the highest inner product.
+
+    Args:
+        vectors: Row vectors to assign.
+        centroids: Unit centroids.
+
+    Returns:
+        np.ndarray: The int32 centroid index of every vector.
+    """
+    assignments = np.empty(len(vectors), dtype=np.int32)
+    for start in range(0, len(vectors), _ASSIGN_BLOCK_ROWS):
+        block = vectors[start : start + _ASSIGN_BLOCK_ROWS].astype(np.float32)
+        assignments[start : start + len(block)] = np.argmax(block @ centroids.T, axis=1)
+    return assignments
+
+
+class IVFVectorStore(NumpyVectorStore):
+    """Approximate vector store using an inverted file (IVF) index.
+
+    Vectors are partitioned into ``n_lists`` clusters by spherical k-means. A
+    query is compared with the cluster centroids first and only the vectors of
+    the ``n_probe`` closest clusters are scored exactly. Raising ``n_probe``
+    trades latency for recall; ``n_probe == n_lists`` is an exact search.
+
+    The index is (re)built lazily on the first search after the store changed,
+    or explicitly with :meth:`build_index`. Stores smaller than
+    ``min_index_size`` are always searched exhaustively, and so are filtered
+    searches matching fewer than ``min_index_size`` rows or too few rows in the
+    probed clusters.
+    """
+
+    def __init__(
+        self,
+        embedding: Embeddings,
+        n_lists: int | None = None,
+        n_probe: int = 8,
+        min_index_size: int = 10_000,
+        train_size: int = 100_000,
+        **kwargs: Any,
+    ) -> None:
+        """Initialize the store.
+
+        Args:
+            embedding: The embeddings model used for texts and queries.
+            n_lists: Number of clusters. Defaults to 4 * sqrt(number of rows).
+            n_probe: Number of clusters scored per query.
+            min_index_size: Row count below which searches stay exhaustive.
+            train_size: Maximum number of rows sampled to train the clusters.
+            **kwargs: Passed on to :class:`NumpyVectorStore`.
+
+        Raises:
+            ValueError: If ``n_lists`` or ``n_probe`` is smaller than 1.
+        """
+        if n_probe < 1 or (n_lists is not None and n_lists < 1):
+            raise ValueError("n_lists and n_probe must be at least 1")
+        super().__init__(embedding, **kwargs)
+        self._n_lists = n_lists
+        self.n_probe = n_probe
+        self._min_index_size = min_index_size
+        self._train_size = train_size
+        self._centroids: np.ndarray | None = None
+        self._list_rows = np.empty(0, dtype=np.int32)
+        self._list_offsets = np.zeros(1, dtype=np.int64)
+        self._index_stale = True
+
+    def add_embeddings(
+        self,
+        texts: Sequence[str],
+        embeddings: Sequence[Sequence[float]] | np.ndarray,
+        metadatas: Sequence[dict[str, Any]] | None = None,
+        ids: Sequence[str | None] | None = None,
+    ) -> list[str]:
+        """Add texts with precomputed embeddings and mark the index stale.
+
+        See :meth:`NumpyVectorStore.add_embeddings`.
+        """
+        self._index_stale = True
+        return super().add_embeddings(texts, embeddings, metadatas, ids)
+
+    def delete(self, ids: list[str] | None = None, **kwargs: Any) -> bool | None:
+        """Delete documents by id and mark the index stale.
+
+        See :meth:`NumpyVectorStore.delete`.
+        """
+        self._index_stale = True
+        return super().delete(ids, **kwargs)
+
+    def build_index(self, seed: int = 0) -> None:
+        """Train the clusters and build the inverted lists.
+
+        Args:
+            seed: Seed of the training sample and centroid initialization.
+        """
+        vectors = self.vectors
+        n_lists = self._n_lists or max(1, int(4 * math.sqrt(len(vectors))))
+        n_lists = min(n_lists, len(vectors))
+        rng = np.random.default_rng(seed)
+        sample = vectors
+        if len(vectors) > self._train_size:
+            sample = vectors[
+                np.sort(rng.choice(len(vectors), self._train_size, replace=False))
+            ]
+        self._centroids = spherical_kmeans(sample, n_lists, seed=seed)
+
+        assignments = assign(vectors, self._centroids)
+        self._list_rows = np.argsort(assignments, kind="stable").astype(np.int32)
+        counts = np.bincount(assignments, minlength=n_lists)
+        self._list_offsets = np.concatenate([[0], np.cumsum(counts)])
+        self._index_stale = False
+
+    def _save_files(self, directory: str) -> None:
+        """Write the store and its trained IVF index to a version directory.
+
+        See :meth:`NumpyVectorStore.save`. The index is built first if needed,
+        so loading the snapshot does not have to retrain the clusters.
+        """
+        super()._save_files(directory)
+        if len(self) < self._min_index_size:
+            return
+        if self._index_stale:
+            self.build_index()
+        assert self._centroids is not None
+        with open(os.path.join(directory, _INDEX_FILE), "wb") as file:
+            np.savez(
+                file,
+                centroids=self._centroids,
+                list_rows=self._list_rows,
+                list_offsets=self._list_offsets,
+            )
+
+    def _load_files(self, directory: str) -> None:
+        """Read the IVF index saved with the store, if any."""
+        index_path = os.path.join(directory, _INDEX_FILE)
+        if os.path.exists(index_path):
+            with np.load(index_path) as index:
+                self._centroids = index["centroids"]
+                self._list_rows = index["list_rows"]
+                self._list_offsets = index["list_offsets"]
+            self._index_stale = False
+
+    def _search(
+        self, query: np.ndarray, k: int, mask: np.ndarray | None = None
+    ) -> tuple[np.ndarray, np.ndarray]:
+        if len(self) < self._min_index_size or (
+            mask is not None and np.count_nonzero(mask) < self._min_index_size
+        ):
+            return super()._search(query, k, mask)
+        if self._index_stale:
+            self.build_index()
+        assert self._centroids is not None
+
+        probes, _ = top_k(self._centroids @ query, self.n_probe)
+        candidates = np.concatenate(
+            [
+                self._list_rows[self._list_offsets[p] : self._list_offsets[p + 1]]
+                for p in probes
+            ]
+        )
+        if mask is not None:
+            candidates = candidates[mask[candidates]]
+            if len(candidates) < k:
+                return super()._search(query, k, mask)
+        positions, scores = top_k(self._scores(self.vectors[candidates], query), k)
+        return candidates[positions], scores
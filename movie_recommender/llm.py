@@ -1,11 +1,20 @@
-from typing import Any
+import copy
+from collections.abc import AsyncIterator, Iterable, Iterator, Sequence
+from dataclasses import dataclass, field
+from typing import Any, Literal, cast
 
 from langchain.agents import create_agent
 from langchain.chat_models import init_chat_model
-from langchain.messages import HumanMessage, SystemMessage
+from langchain.messages import AIMessage, HumanMessage, SystemMessage
 from langchain_core.globals import set_debug
 from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import AIMessageChunk, BaseMessage, ToolMessage
+from langchain_core.runnables import RunnableConfig
 from langgraph.graph.state import CompiledStateGraph
+from langgraph.types import StreamMode
+
+from movie_recommender.history import ConversationHistory, transcript
+from movie_recommender.metrics import MetricsCallbackHandler
 
 SYSTEM_MESSAGE = """
 You are a cinephile who loves to help find the perfect movie for your users. You are considerate of the user's wishes and want to find the most satisfying movie for the user to recommend. Hereby you undergo the following strategy:
@@ -18,6 +27,8 @@ You are a cinephile who loves to help find the perfect movie for your users. You
 6. Find out if they recently found some actors, directors or other involved interesting and would watch one of their projects?
 
 You can always jump steps if the previous answer also covered the step. A step is not bounded to only one question, but can be a sequence of questions until you consider the step done. After every step you are already free to suggest a movie. Continue the steps by yourself to narrow the requirements down given by the user until the user is happy with your answer.
+When searching for movies, pass the period, language, genres and blockbuster-vs-indie preferences you found out as the structured arguments of the search tool instead of only mentioning them in the query.
+When the user asks for movies like a movie they name, look up that movie's neighbours with the similar movies tool, if you have it, instead of describing the movie in a search query.
 Make sure you don't keep asking the same type of question over and over again. Be creative in your questioning.
 Also avoid starting your responses with the same phrases all the time.
 
@@ -27,6 +38,31 @@ Limit yourself to one question per turn. Keep your responses short and coherent.
 Make your response visually appealing and easy to read by using console markup from the rich python library where appropriate and avoid markdown syntax like putting text between asterisk.
 """  # noqa: E501
 
+INTRODUCTION_PROMPT = "Introduce yourself."
+# Tokens come from "messages", complete tool calls and results from "values".
+_STREAM_MODES: list[StreamMode] = ["messages", "values"]
+
+SUMMARY_INSTRUCTION = """
+Update the summary of a conversation between a user and a movie recommendation assistant with the new transcript below. Keep the user's stated preferences and the movies already recommended. Answer with the updated summary only, in a few sentences.
+"""  # noqa: E501
+
+
+@dataclass
+class ChatEvent:
+    """Progress of a streamed answer, see :meth:`MovieRecommenderLLM.stream_chat`.
+
+    Attributes:
+        kind: "token" for a piece of model output, "tool_call" when the agent
+            calls a tool, "tool_result" when a tool returned and "answer" for
+            the complete answer, which is always the last event.
+        text: The token, the tool's name or the answer.
+        args: The arguments of a tool call.
+    """
+
+    kind: Literal["token", "tool_call", "tool_result", "answer"]
+    text: str
+    args: dict[str, Any] = field(default_factory=dict)
+
 
 class MovieRecommenderLLM:
     """A movie recommender chatbot powered by a Large Language Model.
@@ -42,6 +78,8 @@ class MovieRecommenderLLM:
         model: BaseChatModel | None = None,
         model_name: str | None = None,
         do_set_debug: bool = False,
+        history_token_budget: int | None = None,
+        summarize_history: bool = False,
         **kwargs: Any,
     ) -> None:
         """Initialize the MovieRecommenderLLM.
@@ -50,6 +88,11 @@ class MovieRecommenderLLM:
             model: Pre-initialized chat model instance.
             model_name: Name of the model to initialize (e.g., "claude-haiku-4-5...").
             do_set_debug: Whether to enable LangChain debug mode.
+            history_token_budget: Maximum number of tokens of conversation
+                history sent to the model. Older turns are dropped beyond it.
+                Unbounded if None.
+            summarize_history: Whether dropped turns are folded into a running
+                summary by the model instead of being forgotten.
             **kwargs: Additional keyword arguments passed to model initialization.
 
         Raises:
@@ -64,14 +107,46 @@ class MovieRecommenderLLM:
         self._agent = None
         self._tools = []
         self._kwargs = kwargs
-        self._conversation: list[SystemMessage | HumanMessage] = [
-            SystemMessage(SYSTEM_MESSAGE),
-            SystemMessage(
-                """
-                You start the conversation with introducing yourself as 'Cinephile Bot' and a short explanation of your task.
-                """  # noqa: E501
-            ),
-        ]
+        self._history_token_budget = history_token_budget
+        self._summarize_history = summarize_history
+        self._history = self._new_history()
+        self.turn_prompt_tokens: list[int] = []
+
+    def _new_history(self) -> ConversationHistory:
+        return ConversationHistory(
+            [
+                SystemMessage(SYSTEM_MESSAGE),
+                SystemMessage(
+                    """
+                    You start the conversation with introducing yourself as 'Cinephile Bot' and a short explanation of your task.
+                    """  # noqa: E501
+                ),
+            ],
+            token_budget=self._history_token_budget,
+            summarizer=self._summarize if self._summarize_history else None,
+            asummarizer=self._asummarize if self._summarize_history else None,
+        )
+
+    def new_session(self) -> "MovieRecommenderLLM":
+        """Start another conversation sharing this bot's model, tools and agent.
+
+        The agent graph is compiled once and reused, so a server can hold many
+        conversations that only differ in their history. Sessions are
+        independent: tools set on one are not seen by the others.
+
+        Returns:
+            MovieRecommenderLLM: A bot with an empty conversation history.
+        """
+        session = copy.copy(self)
+        session._model = self.model
+        session._agent = self.agent
+        session._history = session._new_history()
+        session.turn_prompt_tokens = []
+        return session
+
+    @property
+    def _conversation(self) -> list[BaseMessage]:
+        return self._history.messages
 
     def set_tools(self, tools: list) -> None:
         """Set the tools for the agent.
@@ -117,7 +192,7 @@ class MovieRecommenderLLM:
         Returns:
             str: The bot's introduction and explanation of its purpose.
         """
-        return self.chat("Introduce yourself.")
+        return self.chat(INTRODUCTION_PROMPT)
 
     def chat(self, user_input: str) -> str:
         """Process user input and generate a response.
@@ -128,14 +203,189 @@ class MovieRecommenderLLM:
         Returns:
             str: The agent's response as a string.
         """
-        self._conversation.append(HumanMessage(user_input))
+        self._history.add_user_message(HumanMessage(user_input))
+        prompt = self._history.messages
         for step in self.agent.stream(
-            {"messages": self._conversation},
+            {"messages": prompt},
             stream_mode="values",
+            config=_run_config(),
         ):
-            response = step["messages"][-1]
-        self._conversation.append(response)
-        return response.content
+            state = step["messages"]
+        return self._finish_turn(prompt, state[len(prompt) :])
+
+    async def aintroduce(self) -> str:
+        """Asynchronously get the bot's introduction message.
+
+        Returns:
+            str: The bot's introduction and explanation of its purpose.
+        """
+        return await self.achat(INTRODUCTION_PROMPT)
+
+    async def achat(self, user_input: str) -> str:
+        """Asynchronously process user input and generate a response.
+
+        Uses the agent's ``astream``, so tool calls with an async implementation
+        run on the event loop and many conversations can share one process.
+
+        Args:
+            user_input: The user's message or question.
+
+        Returns:
+            str: The agent's response as a string.
+        """
+        self._history.add_user_message(HumanMessage(user_input))
+        prompt = self._history.messages
+        async for step in self.agent.astream(
+            {"messages": prompt},
+            stream_mode="values",
+            config=_run_config(),
+        ):
+            state = step["messages"]
+        return await self._afinish_turn(prompt, state[len(prompt) :])
+
+    def stream_introduce(self) -> Iterator[ChatEvent]:
+        """Stream the bot's introduction message.
+
+        Yields:
+            ChatEvent: The events of the introduction, see :meth:`stream_chat`.
+        """
+        return self.stream_chat(INTRODUCTION_PROMPT)
+
+    def stream_chat(self, user_input: str) -> Iterator[ChatEvent]:
+        """Process user input and stream the response as it is generated.
+
+        Model output is yielded token by token, so it can be shown long
+        before the answer is complete, and tool calls and results are yielded
+        while retrieval runs. The turn is added to the history once the
+        iterator is exhausted.
+
+        Args:
+            user_input: The user's message or question.
+
+        Yields:
+            ChatEvent: Tokens, tool calls and tool results, then the answer.
+        """
+        self._history.add_user_message(HumanMessage(user_input))
+        prompt = self._history.messages
+        state = prompt
+        for mode, payload in self.agent.stream(
+            {"messages": prompt}, stream_mode=_STREAM_MODES, config=_run_config()
+        ):
+            if mode == "values":
+                values = cast(dict[str, Any], payload)
+                new_messages = values["messages"][len(state) :]
+                state = values["messages"]
+                yield from _message_events(new_messages)
+            else:
+                message, _metadata = cast(tuple[BaseMessage, dict[str, Any]], payload)
+                yield from _token_events(message)
+        yield ChatEvent("answer", self._finish_turn(prompt, state[len(prompt) :]))
+
+    async def astream_chat(self, user_input: str) -> AsyncIterator[ChatEvent]:
+        """Asynchronously process user input and stream the response.
+
+        Args:
+            user_input: The user's message or question.
+
+        Yields:
+            ChatEvent: Tokens, tool calls and tool results, then the answer,
+                as in :meth:`stream_chat`.
+        """
+        self._history.add_user_message(HumanMessage(user_input))
+        prompt = self._history.messages
+        state = prompt
+        async for mode, payload in self.agent.astream(
+            {"messages": prompt}, stream_mode=_STREAM_MODES, config=_run_config()
+        ):
+            if mode == "values":
+                values = cast(dict[str, Any], payload)
+                new_messages = values["messages"][len(state) :]
+                state = values["messages"]
+                for event in _message_events(new_messages):
+                    yield event
+            else:
+                message, _metadata = cast(tuple[BaseMessage, dict[str, Any]], payload)
+                for event in _token_events(message):
+                    yield event
+        answer = await self._afinish_turn(prompt, state[len(prompt) :])
+        yield ChatEvent("answer", answer)
+
+    @property
+    def last_prompt_tokens(self) -> int:
+        """Prompt tokens sent to the model in the most recent turn."""
+        return self.turn_prompt_tokens[-1] if self.turn_prompt_tokens else 0
+
+    def _finish_turn(
+        self, prompt: Sequence[BaseMessage], new_messages: Sequence[BaseMessage]
+    ) -> str:
+        """Record the agent's messages of a turn and return its answer."""
+        self._record_prompt_tokens(new_messages)
+        self._history.add_messages(new_messages)
+        return new_messages[-1].text
+
+    async def _afinish_turn(
+        self, prompt: Sequence[BaseMessage], new_messages: Sequence[BaseMessage]
+    ) -> str:
+        """Like :meth:`_finish_turn`, but summarizes without blocking the loop."""
+        self._record_prompt_tokens(new_messages)
+        await self._history.aadd_messages(new_messages)
+        return new_messages[-1].text
+
+    def _record_prompt_tokens(self, new_messages: Sequence[BaseMessage]) -> None:
+        reported = [
+            message.usage_metadata["input_tokens"]
+            for message in new_messages
+            if isinstance(message, AIMessage) and message.usage_metadata
+        ]
+        self.turn_prompt_tokens.append(
+            sum(reported) if reported else self._history.count_tokens()
+        )
+
+    def _summarize(self, summary: str, messages: Sequence[BaseMessage]) -> str:
+        """Fold dropped messages into the running conversation summary."""
+        response = self.model.invoke(_summary_prompt(summary, messages))
+        return response.text
+
+    async def _asummarize(self, summary: str, messages: Sequence[BaseMessage]) -> str:
+        """Fold dropped messages into the summary with an async model call."""
+        response = await self.model.ainvoke(_summary_prompt(summary, messages))
+        return response.text
+
+
+def _summary_prompt(summary: str, messages: Sequence[BaseMessage]) -> list[BaseMessage]:
+    return [
+        SystemMessage(SUMMARY_INSTRUCTION),
+        HumanMessage(
+            f"Current summary: {summary or '(none)'}\n\n"
+            f"New transcript:\n{transcript(messages)}"
+        ),
+    ]
+
+
+def _run_config() -> RunnableConfig:
+    # Times model and tool calls of the turn, see movie_recommender.metrics.
+    return RunnableConfig(callbacks=[MetricsCallbackHandler()])
+
+
+def _token_events(message: BaseMessage) -> list[ChatEvent]:
+    """Translate a message chunk of the "messages" stream mode into events."""
+    if isinstance(message, AIMessageChunk) and message.text:
+        return [ChatEvent("token", message.text)]
+    return []
+
+
+def _message_events(messages: Iterable[BaseMessage]) -> list[ChatEvent]:
+    """Translate messages added to the agent state into tool events."""
+    events = []
+    for message in messages:
+        if isinstance(message, AIMessage):
+            events.extend(
+                ChatEvent("tool_call", call["name"], call["args"])
+                for call in message.tool_calls
+            )
+        elif isinstance(message, ToolMessage):
+            events.append(ChatEvent("tool_result", message.name or ""))
+    return events
 
 
 if __name__ == "__main__":
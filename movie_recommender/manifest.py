@@ -0,0 +1,173 @@
+import hashlib
+import json
+import os
+import sqlite3
+import uuid
+
+from langchain_core.documents import Document
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS documents (
+    namespace TEXT NOT NULL,
+    doc_id TEXT NOT NULL,
+    fingerprint BLOB NOT NULL,
+    last_seen INTEGER NOT NULL,
+    PRIMARY KEY (namespace, doc_id)
+) WITHOUT ROWID
+"""
+_SQLITE_MAX_VARIABLES = 900
+
+# Namespace for deriving stable UUIDs from TMDB ids, so the ids are valid for
+# the UUID primary key that PGVectorStore creates by default.
+MOVIE_ID_NAMESPACE = uuid.uuid5(uuid.NAMESPACE_URL, "https://www.themoviedb.org/movie")
+
+
+def document_id(document: Document, id_key: str) -> str:
+    """Derive a stable document id from a metadata column.
+
+    Args:
+        document: The document to identify.
+        id_key: Metadata key holding the source id (e.g. the TMDB id).
+
+    Returns:
+        str: A UUID string that is identical across dataset snapshots.
+
+    Raises:
+        KeyError: If the document has no value for ``id_key``.
+    """
+    source_id = document.metadata[id_key]
+    if isinstance(source_id, float) and source_id.is_integer():
+        source_id = int(source_id)
+    return str(uuid.uuid5(MOVIE_ID_NAMESPACE, str(source_id)))
+
+
+def fingerprint(document: Document) -> bytes:
+    """Compute a content fingerprint of a document.
+
+    Args:
+        document: The document to fingerprint.
+
+    Returns:
+        bytes: SHA-256 digest over the page content and the metadata.
+    """
+    payload = json.dumps(
+        [document.page_content, document.metadata], sort_keys=True, default=str
+    )
+    return hashlib.sha256(payload.encode("utf-8")).digest()
+
+
+class IndexManifest:
+    """Record of the documents and fingerprints currently held in a vector store.
+
+    The manifest lives in a local SQLite database and is scoped by a namespace,
+    so several vector stores or tables can share one file. It allows the
+    indexer to tell new, changed, unchanged and removed documents apart without
+    reading the vector store.
+    """
+
+    def __init__(self, path: str, namespace: str) -> None:
+        """Initialize the manifest.
+
+        Args:
+            path: Path of the SQLite database file. Parent directories are
+                created if needed.
+            namespace: Identifier of the vector store the manifest describes.
+        """
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._namespace = namespace
+        self._conn = sqlite3.connect(path)
+        self._conn.execute(_SCHEMA)
+        self._conn.commit()
+
+    def start_run(self) -> int:
+        """Start a new indexing run.
+
+        Runs are numbered by a counter kept in the manifest itself, one above
+        the latest run that recorded a document, so unlike a wall-clock time
+        the marker never falls behind an earlier run.
+
+        Returns:
+            int: The run marker to pass to :meth:`record` and :meth:`stale_ids`.
+        """
+        (latest,) = self._conn.execute(
+            "SELECT MAX(last_seen) FROM documents WHERE namespace = ?",
+            (self._namespace,),
+        ).fetchone()
+        return 1 if latest is None else int(latest) + 1
+
+    def fingerprints(self, doc_ids: list[str]) -> dict[str, bytes]:
+        """Look up the recorded fingerprints of the given documents.
+
+        Args:
+            doc_ids: The document ids to look up.
+
+        Returns:
+            dict[str, bytes]: Fingerprints of the ids present in the manifest.
+        """
+        found: dict[str, bytes] = {}
+        for start in range(0, len(doc_ids), _SQLITE_MAX_VARIABLES):
+            chunk = doc_ids[start : start + _SQLITE_MAX_VARIABLES]
+            placeholders = ",".join("?" * len(chunk))
+            rows = self._conn.execute(
+                "SELECT doc_id, fingerprint FROM documents "
+                f"WHERE namespace = ? AND doc_id IN ({placeholders})",
+                [self._namespace, *chunk],
+            )
+            found.update(rows)
+        return found
+
+    def record(self, entries: dict[str, bytes], run: int) -> None:
+        """Record documents as present in the store for the given run.
+
+        Args:
+            entries: Mapping of document id to fingerprint.
+            run: The run marker returned by :meth:`start_run`.
+        """
+        self._conn.executemany(
+            "INSERT OR REPLACE INTO documents (namespace, doc_id, fingerprint, "
+            "last_seen) VALUES (?, ?, ?, ?)",
+            [(self._namespace, doc_id, fp, run) for doc_id, fp in entries.items()],
+        )
+        self._conn.commit()
+
+    def stale_ids(self, run: int, limit: int) -> list[str]:
+        """Return ids of documents that were not seen during the given run.
+
+        Args:
+            run: The run marker returned by :meth:`start_run`.
+            limit: Maximum number of ids to return.
+
+        Returns:
+            list[str]: Up to ``limit`` stale document ids.
+        """
+        rows = self._conn.execute(
+            "SELECT doc_id FROM documents "
+            "WHERE namespace = ? AND last_seen < ? LIMIT ?",
+            (self._namespace, run, limit),
+        )
+        return [row[0] for row in rows]
+
+    def remove(self, doc_ids: list[str]) -> None:
+        """Remove documents from the manifest.
+
+        Args:
+            doc_ids: The ids of the documents to remove.
+        """
+        self._conn.executemany(
+            "DELETE FROM documents WHERE namespace = ? AND doc_id = ?",
+            [(self._namespace, doc_id) for doc_id in doc_ids],
+        )
+        self._conn.commit()
+
+    def clear(self) -> None:
+        """Forget every document recorded for this namespace."""
+        self._conn.execute(
+            "DELETE FROM documents WHERE namespace = ?", (self._namespace,)
+        )
+        self._conn.commit()
+
+    def close(self) -> None:
+        """Close the underlying SQLite connection."""
+        self._conn.close()
@@ -0,0 +1,201 @@
+import operator
+import re
+from collections.abc import Callable, Mapping, Sequence
+from functools import lru_cache
+from numbers import Real
+from typing import Any
+
+import numpy as np
+
+# Filters use the operators of langchain_postgres' PGVectorStore, so the same
+# filter dict can be pushed down to SQL or evaluated in memory.
+_COMPARISONS: dict[str, Callable[[Any, Any], Any]] = {
+    "$eq": operator.eq,
+    "$ne": operator.ne,
+    "$lt": operator.lt,
+    "$lte": operator.le,
+    "$gt": operator.gt,
+    "$gte": operator.ge,
+}
+
+
+class _Column:
+    """One metadata field of all rows, as a float array or as category codes.
+
+    Numeric fields are stored as float64 with NaN for missing values. Other
+    fields are dictionary-encoded: ``codes`` holds the index of every row's
+    value in ``categories``, or -1 if it is missing, so string predicates are
+    evaluated once per distinct value instead of once per row.
+    """
+
+    def __init__(self, values: Sequence[Any]) -> None:
+        present = [value for value in values if value is not None]
+        self.numeric = all(
+            isinstance(value, Real) and not isinstance(value, bool) for value in present
+        )
+        if self.numeric:
+            self.values = np.array(
+                [np.nan if value is None else value for value in values],
+                dtype=np.float64,
+            )
+            return
+        positions: dict[Any, int] = {}
+        codes = np.full(len(values), -1, dtype=np.int32)
+        for row, value in enumerate(values):
+            if value is not None:
+                codes[row] = positions.setdefault(value, len(positions))
+        self.codes = codes
+        self.categories = list(positions)
+
+    def present(self) -> np.ndarray:
+        if self.numeric:
+            return ~np.isnan(self.values)
+        return self.codes >= 0
+
+    def compare(self, op: str, value: Any) -> np.ndarray:
+        if self.numeric:
+            if not isinstance(value, Real):
+                return np.zeros(len(self.values), dtype=bool)
+            with np.errstate(invalid="ignore"):
+                mask = _COMPARISONS[op](self.values, value)
+            # NaN compares unequal to everything, but SQL NULL matches nothing.
+            return mask & self.present() if op == "$ne" else mask
+        return self._where(lambda category: _compare(op, category, value))
+
+    def isin(self, values: Sequence[Any]) -> np.ndarray:
+        if self.numeric:
+            numbers = [value for value in values if isinstance(value, Real)]
+            return np.isin(self.values, numbers)
+        wanted = set(values)
+        return self._where(lambda category: category in wanted)
+
+    def like(self, pattern: str, ignore_case: bool) -> np.ndarray:
+        regex = _like_regex(pattern, ignore_case)
+        if self.numeric:
+            mask = np.array(
+                [
+                    regex.fullmatch(_sql_text(value)) is not None
+                    for value in self.values
+                ],
+                dtype=bool,
+            )
+            return mask & self.present()
+        return self._where(lambda category: regex.fullmatch(str(category)) is not None)
+
+    def _where(self, predicate: Callable[[Any], bool]) -> np.ndarray:
+        matching = [
+            code for code, category in enumerate(self.categories) if predicate(category)
+        ]
+        return np.isin(self.codes, matching)
+
+
+class MetadataIndex:
+    """Columnar index over the metadata of a vector store's rows.
+
+    Columns are built lazily from the row metadata the first time a filter
+    refers to them. :meth:`mask` evaluates a filter dict with vectorized
+    comparisons and returns a boolean row mask, so a filtered search can score
+    only the matching rows.
+
+    Supported are field equality (``{"original_language": "en"}``), the
+    comparisons ``$eq``, ``$ne``, ``$lt``, ``$lte``, ``$gt`` and ``$gte``,
+    ``$in``, ``$nin``, ``$between``, ``$exists``, ``$like`` and ``$ilike`` with
+    SQL ``%``/``_`` wildcards, combined with ``$and``, ``$or`` and ``$not``.
+    """
+
+    def __init__(
+        self,
+        metadatas: Sequence[Mapping[str, Any]],
+        values: Callable[[str], Sequence[Any]] | None = None,
+    ) -> None:
+        """Initialize the index.
+
+        Args:
+            metadatas: The metadata of every row, indexed by row.
+            values: Returns one field of every row, None where it is missing.
+                Defaults to reading the field from ``metadatas`` row by row.
+        """
+        self._metadatas = metadatas
+        self._values = values or (
+            lambda key: [metadata.get(key) for metadata in metadatas]
+        )
+        self._columns: dict[str, _Column] = {}
+
+    def mask(self, filter: Mapping[str, Any]) -> np.ndarray:
+        """Return which rows match a filter.
+
+        Args:
+            filter: The filter dict.
+
+        Returns:
+            np.ndarray: A boolean array with one entry per row.
+
+        Raises:
+            ValueError: If the filter uses an unsupported operator.
+        """
+        masks = [self._clause(key, value) for key, value in filter.items()]
+        return np.logical_and.reduce(masks) if masks else self._all()
+
+    def _clause(self, key: str, value: Any) -> np.ndarray:
+        if key in {"$and", "$or"}:
+            masks = [self.mask(clause) for clause in value]
+            if not masks:
+                return self._all()
+            return (np.logical_and if key == "$and" else np.logical_or).reduce(masks)
+        if key == "$not":
+            clauses = value if isinstance(value, list) else [value]
+            return ~np.logical_or.reduce([self.mask(clause) for clause in clauses])
+        if key.startswith("$"):
+            raise ValueError(f"Unsupported filter operator: {key}")
+
+        column = self._column(key)
+        if not isinstance(value, Mapping):
+            return column.compare("$eq", value)
+        if len(value) != 1:
+            raise ValueError(f"Expected a single operator for field {key}")
+        [(op, operand)] = value.items()
+        if op in _COMPARISONS:
+            return column.compare(op, operand)
+        if op == "$in":
+            return column.isin(operand)
+        if op == "$nin":
+            return ~column.isin(operand) & column.present()
+        if op == "$between":
+            low, high = operand
+            return column.compare("$gte", low) & column.compare("$lte", high)
+        if op == "$exists":
+            return column.present() if operand else ~column.present()
+        if op in {"$like", "$ilike"}:
+            return column.like(operand, ignore_case=op == "$ilike")
+        raise ValueError(f"Unsupported filter operator: {op}")
+
+    def _column(self, key: str) -> _Column:
+        column = self._columns.get(key)
+        if column is None:
+            column = _Column(self._values(key))
+            self._columns[key] = column
+        return column
+
+    def _all(self) -> np.ndarray:
+        return np.ones(len(self._metadatas), dtype=bool)
+
+
+def _compare(op: str, category: Any, value: Any) -> bool:
+    try:
+        return bool(_COMPARISONS[op](category, value))
+    except TypeError:
+        return op == "$ne"
+
+
+def _sql_text(value: float) -> str:
+    return str(int(value)) if value.is_integer() else str(value)
+
+
+@lru_cache(maxsize=256)
+def _like_regex(pattern: str, ignore_case: bool) -> re.Pattern[str]:
+    parts = [
+        ".*" if char == "%" else "." if char == "_" else re.escape(char)
+        for char in pattern
+    ]
+    flags = re.DOTALL | (re.IGNORECASE if ignore_case else 0)
+    return re.compile("".join(parts), flags)
@@ -0,0 +1,422 @@
+import logging
+import threading
+import time
+from bisect import bisect_left
+from collections.abc import Generator, Iterable, Iterator, Sequence
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Protocol
+from uuid import UUID
+
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.embeddings import Embeddings
+
+logger = logging.getLogger(__name__)
+
+# Upper bounds in seconds, from cache hits to slow LLM calls.
+DEFAULT_BUCKETS = (
+    0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0,
+    10.0, 30.0, 60.0,
+)  # fmt: skip
+METRIC_NAME = "movie_recommender_stage_seconds"
+
+
+@dataclass
+class Span:
+    """One timed execution of a stage.
+
+    Attributes:
+        stage: What was timed, e.g. "llm" or "vector_search".
+        seconds: How long it took.
+    """
+
+    stage: str
+    seconds: float
+
+
+class MetricsSink(Protocol):
+    """Receives the duration of every timed stage."""
+
+    def record(self, stage: str, seconds: float) -> None: ...
+
+
+_sinks: list[MetricsSink] = []
+# Spans of the innermost collect() block of the current context, if any.
+_collected: ContextVar[list[Span] | None] = ContextVar("collected", default=None)
+
+
+def add_sink(sink: MetricsSink) -> None:
+    """Send the durations of all stages to a sink from now on.
+
+    Args:
+        sink: The sink.
+    """
+    _sinks.append(sink)
+
+
+def remove_sink(sink: MetricsSink) -> None:
+    """Stop sending durations to a sink added with :func:`add_sink`.
+
+    Args:
+        sink: The sink.
+    """
+    _sinks.remove(sink)
+
+
+def record(stage: str, seconds: float) -> None:
+    """Record the duration of a stage in all sinks and the active collection.
+
+    Args:
+        stage: The name of the stage.
+        seconds: Its duration.
+    """
+    for sink in _sinks:
+        sink.record(stage, seconds)
+    spans = _collected.get()
+    if spans is not None:
+        spans.append(Span(stage, seconds))
+
+
+@contextmanager
+def timer(stage: str) -> Generator[None, None, None]:
+    """Time the enclosed block as a stage, see :func:`record`.
+
+    Stages may nest, e.g. "vector_search" includes "embed_query" unless the
+    query embedding was cached, so durations of different stages do not add
+    up to the total.
+
+    Args:
+        stage: The name of the stage.
+    """
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        record(stage, time.perf_counter() - start)
+
+
+@contextmanager
+def collect() -> Generator[list[Span], None, None]:
+    """Collect the spans recorded in the enclosed block, e.g. one chat turn.
+
+    The collection follows the context into threads and tasks started with a
+    copy of it, as LangGraph does for tool calls, but not into other
+    concurrent turns.
+
+    Yields:
+        list[Span]: The spans, appended as they are recorded.
+    """
+    spans: list[Span] = []
+    token = _collected.set(spans)
+    try:
+        yield spans
+    finally:
+        _collected.reset(token)
+
+
+def timed[T](items: Iterable[T], stage: str) -> Iterator[T]:
+    """Time the production of every item of an iterable as a stage.
+
+    Useful for lazy pipelines, e.g. the parsing of CSV batches that happens
+    when the indexer asks for the next batch.
+
+    Args:
+        items: The iterable.
+        stage: The name of the stage.
+
+    Yields:
+        T: The items of the iterable.
+    """
+    iterator = iter(items)
+    while True:
+        start = time.perf_counter()
+        try:
+            item = next(iterator)
+        except StopIteration:
+            return
+        record(stage, time.perf_counter() - start)
+        yield item
+
+
+def breakdown(spans: Sequence[Span]) -> dict[str, tuple[int, float]]:
+    """Sum spans per stage.
+
+    Args:
+        spans: The spans, e.g. of :func:`collect`.
+
+    Returns:
+        dict[str, tuple[int, float]]: Number of calls and total seconds per
+            stage, in order of first occurrence.
+    """
+    totals: dict[str, tuple[int, float]] = {}
+    for span in spans:
+        calls, seconds = totals.get(span.stage, (0, 0.0))
+        totals[span.stage] = (calls + 1, seconds + span.seconds)
+    return totals
+
+
+class LogSink:
+    """Writes every duration as a log line."""
+
+    def __init__(self, level: int = logging.INFO) -> None:
+        """Initialize the sink.
+
+        Args:
+            level: Log level of the lines.
+        """
+        self._level = level
+
+    def record(self, stage: str, seconds: float) -> None:
+        logger.log(self._level, "stage=%s seconds=%.4f", stage, seconds)
+
+
+class HistogramSink:
+    """Aggregates durations per stage into in-process histograms.
+
+    Only bucket counts, the count and the sum are kept per stage, so memory
+    stays constant however long the process runs. Quantiles are estimated by
+    linear interpolation within a bucket, as Prometheus does.
+    """
+
+    def __init__(self, buckets: Sequence[float] = DEFAULT_BUCKETS) -> None:
+        """Initialize the sink.
+
+        Args:
+            buckets: Increasing upper bounds of the buckets in seconds. A last
+                bucket without upper bound is added.
+        """
+        self.buckets = tuple(buckets)
+        self._lock = threading.Lock()
+        self._counts: dict[str, list[int]] = {}
+        self._sums: dict[str, float] = {}
+
+    def record(self, stage: str, seconds: float) -> None:
+        with self._lock:
+            counts = self._counts.setdefault(stage, [0] * (len(self.buckets) + 1))
+            counts[bisect_left(self.buckets, seconds)] += 1
+            self._sums[stage] = self._sums.get(stage, 0.0) + seconds
+
+    def stages(self) -> list[str]:
+        """Names of all stages recorded so far."""
+        with self._lock:
+            return list(self._counts)
+
+    def count(self, stage: str) -> int:
+        """Number of durations recorded for a stage."""
+        with self._lock:
+            return sum(self._counts.get(stage, ()))
+
+    def total(self, stage: str) -> float:
+        """Sum of the durations recorded for a stage, in seconds."""
+        with self._lock:
+            return self._sums.get(stage, 0.0)
+
+    def quantile(self, stage: str, q: float) -> float:
+        """Estimate a quantile of the durations of a stage.
+
+        Args:
+            stage: The name of the stage.
+            q: The quantile, between 0 and 1.
+
+        Returns:
+            float: The estimated duration in seconds, or NaN without records.
+                Values in the last bucket are reported as its lower bound.
+        """
+        with self._lock:
+            counts = list(self._counts.get(stage, ()))
+        total = sum(counts)
+        if total == 0:
+            return float("nan")
+        rank = q * total
+        seen = 0
+        for i, count in enumerate(counts):
+            if count and seen + count >= rank:
+                if i == len(self.buckets):
+                    return self.buckets[-1]
+                lower = self.buckets[i - 1] if i > 0 else 0.0
+                return lower + (self.buckets[i] - lower) * (rank - seen) / count
+            seen += count
+        return self.buckets[-1]
+
+
+class PrometheusSink(HistogramSink):
+    """Histogram sink exposing its histograms in the Prometheus text format.
+
+    The histograms form one metric, ``movie_recommender_stage_seconds``, with
+    a ``stage`` label. Read them with :meth:`exposition` or serve them to a
+    Prometheus scraper with :meth:`serve`.
+    """
+
+    def exposition(self) -> str:
+        """Render the histograms in the Prometheus text exposition format.
+
+        Returns:
+            str: The metric family with bucket, sum and count samples.
+        """
+        lines = [
+            f"# HELP {METRIC_NAME} Duration of movie recommender stages.",
+            f"# TYPE {METRIC_NAME} histogram",
+        ]
+        with self._lock:
+            snapshot = [
+                (stage, list(counts), self._sums[stage])
+                for stage, counts in self._counts.items()
+            ]
+        for stage, counts, total in snapshot:
+            label = f'stage="{_escape_label(stage)}"'
+            cumulative = 0
+            for bound, count in zip([*self.buckets, "+Inf"], counts, strict=True):
+                cumulative += count
+                lines.append(
+                    f'{METRIC_NAME}_bucket{{{label},le="{bound}"}} {cumulative}'
+                )
+            lines.append(f"{METRIC_NAME}_sum{{{label}}} {total}")
+            lines.append(f"{METRIC_NAME}_count{{{label}}} {cumulative}")
+        return "\n".join(lines) + "\n"
+
+    def serve(self, port: int, host: str = "127.0.0.1") -> ThreadingHTTPServer:
+        """Serve the exposition at ``/metrics`` from a daemon thread.
+
+        Args:
+            port: The port to listen on, or 0 for any free port.
+            host: The address to bind.
+
+        Returns:
+            ThreadingHTTPServer: The running server. Call ``shutdown()`` to
+                stop it.
+        """
+        sink = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self) -> None:
+                if self.path.split("?")[0] != "/metrics":
+                    self.send_error(404)
+                    return
+                body = sink.exposition().encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format: str, *args: Any) -> None:
+                pass
+
+        server = ThreadingHTTPServer((host, port), Handler)
+        threading.Thread(
+            target=server.serve_forever, name="metrics", daemon=True
+        ).start()
+        return server
+
+
+class TimedEmbeddings(Embeddings):
+    """Embeddings wrapper recording "embed_query" and "embed_documents".
+
+    Wrap the model itself, not a cache in front of it, so only texts that are
+    actually embedded are timed.
+    """
+
+    def __init__(self, embeddings: Embeddings) -> None:
+        """Initialize the wrapper.
+
+        Args:
+            embeddings: The embeddings model to time.
+        """
+        self.embeddings = embeddings
+
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        with timer("embed_documents"):
+            return self.embeddings.embed_documents(texts)
+
+    def embed_query(self, text: str) -> list[float]:
+        with timer("embed_query"):
+            return self.embeddings.embed_query(text)
+
+    def close(self) -> None:
+        """Close the wrapped model, if it holds resources like worker processes."""
+        close = getattr(self.embeddings, "close", None)
+        if close is not None:
+            close()
+
+
+class MetricsCallbackHandler(BaseCallbackHandler):
+    """LangChain callback handler timing chat model calls and tool calls.
+
+    Records "llm" for every chat model call and "tool:<name>" for every tool
+    call of an agent run it is passed to.
+    """
+
+    def __init__(self) -> None:
+        self._starts: dict[UUID, tuple[str, float]] = {}
+
+    def on_chat_model_start(
+        self, serialized: dict[str, Any], messages: Any, *, run_id: UUID, **kwargs: Any
+    ) -> None:
+        self._starts[run_id] = ("llm", time.perf_counter())
+
+    def on_llm_end(self, response: Any, *, run_id: UUID, **kwargs: Any) -> None:
+        self._finish(run_id)
+
+    def on_llm_error(
+        self, error: BaseException, *, run_id: UUID, **kwargs: Any
+    ) -> None:
+        self._finish(run_id)
+
+    def on_tool_start(
+        self, serialized: dict[str, Any], input_str: str, *, run_id: UUID, **kwargs: Any
+    ) -> None:
+        name = (serialized or {}).get("name") or kwargs.get("name") or "tool"
+        self._starts[run_id] = (f"tool:{name}", time.perf_counter())
+
+    def on_tool_end(self, output: Any, *, run_id: UUID, **kwargs: Any) -> None:
+        self._finish(run_id)
+
+    def on_tool_error(
+        self, error: BaseException, *, run_id: UUID, **kwargs: Any
+    ) -> None:
+        self._finish(run_id)
+
+    def _finish(self, run_id: UUID) -> None:
+        started = self._starts.pop(run_id, None)
+        if started is not None:
+            stage, start = started
+            record(stage, time.perf_counter() - start)
+
+
+def configure(sink_names: Sequence[str], prometheus_port: int = 0) -> list[MetricsSink]:
+    """Add the sinks named in the configuration.
+
+    Args:
+        sink_names: Any of "log", "histogram" and "prometheus".
+        prometheus_port: Port of the ``/metrics`` endpoint of the "prometheus"
+            sink. Not served if 0.
+
+    Returns:
+        list[MetricsSink]: The added sinks.
+
+    Raises:
+        ValueError: If a sink name is not supported.
+    """
+    sinks: list[MetricsSink] = []
+    for name in sink_names:
+        if name == "log":
+            sinks.append(LogSink())
+        elif name == "histogram":
+            sinks.append(HistogramSink())
+        elif name == "prometheus":
+            prometheus = PrometheusSink()
+            if prometheus_port:
+                prometheus.serve(prometheus_port)
+                logger.info("Serving metrics on port %d", prometheus_port)
+            sinks.append(prometheus)
+        else:
+            raise ValueError(f"Unsupported metrics sink: {name}")
+    for sink in sinks:
+        add_sink(sink)
+    return sinks
+
+
+def _escape_label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
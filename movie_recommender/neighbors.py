@@ -0,0 +1,268 @@
+import os
+import unicodedata
+from collections.abc import Sequence
+from typing import Any
+
+import numpy as np
+
+from movie_recommender import metrics
+from movie_recommender.bm25 import pack_strings, unpack_strings
+
+# Rows and columns of the similarity block computed at a time. A block of
+# 512 x 32768 float32 scores takes 64 MiB, whatever the catalogue size.
+DEFAULT_BLOCK_ROWS = 512
+DEFAULT_BLOCK_COLUMNS = 32_768
+
+
+def title_key(title: str) -> str:
+    """Normalize a title for lookup: case, accents and punctuation are ignored.
+
+    Args:
+        title: The title, e.g. "Amélie".
+
+    Returns:
+        str: The lookup key, e.g. "amelie".
+    """
+    folded = unicodedata.normalize("NFKD", title.casefold())
+    return " ".join(
+        "".join(char for char in folded if char.isalnum() or char.isspace()).split()
+    )
+
+
+class NeighborGraph:
+    """Precomputed k nearest neighbours of every movie in the catalogue.
+
+    Neighbours are stored as an ``(n, k)`` int32 matrix of rows and an
+    ``(n, k)`` float16 matrix of cosine similarities, best first, so the
+    graph of a million movies with k=20 takes 120 MB. "More like this" is then
+    a row lookup instead of a vector search. Build a graph with
+    :func:`build_neighbor_graph`.
+    """
+
+    def __init__(
+        self,
+        ids: Sequence[str],
+        neighbors: np.ndarray,
+        scores: np.ndarray,
+        titles: Sequence[str | None] | None = None,
+        source_ids: Sequence[Any] | None = None,
+        popularity: np.ndarray | None = None,
+    ) -> None:
+        """Initialize the graph from its arrays.
+
+        Args:
+            ids: The document id of every row.
+            neighbors: Rows of the neighbours of every row, best first. -1
+                pads rows with fewer neighbours.
+            scores: Cosine similarity of every neighbour.
+            titles: Title of every row, for lookups by title.
+            source_ids: Source id of every row, e.g. the TMDB id, for lookups
+                by id.
+            popularity: Popularity of every row. Of several movies with the
+                same title, the most popular one is found.
+        """
+        self._ids = list(ids)
+        self._neighbors = neighbors
+        self._scores = scores
+        self._titles = [
+            title if isinstance(title, str) and title else None
+            for title in (titles if titles is not None else [None] * len(ids))
+        ]
+        self._source_ids = (
+            [None if s is None else str(s) for s in source_ids]
+            if source_ids is not None
+            else [None] * len(ids)
+        )
+        self._popularity = (
+            np.asarray(popularity, dtype=np.float32)
+            if popularity is not None
+            else np.zeros(len(self._ids), dtype=np.float32)
+        )
+        self._row_of = {doc_id: row for row, doc_id in enumerate(self._ids)}
+        self._row_of_source = {
+            source_id: row
+            for row, source_id in enumerate(self._source_ids)
+            if source_id is not None
+        }
+        # Most popular row per title key, built on the first lookup by title.
+        self._row_of_title: dict[str, int] | None = None
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    @property
+    def k(self) -> int:
+        """Number of neighbours stored per movie."""
+        return self._neighbors.shape[1]
+
+    def find(self, title: str | None = None, source_id: Any = None) -> str | None:
+        """Return the document id of a movie given by title or source id.
+
+        Args:
+            title: The title, matched ignoring case, accents and punctuation.
+            source_id: The source id, e.g. the TMDB id. Takes precedence.
+
+        Returns:
+            str | None: The document id, or None if no movie matches.
+        """
+        row = None
+        if source_id is not None:
+            row = self._row_of_source.get(str(source_id))
+        elif title:
+            if self._row_of_title is None:
+                self._row_of_title = {}
+                for r in np.argsort(self._popularity, kind="stable"):
+                    if self._titles[r]:
+                        self._row_of_title[title_key(self._titles[r])] = int(r)
+            row = self._row_of_title.get(title_key(title))
+        return None if row is None else self._ids[row]
+
+    def similar(self, doc_id: str, k: int | None = None) -> list[tuple[str, float]]:
+        """Return the precomputed nearest neighbours of a movie.
+
+        Args:
+            doc_id: The document id of the movie.
+            k: Number of neighbours, at most :attr:`k`. All if None.
+
+        Returns:
+            list[tuple[str, float]]: Document ids and cosine similarities,
+                best first. Empty for unknown ids.
+        """
+        row = self._row_of.get(doc_id)
+        if row is None:
+            return []
+        neighbors = self._neighbors[row, :k]
+        scores = self._scores[row, :k]
+        return [
+            (self._ids[n], float(s))
+            for n, s in zip(neighbors, scores, strict=True)
+            if n >= 0
+        ]
+
+    def save(self, path: str) -> None:
+        """Write the graph to a single ``.npz`` file.
+
+        The file is written under a temporary name and moved into place, so
+        readers never see a half-written graph.
+
+        Args:
+            path: The file path. Parent directories are created if needed.
+        """
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(f"{path}.tmp", "wb") as file:
+            # Uncompressed, as neighbour rows and scores barely compress.
+            np.savez(
+                file,
+                ids=pack_strings(self._ids),
+                titles=pack_strings([_one_line(t) for t in self._titles]),
+                source_ids=pack_strings([_one_line(s) for s in self._source_ids]),
+                popularity=self._popularity,
+                neighbors=self._neighbors,
+                scores=self._scores,
+            )
+        os.replace(f"{path}.tmp", path)
+
+    @classmethod
+    def load(cls, path: str) -> "NeighborGraph":
+        """Load a graph written by :meth:`save`.
+
+        Args:
+            path: The file path.
+
+        Returns:
+            NeighborGraph: The loaded graph.
+        """
+        with np.load(path) as data:
+            ids = unpack_strings(data["ids"])
+            return cls(
+                ids=ids,
+                neighbors=data["neighbors"],
+                scores=data["scores"],
+                titles=_optional_strings(data["titles"], len(ids)),
+                source_ids=_optional_strings(data["source_ids"], len(ids)),
+                popularity=data["popularity"],
+            )
+
+
+def _one_line(value: str | None) -> str:
+    return "" if value is None else value.replace("\n", " ")
+
+
+def _optional_strings(packed: np.ndarray, count: int) -> list[str | None]:
+    # A single empty string packs to no bytes at all.
+    return [value or None for value in unpack_strings(packed) or [""] * count]
+
+
+def build_neighbor_graph(
+    ids: Sequence[str],
+    vectors: np.ndarray,
+    k: int = 20,
+    titles: Sequence[str | None] | None = None,
+    source_ids: Sequence[Any] | None = None,
+    popularity: np.ndarray | None = None,
+    block_rows: int = DEFAULT_BLOCK_ROWS,
+    block_columns: int = DEFAULT_BLOCK_COLUMNS,
+) -> NeighborGraph:
+    """Compute the exact k nearest neighbours of every vector.
+
+    The all-pairs similarity matrix is never materialized: it is computed one
+    ``block_rows x block_columns`` tile at a time with a float32 matrix
+    product, and every row keeps a running top k that is merged with the best
+    k of each tile. Memory is bounded by the tile size and the output.
+
+    Args:
+        ids: The document id of every row.
+        vectors: L2-normalized vectors, one row per document, e.g.
+            ``NumpyVectorStore.vectors``. float16 vectors are converted to
+            float32 block by block.
+        k: Number of neighbours per movie. A movie is not its own neighbour.
+        titles: Title of every row, see :class:`NeighborGraph`.
+        source_ids: Source id of every row.
+        popularity: Popularity of every row.
+        block_rows: Rows of a tile.
+        block_columns: Columns of a tile.
+
+    Returns:
+        NeighborGraph: The graph.
+    """
+    n = len(vectors)
+    k = max(0, min(k, n - 1))
+    neighbors = np.full((n, k), -1, dtype=np.int32)
+    scores = np.zeros((n, k), dtype=np.float16)
+    if k == 0:
+        return NeighborGraph(ids, neighbors, scores, titles, source_ids, popularity)
+
+    with metrics.timer("neighbor_graph"):
+        for row_start in range(0, n, block_rows):
+            queries = np.asarray(
+                vectors[row_start : row_start + block_rows], dtype=np.float32
+            )
+            rows = np.arange(row_start, row_start + len(queries))
+            best_scores = np.full((len(queries), k), -np.inf, dtype=np.float32)
+            best_rows = np.full((len(queries), k), -1, dtype=np.int64)
+            for column_start in range(0, n, block_columns):
+                keys = np.asarray(
+                    vectors[column_start : column_start + block_columns],
+                    dtype=np.float32,
+                )
+                tile = queries @ keys.T
+                # A movie is not its own neighbour.
+                own = rows - column_start
+                inside = (own >= 0) & (own < len(keys))
+                tile[np.flatnonzero(inside), own[inside]] = -np.inf
+                tile_k = min(k, tile.shape[1])
+                top = np.argpartition(-tile, tile_k - 1, axis=1)[:, :tile_k]
+                merged_scores = np.concatenate(
+                    [best_scores, np.take_along_axis(tile, top, axis=1)], axis=1
+                )
+                merged_rows = np.concatenate([best_rows, top + column_start], axis=1)
+                keep = np.argpartition(-merged_scores, k - 1, axis=1)[:, :k]
+                best_scores = np.take_along_axis(merged_scores, keep, axis=1)
+                best_rows = np.take_along_axis(merged_rows, keep, axis=1)
+            order = np.argsort(-best_scores, axis=1, kind="stable")
+            best_scores = np.take_along_axis(best_scores, order, axis=1)
+            best_rows = np.take_along_axis(best_rows, order, axis=1)
+            block = slice(row_start, row_start + len(queries))
+            neighbors[block] = np.where(np.isfinite(best_scores), best_rows, -1)
+            scores[block] = np.where(np.isfinite(best_scores), best_scores, 0)
+    return NeighborGraph(ids, neighbors, scores, titles, source_ids, popularity)
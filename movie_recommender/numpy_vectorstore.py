@@ -0,0 +1,600 @@
+import json
+import os
+import shutil
+import uuid
+from collections.abc import Callable, Iterable, Mapping, Sequence
+from typing import Any, Self
+
+import numpy as np
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+from langchain_core.vectorstores import VectorStore
+
+from movie_recommender.metadata_index import MetadataIndex
+from movie_recommender.snapshot_columns import IdIndex, MetadataColumns, StringColumn
+
+# Number of rows converted to float32 at a time when scoring float16 vectors,
+# because NumPy has no BLAS kernels for float16 matrix products.
+_FLOAT16_BLOCK_ROWS = 65_536
+# Fraction of matching rows above which a filtered search scores all rows and
+# masks the rest, instead of gathering the matching rows into a copy first.
+_MASKED_SCAN_FRACTION = 0.25
+
+SNAPSHOT_FORMAT_VERSION = 2
+_VECTORS_FILE = "vectors.npy"
+# Header naming the row count and the metadata fields of the column files.
+_DOCUMENTS_FILE = "documents.json"
+_IDS_COLUMN = "ids"
+_ID_ORDER_FILE = "ids.order"
+_TEXTS_COLUMN = "texts"
+_METADATA_COLUMNS = "metadata"
+# Pointer file naming the version directory that holds the current snapshot.
+_CURRENT_FILE = "CURRENT"
+_VERSION_PREFIX = "snapshot-"
+
+
+class NumpyVectorStore(VectorStore):
+    """Exact in-memory vector store backed by one contiguous NumPy matrix.
+
+    Embeddings are L2-normalized and kept in a single float32 (or float16)
+    matrix, with ids, texts and metadata in parallel sequences indexed by row. A
+    query is scored against every row with one matrix-vector product and the
+    top k rows are selected with ``argpartition``, so search cost is a few
+    vectorized passes over contiguous memory instead of a Python loop.
+
+    Searches accept a ``filter`` dict on metadata fields, evaluated on a
+    columnar :class:`MetadataIndex`, and return the top k matching rows.
+
+    A loaded snapshot keeps ids, texts and metadata in memory-mapped columns
+    and decodes only the rows it returns; they are copied into lists on the
+    first write.
+    """
+
+    def __init__(
+        self,
+        embedding: Embeddings,
+        dtype: type[np.floating] = np.float32,
+        initial_capacity: int = 1024,
+    ) -> None:
+        """Initialize the store.
+
+        Args:
+            embedding: The embeddings model used for texts and queries.
+            dtype: Storage dtype of the vectors, np.float32 or np.float16.
+            initial_capacity: Number of rows allocated before the first resize.
+        """
+        self._embedding = embedding
+        self._dtype = np.dtype(dtype)
+        self._initial_capacity = max(1, initial_capacity)
+        self._vectors: np.ndarray | None = None
+        self._size = 0
+        self._ids: Sequence[str] = []
+        self._texts: Sequence[str] = []
+        self._metadatas: Sequence[Mapping[str, Any]] = []
+        self._row_of: Mapping[str, int] = {}
+        self._metadata_index: MetadataIndex | None = None
+
+    @property
+    def embeddings(self) -> Embeddings:
+        """The embeddings model used by the store."""
+        return self._embedding
+
+    def __len__(self) -> int:
+        return self._size
+
+    @property
+    def vectors(self) -> np.ndarray:
+        """Read-only view of the normalized vectors, one row per document."""
+        if self._vectors is None:
+            return np.empty((0, 0), dtype=self._dtype)
+        view = self._vectors[: self._size]
+        view.flags.writeable = False
+        return view
+
+    @property
+    def ids(self) -> list[str]:
+        """The document id of every row, in the order of :attr:`vectors`."""
+        return list(self._ids)
+
+    def metadata_values(self, key: str) -> list[Any]:
+        """Return one metadata field of every row, None where it is missing.
+
+        Args:
+            key: The metadata field.
+
+        Returns:
+            list[Any]: The values, in the order of :attr:`vectors`.
+        """
+        if isinstance(self._metadatas, MetadataColumns):
+            return self._metadatas.values(key)
+        return [meta.get(key) for meta in self._metadatas]
+
+    def add_texts(
+        self,
+        texts: Iterable[str],
+        metadatas: list[dict[str, Any]] | None = None,
+        *,
+        ids: list[str] | None = None,
+        **kwargs: Any,
+    ) -> list[str]:
+        """Embed texts and add them to the store.
+
+        Args:
+            texts: The texts to add.
+            metadatas: Optional metadata per text.
+            ids: Optional ids per text. Existing ids are overwritten.
+            **kwargs: Unused.
+
+        Returns:
+            list[str]: The ids of the added texts.
+        """
+        texts = list(texts)
+        embeddings = self._embedding.embed_documents(texts)
+        return self.add_embeddings(texts, embeddings, metadatas=metadatas, ids=ids)
+
+    def add_embeddings(
+        self,
+        texts: Sequence[str],
+        embeddings: Sequence[Sequence[float]] | np.ndarray,
+        metadatas: Sequence[dict[str, Any]] | None = None,
+        ids: Sequence[str | None] | None = None,
+    ) -> list[str]:
+        """Add texts with precomputed embeddings to the store.
+
+        Args:
+            texts: The texts to add.
+            embeddings: One embedding per text.
+            metadatas: Optional metadata per text.
+            ids: Optional ids per text. Existing ids are overwritten, missing
+                ids are generated.
+
+        Returns:
+            list[str]: The ids of the added texts.
+
+        Raises:
+            ValueError: If the argument lengths or embedding sizes mismatch.
+        """
+        matrix = normalize(np.asarray(embeddings, dtype=np.float32))
+        if matrix.ndim != 2 or matrix.shape[0] != len(texts):
+            raise ValueError("Expected one embedding per text")
+        metadatas = metadatas or [{} for _ in texts]
+        ids = ids or [None] * len(texts)
+        if len(metadatas) != len(texts) or len(ids) != len(texts):
+            raise ValueError("metadatas and ids must have the same length as texts")
+
+        self._reserve(self._size + len(texts), matrix.shape[1])
+        assert self._vectors is not None
+        self._metadata_index = None
+        row_ids, row_texts, row_metadatas, row_of = self._writable_rows()
+        added: list[str] = []
+        for text, vector, metadata, doc_id in zip(
+            texts, matrix, metadatas, ids, strict=True
+        ):
+            doc_id = doc_id or str(uuid.uuid4())
+            row = row_of.get(doc_id)
+            if row is None:
+                row = self._size
+                self._size += 1
+                row_of[doc_id] = row
+                row_ids.append(doc_id)
+                row_texts.append(text)
+                row_metadatas.append(dict(metadata))
+            else:
+                row_texts[row] = text
+                row_metadatas[row] = dict(metadata)
+            self._vectors[row] = vector
+            added.append(doc_id)
+        return added
+
+    def delete(self, ids: list[str] | None = None, **kwargs: Any) -> bool | None:
+        """Delete documents by id.
+
+        The last row is moved into each freed slot, so the matrix stays dense.
+
+        Args:
+            ids: The ids of the documents to delete. Unknown ids are ignored.
+            **kwargs: Unused.
+
+        Returns:
+            bool: True once the documents are removed.
+        """
+        if self._vectors is not None:
+            self._reserve(self._size, self._vectors.shape[1])
+        self._metadata_index = None
+        row_ids, row_texts, row_metadatas, row_of = self._writable_rows()
+        for doc_id in ids or []:
+            row = row_of.pop(doc_id, None)
+            if row is None:
+                continue
+            last = self._size - 1
+            if row != last:
+                assert self._vectors is not None
+                self._vectors[row] = self._vectors[last]
+                row_ids[row] = row_ids[last]
+                row_texts[row] = row_texts[last]
+                row_metadatas[row] = row_metadatas[last]
+                row_of[row_ids[row]] = row
+            row_ids.pop()
+            row_texts.pop()
+            row_metadatas.pop()
+            self._size = last
+        return True
+
+    def get_by_ids(self, ids: Sequence[str], /) -> list[Document]:
+        """Get documents by id.
+
+        Args:
+            ids: The ids to look up. Unknown ids are skipped.
+
+        Returns:
+            list[Document]: The documents found, in the order of ``ids``.
+        """
+        return [
+            self._document(self._row_of[doc_id])
+            for doc_id in ids
+            if doc_id in self._row_of
+        ]
+
+    def similarity_search(
+        self, query: str, k: int = 4, **kwargs: Any
+    ) -> list[Document]:
+        """Return the documents most similar to a query text.
+
+        Args:
+            query: The query text.
+            k: Number of documents to return.
+            **kwargs: Passed on to :meth:`similarity_search_with_score_by_vector`.
+
+        Returns:
+            list[Document]: Up to k documents, most similar first.
+        """
+        return [doc for doc, _ in self.similarity_search_with_score(query, k, **kwargs)]
+
+    def similarity_search_with_score(
+        self, query: str, k: int = 4, **kwargs: Any
+    ) -> list[tuple[Document, float]]:
+        """Return the documents most similar to a query text with their scores.
+
+        Args:
+            query: The query text.
+            k: Number of documents to return.
+            **kwargs: Passed on to :meth:`similarity_search_with_score_by_vector`.
+
+        Returns:
+            list[tuple[Document, float]]: Documents and cosine similarities,
+                most similar first.
+        """
+        embedding = self._embedding.embed_query(query)
+        return self.similarity_search_with_score_by_vector(embedding, k, **kwargs)
+
+    def similarity_search_by_vector(
+        self, embedding: list[float], k: int = 4, **kwargs: Any
+    ) -> list[Document]:
+        """Return the documents most similar to a query embedding.
+
+        Args:
+            embedding: The query embedding.
+            k: Number of documents to return.
+            **kwargs: Passed on to :meth:`similarity_search_with_score_by_vector`.
+
+        Returns:
+            list[Document]: Up to k documents, most similar first.
+        """
+        return [
+            doc
+            for doc, _ in self.similarity_search_with_score_by_vector(
+                embedding, k, **kwargs
+            )
+        ]
+
+    def similarity_search_with_score_by_vector(
+        self,
+        embedding: Sequence[float] | np.ndarray,
+        k: int = 4,
+        filter: Mapping[str, Any] | None = None,
+        **kwargs: Any,
+    ) -> list[tuple[Document, float]]:
+        """Return the documents most similar to a query embedding with scores.
+
+        Args:
+            embedding: The query embedding.
+            k: Number of documents to return.
+            filter: Optional metadata filter, e.g.
+                ``{"release_year": {"$gte": 1990}, "original_language": "en"}``.
+                See :class:`MetadataIndex` for the supported operators.
+            **kwargs: Unused.
+
+        Returns:
+            list[tuple[Document, float]]: Documents and cosine similarities,
+                most similar first.
+        """
+        if self._size == 0 or k <= 0:
+            return []
+        query = normalize(np.asarray(embedding, dtype=np.float32))
+        if filter:
+            rows, scores = self._search(query, k, self._filter_mask(filter))
+        else:
+            rows, scores = self._search(query, k)
+        return [
+            (self._document(row), float(score))
+            for row, score in zip(rows, scores, strict=True)
+        ]
+
+    def save(self, path: str) -> None:
+        """Write the store to a snapshot directory.
+
+        The vectors are written as ``vectors.npy``, and ids, texts and every
+        metadata field as a :class:`StringColumn`, so all of them can be
+        memory-mapped on load. Every save writes a new version directory and then
+        replaces the ``CURRENT`` pointer file naming it in one rename, so
+        readers never see a half-written snapshot or files of two different
+        saves. The previous version is kept for readers that resolved the
+        pointer just before the switch; older ones are removed.
+
+        Args:
+            path: The snapshot directory. Created if needed.
+        """
+        os.makedirs(path, exist_ok=True)
+        previous = _current_version(path)
+        version = f"{_VERSION_PREFIX}{uuid.uuid4().hex}"
+        directory = os.path.join(path, version)
+        os.makedirs(directory)
+        self._save_files(directory)
+        pointer = os.path.join(path, _CURRENT_FILE)
+        with open(f"{pointer}.tmp", "w", encoding="utf-8") as file:
+            file.write(version)
+        os.replace(f"{pointer}.tmp", pointer)
+        for name in os.listdir(path):
+            if name.startswith(_VERSION_PREFIX) and name not in {version, previous}:
+                shutil.rmtree(os.path.join(path, name), ignore_errors=True)
+
+    def _save_files(self, directory: str) -> None:
+        """Write the snapshot files into a new version directory.
+
+        Subclasses extend this to save their own files along with the store.
+        """
+        with open(os.path.join(directory, _VECTORS_FILE), "wb") as file:
+            np.save(file, np.ascontiguousarray(self.vectors))
+        StringColumn.save(os.path.join(directory, _IDS_COLUMN), self._ids)
+        IdIndex.save(os.path.join(directory, _ID_ORDER_FILE), self._ids)
+        StringColumn.save(os.path.join(directory, _TEXTS_COLUMN), self._texts)
+        keys = MetadataColumns.save(
+            os.path.join(directory, _METADATA_COLUMNS), self._metadatas
+        )
+        documents = {
+            "format": SNAPSHOT_FORMAT_VERSION,
+            "rows": self._size,
+            "metadata": keys,
+        }
+        with open(
+            os.path.join(directory, _DOCUMENTS_FILE), "w", encoding="utf-8"
+        ) as file:
+            json.dump(documents, file, ensure_ascii=False)
+
+    @classmethod
+    def load(
+        cls, path: str, embedding: Embeddings, mmap: bool = True, **kwargs: Any
+    ) -> Self:
+        """Load a store from a snapshot directory written by :meth:`save`.
+
+        Args:
+            path: The snapshot directory.
+            embedding: The embeddings model used for queries and new texts.
+            mmap: Whether to memory-map the vectors and document columns
+                read-only instead of reading them into memory. Mapped pages are
+                shared between processes loading the same snapshot and are
+                copied on the first write.
+            **kwargs: Passed on to the constructor.
+
+        Returns:
+            NumpyVectorStore: The loaded store, of the class it is called on.
+
+        Raises:
+            FileNotFoundError: If the directory contains no snapshot.
+            ValueError: If the snapshot was written in an unsupported format.
+        """
+        directory = _snapshot_directory(path)
+        if directory is None:
+            raise FileNotFoundError(f"No vector store snapshot in {path}")
+        with open(os.path.join(directory, _DOCUMENTS_FILE), encoding="utf-8") as file:
+            documents = json.load(file)
+        if documents.get("format") != SNAPSHOT_FORMAT_VERSION:
+            raise ValueError(f"Unsupported vector store snapshot format in {path}")
+        vectors = np.load(
+            os.path.join(directory, _VECTORS_FILE), mmap_mode="r" if mmap else None
+        )
+
+        store = cls(embedding=embedding, dtype=vectors.dtype.type, **kwargs)
+        if len(vectors) == 0:
+            return store
+        store._vectors = vectors
+        store._size = len(vectors)
+        ids = StringColumn.load(os.path.join(directory, _IDS_COLUMN), mmap)
+        store._ids = ids
+        store._row_of = IdIndex.load(os.path.join(directory, _ID_ORDER_FILE), ids, mmap)
+        store._texts = StringColumn.load(os.path.join(directory, _TEXTS_COLUMN), mmap)
+        store._metadatas = MetadataColumns.load(
+            os.path.join(directory, _METADATA_COLUMNS),
+            documents["metadata"],
+            documents["rows"],
+            mmap,
+        )
+        store._load_files(directory)
+        return store
+
+    def _load_files(self, directory: str) -> None:
+        """Read the files a subclass saved in :meth:`_save_files`."""
+
+    @staticmethod
+    def snapshot_exists(path: str) -> bool:
+        """Return whether a snapshot directory contains a complete snapshot.
+
+        Args:
+            path: The snapshot directory.
+
+        Returns:
+            bool: True if both snapshot files of the current version exist.
+        """
+        directory = _snapshot_directory(path)
+        if directory is None:
+            return False
+        return os.path.isfile(
+            os.path.join(directory, _VECTORS_FILE)
+        ) and os.path.isfile(os.path.join(directory, _DOCUMENTS_FILE))
+
+    def _select_relevance_score_fn(self) -> Callable[[float], float]:
+        return lambda score: score
+
+    @classmethod
+    def from_texts(
+        cls,
+        texts: list[str],
+        embedding: Embeddings,
+        metadatas: list[dict[str, Any]] | None = None,
+        *,
+        ids: list[str] | None = None,
+        **kwargs: Any,
+    ) -> "NumpyVectorStore":
+        """Create a store and add the given texts.
+
+        Args:
+            texts: The texts to add.
+            embedding: The embeddings model used for texts and queries.
+            metadatas: Optional metadata per text.
+            ids: Optional ids per text.
+            **kwargs: Passed on to the constructor.
+
+        Returns:
+            NumpyVectorStore: The populated store.
+        """
+        store = cls(embedding=embedding, **kwargs)
+        store.add_texts(texts, metadatas, ids=ids)
+        return store
+
+    def _search(
+        self, query: np.ndarray, k: int, mask: np.ndarray | None = None
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """Return the rows and scores of the k best matches of a unit query.
+
+        If a row mask is given, only rows where it is True are returned.
+        """
+        if mask is None:
+            return top_k(self._scores(self.vectors, query), k)
+        rows = np.flatnonzero(mask)
+        if len(rows) > _MASKED_SCAN_FRACTION * self._size:
+            scores = self._scores(self.vectors, query)
+            scores[~mask] = -np.inf
+            return top_k(scores, min(k, len(rows)))
+        positions, scores = top_k(self._scores(self.vectors[rows], query), k)
+        return rows[positions], scores
+
+    def _filter_mask(self, filter: Mapping[str, Any]) -> np.ndarray:
+        if self._metadata_index is None:
+            self._metadata_index = MetadataIndex(self._metadatas, self.metadata_values)
+        return self._metadata_index.mask(filter)
+
+    def _scores(self, vectors: np.ndarray, query: np.ndarray) -> np.ndarray:
+        """Score stored vectors against a unit query by inner product."""
+        if vectors.dtype == np.float32:
+            return vectors @ query
+        scores = np.empty(len(vectors), dtype=np.float32)
+        for start in range(0, len(vectors), _FLOAT16_BLOCK_ROWS):
+            block = vectors[start : start + _FLOAT16_BLOCK_ROWS]
+            scores[start : start + len(block)] = block.astype(np.float32) @ query
+        return scores
+
+    def _document(self, row: int) -> Document:
+        return Document(
+            id=self._ids[row],
+            page_content=self._texts[row],
+            metadata=dict(self._metadatas[row]),
+        )
+
+    def _writable_rows(
+        self,
+    ) -> tuple[list[str], list[str], list[Mapping[str, Any]], dict[str, int]]:
+        """Return the row lists, copying the columns of a loaded snapshot once."""
+        ids, texts, metadatas, row_of = (
+            self._ids,
+            self._texts,
+            self._metadatas,
+            self._row_of,
+        )
+        if not (
+            isinstance(ids, list)
+            and isinstance(texts, list)
+            and isinstance(metadatas, list)
+            and isinstance(row_of, dict)
+        ):
+            ids, texts = list(ids), list(texts)
+            metadatas: list[Mapping[str, Any]] = [dict(meta) for meta in metadatas]
+            row_of = {doc_id: row for row, doc_id in enumerate(ids)}
+            self._ids, self._texts, self._metadatas, self._row_of = (
+                ids,
+                texts,
+                metadatas,
+                row_of,
+            )
+        return ids, texts, metadatas, row_of
+
+    def _reserve(self, rows: int, dim: int) -> None:
+        if self._vectors is None:
+            capacity = max(self._initial_capacity, rows)
+            self._vectors = np.empty((capacity, dim), dtype=self._dtype)
+            return
+        if self._vectors.shape[1] != dim:
+            raise ValueError(
+                f"Expected embeddings of size {self._vectors.shape[1]}, got {dim}"
+            )
+        # Memory-mapped snapshots are read-only and are copied on first write.
+        if rows > len(self._vectors) or not self._vectors.flags.writeable:
+            capacity = len(self._vectors)
+            if rows > capacity:
+                capacity = max(rows, 2 * capacity)
+            grown = np.empty((capacity, dim), dtype=self._dtype)
+            grown[: self._size] = self._vectors[: self._size]
+            self._vectors = grown
+
+
+def _current_version(path: str) -> str | None:
+    try:
+        with open(os.path.join(path, _CURRENT_FILE), encoding="utf-8") as file:
+            return file.read().strip() or None
+    except FileNotFoundError:
+        return None
+
+
+def _snapshot_directory(path: str) -> str | None:
+    version = _current_version(path)
+    return None if version is None else os.path.join(path, version)
+
+
+def top_k(scores: np.ndarray, k: int) -> tuple[np.ndarray, np.ndarray]:
+    """Select the k highest scores in descending order.
+
+    Args:
+        scores: One score per row.
+        k: Number of rows to select.
+
+    Returns:
+        tuple[np.ndarray, np.ndarray]: Row indices and their scores.
+    """
+    k = min(k, len(scores))
+    if k == 0:
+        return np.empty(0, dtype=np.intp), np.empty(0, dtype=scores.dtype)
+    candidates = np.argpartition(-scores, k - 1)[:k]
+    order = candidates[np.argsort(-scores[candidates], kind="stable")]
+    return order, scores[order]
+
+
+def normalize(vectors: np.ndarray) -> np.ndarray:
+    """L2-normalize vectors along the last axis, leaving zero vectors as is.
+
+    Args:
+        vectors: A vector or a matrix of row vectors.
+
+    Returns:
+        np.ndarray: The normalized vectors.
+    """
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    return vectors / np.where(norms == 0, 1, norms)
@@ -0,0 +1,109 @@
+import multiprocessing
+import os
+from collections.abc import Callable
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any
+
+from langchain_core.embeddings import Embeddings
+
+# Embeddings model of the current worker process, created once by _init_worker.
+_worker_embeddings: Embeddings | None = None
+
+
+def _init_worker(factory: Callable[[], Embeddings], threads: int) -> None:
+    global _worker_embeddings
+    # Set before the factory imports torch, so workers do not oversubscribe cores.
+    os.environ["OMP_NUM_THREADS"] = str(threads)
+    os.environ["MKL_NUM_THREADS"] = str(threads)
+    os.environ["TOKENIZERS_PARALLELISM"] = "false"
+    _worker_embeddings = factory()
+
+
+def _embed_documents(texts: list[str]) -> list[list[float]]:
+    assert _worker_embeddings is not None
+    return _worker_embeddings.embed_documents(texts)
+
+
+def _embed_query(text: str) -> list[float]:
+    assert _worker_embeddings is not None
+    return _worker_embeddings.embed_query(text)
+
+
+class ProcessPoolEmbeddings(Embeddings):
+    """Embeddings that shard texts across a pool of worker processes.
+
+    Each worker builds its own embeddings model once from ``factory`` when the
+    pool starts. ``embed_documents`` splits its input into shards, embeds them
+    concurrently and returns the vectors in input order, so it can be used as a
+    drop-in replacement for the wrapped model, e.g. by a vector store writer.
+    """
+
+    def __init__(
+        self,
+        factory: Callable[[], Embeddings],
+        workers: int | None = None,
+        shard_size: int = 32,
+        threads_per_worker: int = 1,
+    ) -> None:
+        """Initialize the worker pool.
+
+        Args:
+            factory: Picklable callable creating the embeddings model in each
+                worker, e.g. ``functools.partial(HuggingFaceEmbeddings, ...)``.
+            workers: Number of worker processes. Defaults to the CPU count.
+            shard_size: Number of texts embedded per task.
+            threads_per_worker: Number of intra-op threads each worker may use.
+
+        Raises:
+            ValueError: If ``workers`` or ``shard_size`` is smaller than 1.
+        """
+        if workers is None:
+            workers = os.cpu_count() or 1
+        if workers < 1 or shard_size < 1:
+            raise ValueError("workers and shard_size must be at least 1")
+        self._shard_size = shard_size
+        self._executor = ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(factory, threads_per_worker),
+        )
+
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        """Embed documents in parallel across the worker pool.
+
+        Args:
+            texts: The texts to embed.
+
+        Returns:
+            list[list[float]]: One embedding per input text, in input order.
+        """
+        shards = [
+            texts[start : start + self._shard_size]
+            for start in range(0, len(texts), self._shard_size)
+        ]
+        vectors: list[list[float]] = []
+        for shard_vectors in self._executor.map(_embed_documents, shards):
+            vectors.extend(shard_vectors)
+        return vectors
+
+    def embed_query(self, text: str) -> list[float]:
+        """Embed a query text in one of the workers.
+
+        Args:
+            text: The text to embed.
+
+        Returns:
+            list[float]: The embedding of the query.
+        """
+        return self._executor.submit(_embed_query, text).result()
+
+    def close(self) -> None:
+        """Shut down the worker pool."""
+        self._executor.shutdown()
+
+    def __enter__(self) -> "ProcessPoolEmbeddings":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
@@ -0,0 +1,227 @@
+import asyncio
+import json
+import uuid
+from collections.abc import Mapping, Sequence
+from typing import TYPE_CHECKING, Any, Self
+
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+
+if TYPE_CHECKING:
+    import asyncpg
+    from langchain_postgres.v2.indexes import BaseIndex
+
+# Column names of tables created by PGEngine.init_vectorstore_table.
+ID_COLUMN = "langchain_id"
+CONTENT_COLUMN = "content"
+EMBEDDING_COLUMN = "embedding"
+METADATA_JSON_COLUMN = "langchain_metadata"
+# Name PGVectorStore gives its vector index, so reindex() and drop find it.
+INDEX_NAME_SUFFIX = "langchainvectorindex"
+
+_CONVERTERS = {"INTEGER": int, "BIGINT": int, "DOUBLE PRECISION": float, "TEXT": str}
+
+
+def copy_records(
+    documents: Sequence[Document],
+    ids: Sequence[str],
+    embeddings: Sequence[Sequence[float]],
+    metadata_columns: Mapping[str, str],
+) -> list[tuple[Any, ...]]:
+    """Convert documents into rows of a vector store table for ``COPY``.
+
+    Rows are laid out as PGVectorStore writes them: id, content, embedding, one
+    value per metadata column and the remaining metadata as JSON. Binary COPY
+    does not coerce types, so metadata column values are converted to the
+    Python type of their SQL type. Documents sharing an id are collapsed into
+    the last of them, as consecutive upserts would leave the row.
+
+    Args:
+        documents: The documents to convert.
+        ids: The id of every document.
+        embeddings: The embedding of every document.
+        metadata_columns: SQL type of every metadata column, by name.
+
+    Returns:
+        list[tuple[Any, ...]]: One record per distinct id, in column order.
+    """
+    records: dict[str, tuple[Any, ...]] = {}
+    for doc, doc_id, embedding in zip(documents, ids, embeddings, strict=True):
+        extra = dict(doc.metadata)
+        values = []
+        for name, data_type in metadata_columns.items():
+            value = extra.pop(name, None)
+            if value is not None:
+                value = _CONVERTERS.get(data_type.upper(), str)(value)
+            values.append(value)
+        records.pop(doc_id, None)
+        records[doc_id] = (
+            uuid.UUID(doc_id),
+            doc.page_content,
+            embedding,
+            *values,
+            json.dumps(extra, default=str),
+        )
+    return list(records.values())
+
+
+class PGBulkLoader:
+    """Loads documents into a PGVectorStore table with binary ``COPY``.
+
+    Row-wise INSERTs cost a round trip and a parse per document. The loader
+    instead embeds each batch and streams it with a single binary ``COPY`` over
+    one dedicated connection into a temporary staging table, from which one
+    ``INSERT ... ON CONFLICT`` upserts it into the table, so a document loaded
+    again, e.g. a duplicate in the source, replaces its row. The vector index
+    is dropped before the first batch and built once by
+    :meth:`create_vector_index` after the load, which is much faster than
+    maintaining it row by row.
+
+    The table must exist, e.g. created by ``get_vector_store``. Use the loader
+    as a context manager, or call :meth:`close` when done.
+    """
+
+    def __init__(
+        self,
+        dsn: str,
+        table_name: str,
+        embedding: Embeddings,
+        metadata_columns: Mapping[str, str] | None = None,
+        schema_name: str = "public",
+        maintenance_work_mem: str = "512MB",
+    ) -> None:
+        """Initialize the loader.
+
+        Args:
+            dsn: asyncpg connection string, ``postgresql://user:pw@host/db``.
+            table_name: The vector store table to load into.
+            embedding: The embeddings model used for the documents.
+            metadata_columns: SQL type of every metadata column of the table,
+                by name. Other metadata goes into the JSON column.
+            schema_name: Schema of the table.
+            maintenance_work_mem: Memory Postgres may use to build the vector
+                index. HNSW builds are much faster when the graph fits into it.
+        """
+        self._dsn = dsn
+        self._table_name = table_name
+        self._embedding = embedding
+        self._metadata_columns = dict(metadata_columns or {})
+        self._schema_name = schema_name
+        self._maintenance_work_mem = maintenance_work_mem
+        self._runner = asyncio.Runner()
+        self._connection: asyncpg.Connection | None = None
+        self.rows = 0
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+    @property
+    def index_name(self) -> str:
+        """Name of the vector index of the table."""
+        return f"{self._table_name}{INDEX_NAME_SUFFIX}"
+
+    def add_documents(
+        self, documents: list[Document], ids: list[str] | None = None, **kwargs: Any
+    ) -> list[str]:
+        """Embed documents and copy them into the table.
+
+        Args:
+            documents: The documents to add.
+            ids: Optional UUIDs of the documents. Random UUIDs are used if None.
+            **kwargs: Ignored, for compatibility with
+                ``VectorStore.add_documents``.
+
+        Returns:
+            list[str]: The ids of the added documents.
+        """
+        if ids is None:
+            ids = [str(uuid.uuid4()) for _ in documents]
+        embeddings = self._embedding.embed_documents(
+            [doc.page_content for doc in documents]
+        )
+        records = copy_records(documents, ids, embeddings, self._metadata_columns)
+        self._runner.run(self._copy(records))
+        self.rows += len(records)
+        return ids
+
+    def create_vector_index(self, index: "BaseIndex") -> None:
+        """Build the vector index of the table and refresh its statistics.
+
+        Call this once after the last batch. ``ANALYZE`` lets the planner see
+        the new table size and column statistics, so filtered searches pick
+        sensible plans right away.
+
+        Args:
+            index: The index to build, e.g. ``HNSWIndex()`` or
+                ``IVFFlatIndex(lists=...)``.
+        """
+        self._runner.run(self._create_vector_index(index))
+
+    def close(self) -> None:
+        """Close the connection and the event loop of the loader."""
+        if self._connection is not None:
+            self._runner.run(self._connection.close())
+            self._connection = None
+        self._runner.close()
+
+    async def _connect(self) -> "asyncpg.Connection":
+        if self._connection is None:
+            import asyncpg
+            from pgvector.asyncpg import register_vector
+
+            connection = await asyncpg.connect(
+                self._dsn,
+                server_settings={
+                    "application_name": "movie_recommender_bulk_load",
+                    # A crash only loses rows the next full load rewrites.
+                    "synchronous_commit": "off",
+                },
+            )
+            await register_vector(connection)
+            await connection.execute(f'DROP INDEX IF EXISTS "{self.index_name}"')
+            # Temporary tables skip the WAL; the rows go away on every commit.
+            await connection.execute(
+                f'CREATE TEMPORARY TABLE "{self._table_name}_staging" '
+                f'(LIKE "{self._schema_name}"."{self._table_name}") '
+                "ON COMMIT DELETE ROWS"
+            )
+            self._connection = connection
+        return self._connection
+
+    async def _copy(self, records: list[tuple[Any, ...]]) -> None:
+        connection = await self._connect()
+        columns = [
+            ID_COLUMN,
+            CONTENT_COLUMN,
+            EMBEDDING_COLUMN,
+            *self._metadata_columns,
+            METADATA_JSON_COLUMN,
+        ]
+        names = ", ".join(f'"{column}"' for column in columns)
+        updates = ", ".join(f'"{column}" = EXCLUDED."{column}"' for column in columns)
+        staging = f"{self._table_name}_staging"
+        async with connection.transaction():
+            await connection.copy_records_to_table(
+                staging, schema_name="pg_temp", columns=columns, records=records
+            )
+            await connection.execute(
+                f'INSERT INTO "{self._schema_name}"."{self._table_name}" ({names}) '
+                f'SELECT {names} FROM pg_temp."{staging}" '
+                f'ON CONFLICT ("{ID_COLUMN}") DO UPDATE SET {updates}'
+            )
+
+    async def _create_vector_index(self, index: "BaseIndex") -> None:
+        connection = await self._connect()
+        table = f'"{self._schema_name}"."{self._table_name}"'
+        await connection.execute(
+            f"SET maintenance_work_mem = '{self._maintenance_work_mem}'"
+        )
+        await connection.execute(
+            f'CREATE INDEX "{self.index_name}" ON {table} USING {index.index_type} '
+            f"({EMBEDDING_COLUMN} {index.get_index_function()}) "
+            f"WITH {index.index_options()}"
+        )
+        await connection.execute(f"ANALYZE {table}")
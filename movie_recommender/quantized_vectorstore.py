@@ -0,0 +1,170 @@
+import os
+from collections.abc import Sequence
+from typing import Any
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+
+from movie_recommender.numpy_vectorstore import NumpyVectorStore, top_k
+
+# Number of rows quantized at a time.
+_CODE_BLOCK_ROWS = 65_536
+# Number of int8 rows converted to float32 at a time when scoring codes, which
+# bounds the float32 buffer the conversion needs.
+_SCORE_BLOCK_ROWS = 1024
+_CODES_FILE = "int8_codes.npy"
+_SCALE_FILE = "int8_scale.npy"
+
+
+def quantize_int8(
+    vectors: np.ndarray, scale: np.ndarray | None = None
+) -> tuple[np.ndarray, np.ndarray]:
+    """Quantize vectors to int8 with one symmetric scale per dimension.
+
+    Every dimension is mapped linearly onto [-127, 127] by the largest
+    absolute value it takes, so unit vectors keep about two significant
+    digits per component at a quarter of the float32 size.
+
+    Args:
+        vectors: Row vectors, float32 or float16.
+        scale: Scale per dimension to reuse. Computed from ``vectors`` if None.
+
+    Returns:
+        tuple[np.ndarray, np.ndarray]: The int8 codes and the float32 scale
+            per dimension; ``codes * scale`` approximates the vectors.
+    """
+    if scale is None:
+        peak = np.zeros(vectors.shape[1], dtype=np.float32)
+        for start in range(0, len(vectors), _CODE_BLOCK_ROWS):
+            block = vectors[start : start + _CODE_BLOCK_ROWS]
+            peak = np.maximum(peak, np.abs(block).max(axis=0))
+        scale = np.where(peak > 0, peak / 127, 1).astype(np.float32)
+    codes = np.empty(vectors.shape, dtype=np.int8)
+    for start in range(0, len(vectors), _CODE_BLOCK_ROWS):
+        block = vectors[start : start + _CODE_BLOCK_ROWS].astype(np.float32)
+        codes[start : start + len(block)] = np.clip(np.rint(block / scale), -127, 127)
+    return codes, scale
+
+
+class QuantizedVectorStore(NumpyVectorStore):
+    """Vector store searching int8 codes and re-ranking with full precision.
+
+    Every vector is kept as int8 codes, see :func:`quantize_int8`, a quarter
+    of the float32 size. A query scores all codes, then only the best
+    ``rerank_candidates`` rows are re-scored exactly with their full-precision
+    vectors, which restores the exact order of the results at a fraction of
+    the memory traffic. Loaded snapshots memory-map the codes and the
+    full-precision vectors, so processes share them and only the codes and
+    the re-ranked rows need to be resident.
+
+    The codes are (re)built lazily on the first search after the store
+    changed, or explicitly with :meth:`build_codes`.
+    """
+
+    def __init__(
+        self, embedding: Embeddings, rerank_candidates: int = 100, **kwargs: Any
+    ) -> None:
+        """Initialize the store.
+
+        Args:
+            embedding: The embeddings model used for texts and queries.
+            rerank_candidates: Rows re-scored with full precision per query,
+                at least k. With 0, results are ranked and scored on the codes
+                only.
+            **kwargs: Passed on to :class:`NumpyVectorStore`.
+        """
+        super().__init__(embedding, **kwargs)
+        self.rerank_candidates = rerank_candidates
+        self._codes = np.empty((0, 0), dtype=np.int8)
+        self._scale = np.empty(0, dtype=np.float32)
+        self._codes_stale = True
+
+    @property
+    def codes_nbytes(self) -> int:
+        """Size of the int8 codes and scales in bytes, building them if needed."""
+        if self._codes_stale:
+            self.build_codes()
+        return self._codes.nbytes + self._scale.nbytes
+
+    def add_embeddings(
+        self,
+        texts: Sequence[str],
+        embeddings: Sequence[Sequence[float]] | np.ndarray,
+        metadatas: Sequence[dict[str, Any]] | None = None,
+        ids: Sequence[str | None] | None = None,
+    ) -> list[str]:
+        """Add texts with precomputed embeddings and mark the codes stale.
+
+        See :meth:`NumpyVectorStore.add_embeddings`.
+        """
+        self._codes_stale = True
+        return super().add_embeddings(texts, embeddings, metadatas, ids)
+
+    def delete(self, ids: list[str] | None = None, **kwargs: Any) -> bool | None:
+        """Delete documents by id and mark the codes stale.
+
+        See :meth:`NumpyVectorStore.delete`.
+        """
+        self._codes_stale = True
+        return super().delete(ids, **kwargs)
+
+    def build_codes(self) -> None:
+        """Quantize all vectors of the store."""
+        self._codes, self._scale = quantize_int8(self.vectors)
+        self._codes_stale = False
+
+    def _save_files(self, directory: str) -> None:
+        """Write the store and its int8 codes to a version directory.
+
+        See :meth:`NumpyVectorStore.save`. The codes are saved too, so loading
+        the snapshot does not have to read every full-precision vector.
+        """
+        super()._save_files(directory)
+        if self._codes_stale:
+            self.build_codes()
+        np.save(os.path.join(directory, _CODES_FILE), self._codes)
+        np.save(os.path.join(directory, _SCALE_FILE), self._scale)
+
+    def _load_files(self, directory: str) -> None:
+        """Read the int8 codes saved with the store, if any.
+
+        The codes are mapped whenever the full-precision vectors are, so
+        processes loading the same snapshot share the pages of both.
+        """
+        codes_path = os.path.join(directory, _CODES_FILE)
+        if os.path.exists(codes_path):
+            mmap = isinstance(self._vectors, np.memmap)
+            self._codes = np.load(codes_path, mmap_mode="r" if mmap else None)
+            self._scale = np.load(os.path.join(directory, _SCALE_FILE))
+            self._codes_stale = False
+
+    def _search(
+        self, query: np.ndarray, k: int, mask: np.ndarray | None = None
+    ) -> tuple[np.ndarray, np.ndarray]:
+        if self._codes_stale:
+            self.build_codes()
+        rows = None if mask is None else np.flatnonzero(mask)
+        codes = self._codes if rows is None else self._codes[rows]
+        n_candidates = max(k, self.rerank_candidates)
+        positions, scores = top_k(
+            self._code_scores(codes, query * self._scale), n_candidates
+        )
+        candidates = positions if rows is None else rows[positions]
+        if self.rerank_candidates == 0:
+            return candidates, scores
+        # Ascending rows read memory-mapped vectors in file order.
+        candidates = np.sort(candidates)
+        positions, scores = top_k(self._scores(self.vectors[candidates], query), k)
+        return candidates[positions], scores
+
+    def _code_scores(self, codes: np.ndarray, scaled_query: np.ndarray) -> np.ndarray:
+        """Approximate inner products of the quantized rows with a query."""
+        scores = np.empty(len(codes), dtype=np.float32)
+        buffer = np.empty(
+            (min(len(codes), _SCORE_BLOCK_ROWS), codes.shape[1]), np.float32
+        )
+        for start in range(0, len(codes), _SCORE_BLOCK_ROWS):
+            block = buffer[: len(codes[start : start + _SCORE_BLOCK_ROWS])]
+            np.copyto(block, codes[start : start + len(block)])
+            np.matmul(block, scaled_query, out=scores[start : start + len(block)])
+        return scores
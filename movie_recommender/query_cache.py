@@ -0,0 +1,207 @@
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Callable, Hashable
+from dataclasses import dataclass
+from typing import Any
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+
+from movie_recommender.numpy_vectorstore import normalize
+
+
+@dataclass
+class QueryCacheStats:
+    """Hit and miss counters of a query cache.
+
+    Attributes:
+        embedding_hits: Queries whose embedding was served from the cache.
+        embedding_misses: Queries that had to be embedded.
+        exact_hits: Searches answered from a cached identical query.
+        semantic_hits: Searches answered from a cached near-duplicate query.
+        misses: Searches that had to query the vector store.
+    """
+
+    embedding_hits: int = 0
+    embedding_misses: int = 0
+    exact_hits: int = 0
+    semantic_hits: int = 0
+    misses: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        """Fraction of searches answered without querying the vector store."""
+        hits = self.exact_hits + self.semantic_hits
+        total = hits + self.misses
+        return hits / total if total else 0.0
+
+
+@dataclass
+class _Entry:
+    vector: np.ndarray
+    value: Any
+    expires: float
+
+
+class QueryCache:
+    """LRU and TTL bounded cache of query embeddings and search results.
+
+    Embeddings are memoized by exact query text. Search results are reused for
+    the same query text and search parameters, and also for a different query
+    whose embedding has a cosine similarity of at least
+    ``similarity_threshold`` with a cached one, e.g. "cozy summer comedy" and
+    "summer comedy cozy". The cache is safe to share between threads.
+    """
+
+    def __init__(
+        self,
+        embedding: Embeddings,
+        max_entries: int = 1024,
+        ttl_seconds: float = 3600.0,
+        similarity_threshold: float = 0.95,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        """Initialize the cache.
+
+        Args:
+            embedding: The embeddings model used for queries.
+            max_entries: Maximum number of cached embeddings and of cached
+                results each. The least recently used entries are evicted.
+            ttl_seconds: Seconds after which an entry expires.
+            similarity_threshold: Minimum cosine similarity for a cached result
+                of another query to be reused. Values above 1 disable semantic
+                reuse.
+            clock: Monotonic time source, injectable for tests.
+        """
+        self._embedding = embedding
+        self._max_entries = max_entries
+        self._ttl = ttl_seconds
+        self._threshold = similarity_threshold
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._embeddings: OrderedDict[str, _Entry] = OrderedDict()
+        self._results: OrderedDict[tuple[str, Hashable], _Entry] = OrderedDict()
+        # Stacked result vectors per search parameters, rebuilt after a put.
+        self._matrices: dict[Hashable, tuple[list[Any], np.ndarray]] = {}
+        self.stats = QueryCacheStats()
+
+    def embed(self, query: str) -> np.ndarray:
+        """Return the normalized embedding of a query, memoized by its text.
+
+        Args:
+            query: The query text.
+
+        Returns:
+            np.ndarray: The L2-normalized float32 query embedding.
+        """
+        vector = self._cached_embedding(query)
+        if vector is None:
+            vector = normalize(
+                np.asarray(self._embedding.embed_query(query), dtype=np.float32)
+            )
+            self._store_embedding(query, vector)
+        return vector
+
+    async def aembed(self, query: str) -> np.ndarray:
+        """Asynchronously return the normalized embedding of a query.
+
+        Args:
+            query: The query text.
+
+        Returns:
+            np.ndarray: The L2-normalized float32 query embedding.
+        """
+        vector = self._cached_embedding(query)
+        if vector is None:
+            embedded = await self._embedding.aembed_query(query)
+            vector = normalize(np.asarray(embedded, dtype=np.float32))
+            self._store_embedding(query, vector)
+        return vector
+
+    def get(self, query: str, vector: np.ndarray, params: Hashable = None) -> Any:
+        """Return cached results for the query or a near-duplicate of it.
+
+        Args:
+            query: The query text.
+            vector: The normalized query embedding, as returned by :meth:`embed`.
+            params: Hashable search parameters; results are only shared between
+                queries with equal parameters.
+
+        Returns:
+            Any: The cached results, or None on a miss.
+        """
+        now = self._clock()
+        with self._lock:
+            entry = self._results.get((query, params))
+            if entry is not None and entry.expires > now:
+                self._results.move_to_end((query, params))
+                self.stats.exact_hits += 1
+                return entry.value
+
+            if self._threshold <= 1.0:
+                key = self._nearest(vector, params, now)
+                if key is not None:
+                    self._results.move_to_end(key)
+                    self.stats.semantic_hits += 1
+                    return self._results[key].value
+
+            self.stats.misses += 1
+            return None
+
+    def put(
+        self, query: str, vector: np.ndarray, value: Any, params: Hashable = None
+    ) -> None:
+        """Cache the results of a search.
+
+        Args:
+            query: The query text.
+            vector: The normalized query embedding.
+            value: The search results.
+            params: Hashable search parameters of the search.
+        """
+        with self._lock:
+            self._results[(query, params)] = _Entry(
+                vector, value, self._clock() + self._ttl
+            )
+            self._results.move_to_end((query, params))
+            while len(self._results) > self._max_entries:
+                self._results.popitem(last=False)
+            self._matrices.clear()
+
+    def _cached_embedding(self, query: str) -> np.ndarray | None:
+        with self._lock:
+            entry = self._embeddings.get(query)
+            if entry is not None and entry.expires > self._clock():
+                self._embeddings.move_to_end(query)
+                self.stats.embedding_hits += 1
+                return entry.vector
+            self.stats.embedding_misses += 1
+            return None
+
+    def _store_embedding(self, query: str, vector: np.ndarray) -> None:
+        with self._lock:
+            self._embeddings[query] = _Entry(vector, None, self._clock() + self._ttl)
+            self._embeddings.move_to_end(query)
+            while len(self._embeddings) > self._max_entries:
+                self._embeddings.popitem(last=False)
+
+    def _nearest(
+        self, vector: np.ndarray, params: Hashable, now: float
+    ) -> tuple[str, Hashable] | None:
+        if params not in self._matrices:
+            keys = [key for key in self._results if key[1] == params]
+            if not keys:
+                return None
+            matrix = np.stack([self._results[key].vector for key in keys])
+            self._matrices[params] = (keys, matrix)
+        keys, matrix = self._matrices[params]
+        scores = matrix @ vector
+        for position in np.argsort(-scores):
+            if scores[position] < self._threshold:
+                return None
+            key = keys[position]
+            entry = self._results.get(key)
+            if entry is not None and entry.expires > now:
+                return key
+        return None
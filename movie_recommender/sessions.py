@@ -0,0 +1,163 @@
+import asyncio
+import secrets
+import time
+from collections import OrderedDict
+from collections.abc import Callable
+from dataclasses import dataclass, field
+
+from movie_recommender.llm import MovieRecommenderLLM
+
+
+@dataclass
+class SessionStats:
+    """Counters of a session table.
+
+    Attributes:
+        created: Sessions started.
+        closed: Sessions ended by their client.
+        expired: Sessions evicted after being idle too long.
+        evicted: Least recently used sessions evicted to stay within the limit.
+    """
+
+    created: int = 0
+    closed: int = 0
+    expired: int = 0
+    evicted: int = 0
+
+
+@dataclass
+class Session:
+    """One conversation held by a server.
+
+    Attributes:
+        id: Unguessable id the client refers to the session by.
+        llm: The bot holding the conversation history of the session.
+        last_used: Clock time of the start of the last turn.
+        lock: Serializes the turns of the session, as a turn both reads and
+            appends to the history.
+        turns: Number of turns started.
+    """
+
+    id: str
+    llm: MovieRecommenderLLM
+    last_used: float
+    lock: asyncio.Lock = field(default_factory=asyncio.Lock)
+    turns: int = 0
+
+    @property
+    def busy(self) -> bool:
+        """Whether a turn of the session is running."""
+        return self.lock.locked()
+
+
+class SessionTable:
+    """LRU and idle-timeout bounded table of conversations.
+
+    Every session is created by ``factory``, usually
+    :meth:`MovieRecommenderLLM.new_session` of one shared bot, so sessions
+    only hold their own conversation history. Sessions idle for longer than
+    ``idle_timeout`` expire, and the least recently used session is evicted
+    when a session is created in a full table. Sessions with a running turn
+    are never evicted. The table is meant for a single event loop and is not
+    thread-safe.
+    """
+
+    def __init__(
+        self,
+        factory: Callable[[], MovieRecommenderLLM],
+        max_sessions: int = 1000,
+        idle_timeout: float = 1800.0,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        """Initialize the table.
+
+        Args:
+            factory: Creates the bot of a new session.
+            max_sessions: Maximum number of sessions held at once.
+            idle_timeout: Seconds without a turn after which a session expires.
+            clock: Monotonic time source, injectable for tests.
+        """
+        self._factory = factory
+        self._max_sessions = max_sessions
+        self._idle_timeout = idle_timeout
+        self._clock = clock
+        self._sessions: OrderedDict[str, Session] = OrderedDict()
+        self.stats = SessionStats()
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+    def create(self) -> Session:
+        """Start a new session, evicting the least recently used if full.
+
+        Returns:
+            Session: The new session.
+        """
+        self.expire_idle()
+        if len(self._sessions) >= self._max_sessions:
+            for session in self._sessions.values():
+                if not session.busy:
+                    del self._sessions[session.id]
+                    self.stats.evicted += 1
+                    break
+        session = Session(
+            id=secrets.token_urlsafe(16), llm=self._factory(), last_used=self._clock()
+        )
+        self._sessions[session.id] = session
+        self.stats.created += 1
+        return session
+
+    def get(self, session_id: str) -> Session | None:
+        """Return a session and mark it as used.
+
+        Args:
+            session_id: The id of the session.
+
+        Returns:
+            Session | None: The session, or None if it is unknown, closed or
+                expired.
+        """
+        session = self._sessions.get(session_id)
+        if session is None:
+            return None
+        now = self._clock()
+        if now - session.last_used > self._idle_timeout and not session.busy:
+            del self._sessions[session_id]
+            self.stats.expired += 1
+            return None
+        session.last_used = now
+        self._sessions.move_to_end(session_id)
+        return session
+
+    def close(self, session_id: str) -> bool:
+        """End a session.
+
+        Args:
+            session_id: The id of the session.
+
+        Returns:
+            bool: Whether the session existed.
+        """
+        if self._sessions.pop(session_id, None) is None:
+            return False
+        self.stats.closed += 1
+        return True
+
+    def expire_idle(self) -> int:
+        """Evict all sessions idle for longer than the idle timeout.
+
+        Returns:
+            int: The number of evicted sessions.
+        """
+        deadline = self._clock() - self._idle_timeout
+        # Sessions are ordered by last use, so the idle ones come first.
+        expired = []
+        for session in self._sessions.values():
+            if session.last_used >= deadline:
+                break
+            if not session.busy:
+                expired.append(session.id)
+        for session_id in expired:
+            del self._sessions[session_id]
+        self.stats.expired += len(expired)
+        return len(expired)
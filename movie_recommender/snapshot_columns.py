@@ -0,0 +1,265 @@
+import bisect
+import itertools
+import json
+from collections.abc import Iterable, Iterator, Mapping, Sequence
+from typing import Any, Self, overload
+
+import numpy as np
+
+
+class StringColumn(Sequence[str]):
+    """Read-only strings stored as one UTF-8 byte array with row offsets.
+
+    The bytes and the offsets are ``.npy`` files that :meth:`load` memory-maps,
+    so opening a column reads nothing, every process loading the same files
+    shares their pages, and a string is decoded only when its row is accessed.
+    """
+
+    def __init__(self, data: np.ndarray, offsets: np.ndarray) -> None:
+        """Initialize the column.
+
+        Args:
+            data: The concatenated UTF-8 bytes of all strings, as uint8.
+            offsets: Start offset of every string in ``data``, plus the end.
+        """
+        self._data = data
+        self._offsets = offsets
+
+    @staticmethod
+    def save(path: str, strings: Iterable[str]) -> None:
+        """Write strings as ``<path>.npy`` and ``<path>.offsets.npy``.
+
+        Args:
+            path: The file path without suffix.
+            strings: The strings, one per row.
+        """
+        encoded = [string.encode() for string in strings]
+        offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+        np.cumsum([len(value) for value in encoded], out=offsets[1:])
+        np.save(f"{path}.npy", np.frombuffer(b"".join(encoded), dtype=np.uint8))
+        np.save(f"{path}.offsets.npy", offsets)
+
+    @classmethod
+    def load(cls, path: str, mmap: bool = True) -> Self:
+        """Open a column written by :meth:`save`.
+
+        Args:
+            path: The file path without suffix.
+            mmap: Whether to memory-map the files instead of reading them.
+
+        Returns:
+            StringColumn: The column.
+        """
+        mode = "r" if mmap else None
+        return cls(
+            np.load(f"{path}.npy", mmap_mode=mode),
+            np.load(f"{path}.offsets.npy", mmap_mode=mode),
+        )
+
+    def __len__(self) -> int:
+        return len(self._offsets) - 1
+
+    @overload
+    def __getitem__(self, row: int) -> str: ...
+
+    @overload
+    def __getitem__(self, row: slice) -> list[str]: ...
+
+    def __getitem__(self, row: int | slice) -> str | list[str]:
+        if isinstance(row, slice):
+            return [self[i] for i in range(*row.indices(len(self)))]
+        row = range(len(self))[row]
+        start, end = self._offsets[row], self._offsets[row + 1]
+        return self._data[start:end].tobytes().decode()
+
+    def __iter__(self) -> Iterator[str]:
+        # Reading the whole column at once beats slicing the mapping per row.
+        data = self._data.tobytes()
+        offsets = self._offsets.tolist()
+        return (data[start:end].decode() for start, end in itertools.pairwise(offsets))
+
+
+class MetadataColumns(Sequence[Mapping[str, Any]]):
+    """Read-only row metadata stored column-wise, one JSON value per cell.
+
+    Every field is a :class:`StringColumn` of JSON-encoded values, empty where
+    a row lacks the field. Rows are returned as mappings that decode a cell
+    only when it is read, so a filter on one field never touches the others.
+    """
+
+    def __init__(self, columns: Mapping[str, StringColumn], rows: int) -> None:
+        """Initialize the columns.
+
+        Args:
+            columns: The column of every metadata field.
+            rows: The number of rows.
+        """
+        self._columns = columns
+        self._rows = rows
+
+    @staticmethod
+    def save(path: str, metadatas: Sequence[Mapping[str, Any]]) -> list[str]:
+        """Write one column per metadata field as ``<path>-<n>`` files.
+
+        Values JSON cannot encode are saved as their string form.
+
+        Args:
+            path: The file path prefix.
+            metadatas: The metadata of every row.
+
+        Returns:
+            list[str]: The fields, in the order of their column numbers.
+        """
+        metadatas = list(metadatas)
+        keys = list(dict.fromkeys(key for meta in metadatas for key in meta))
+        for number, key in enumerate(keys):
+            StringColumn.save(
+                f"{path}-{number}",
+                (
+                    json.dumps(meta[key], ensure_ascii=False, default=str)
+                    if key in meta
+                    else ""
+                    for meta in metadatas
+                ),
+            )
+        return keys
+
+    @classmethod
+    def load(cls, path: str, keys: Sequence[str], rows: int, mmap: bool = True) -> Self:
+        """Open the columns written by :meth:`save`.
+
+        Args:
+            path: The file path prefix.
+            keys: The fields returned by :meth:`save`.
+            rows: The number of rows.
+            mmap: Whether to memory-map the files instead of reading them.
+
+        Returns:
+            MetadataColumns: The columns.
+        """
+        return cls(
+            {
+                key: StringColumn.load(f"{path}-{number}", mmap)
+                for number, key in enumerate(keys)
+            },
+            rows,
+        )
+
+    def __len__(self) -> int:
+        return self._rows
+
+    def values(self, key: str) -> list[Any]:
+        """Decode one field of every row, None where it is missing.
+
+        Args:
+            key: The metadata field.
+
+        Returns:
+            list[Any]: The values, indexed by row.
+        """
+        column = self._columns.get(key)
+        if column is None:
+            return [None] * self._rows
+        return [json.loads(cell) if cell else None for cell in column]
+
+    def __iter__(self) -> Iterator[Mapping[str, Any]]:
+        # Decoding column by column beats reading every row's cells one by one.
+        rows: list[dict[str, Any]] = [{} for _ in range(self._rows)]
+        for key, column in self._columns.items():
+            for metadata, cell in zip(rows, column, strict=True):
+                if cell:
+                    metadata[key] = json.loads(cell)
+        return iter(rows)
+
+    @overload
+    def __getitem__(self, row: int) -> Mapping[str, Any]: ...
+
+    @overload
+    def __getitem__(self, row: slice) -> list[Mapping[str, Any]]: ...
+
+    def __getitem__(
+        self, row: int | slice
+    ) -> Mapping[str, Any] | list[Mapping[str, Any]]:
+        if isinstance(row, slice):
+            return [self[i] for i in range(*row.indices(len(self)))]
+        return _MetadataRow(self._columns, range(self._rows)[row])
+
+
+class _MetadataRow(Mapping[str, Any]):
+    """Metadata of one row of :class:`MetadataColumns`, decoded per field."""
+
+    def __init__(self, columns: Mapping[str, StringColumn], row: int) -> None:
+        self._columns = columns
+        self._row = row
+
+    def __getitem__(self, key: str) -> Any:
+        cell = self._columns[key][self._row]
+        if not cell:
+            raise KeyError(key)
+        return json.loads(cell)
+
+    def __iter__(self) -> Iterator[str]:
+        return (key for key, column in self._columns.items() if column[self._row])
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
+
+
+class IdIndex(Mapping[str, int]):
+    """Read-only mapping of document ids to rows, searched in a sorted order.
+
+    The rows sorted by id are saved next to the ids, so a lookup is a binary
+    search decoding a few ids instead of a dict built from all of them.
+    """
+
+    def __init__(self, ids: StringColumn, order: np.ndarray) -> None:
+        """Initialize the index.
+
+        Args:
+            ids: The id of every row.
+            order: The rows, sorted by id.
+        """
+        self._ids = ids
+        self._order = order
+
+    @staticmethod
+    def save(path: str, ids: Sequence[str]) -> None:
+        """Write the rows sorted by id as ``<path>.npy``.
+
+        Args:
+            path: The file path without suffix.
+            ids: The id of every row.
+        """
+        ids = list(ids)
+        order = sorted(range(len(ids)), key=ids.__getitem__)
+        np.save(f"{path}.npy", np.array(order, dtype=np.int64))
+
+    @classmethod
+    def load(cls, path: str, ids: StringColumn, mmap: bool = True) -> Self:
+        """Open an index written by :meth:`save`.
+
+        Args:
+            path: The file path without suffix.
+            ids: The id of every row.
+            mmap: Whether to memory-map the file instead of reading it.
+
+        Returns:
+            IdIndex: The index.
+        """
+        return cls(ids, np.load(f"{path}.npy", mmap_mode="r" if mmap else None))
+
+    def __getitem__(self, doc_id: str) -> int:
+        position = bisect.bisect_left(
+            range(len(self._order)), doc_id, key=lambda i: self._ids[self._order[i]]
+        )
+        if position < len(self._order):
+            row = int(self._order[position])
+            if self._ids[row] == doc_id:
+                return row
+        raise KeyError(doc_id)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._ids)
+
+    def __len__(self) -> int:
+        return len(self._ids)
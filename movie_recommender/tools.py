@@ -1,34 +1,385 @@
+import json
+import math
+from collections.abc import Sequence
+from typing import Any, Literal
+
 from langchain_core.documents import Document
-from langchain_core.tools import BaseTool, tool
+from langchain_core.tools import BaseTool, StructuredTool
+from langchain_core.vectorstores import InMemoryVectorStore, VectorStore
+
+from movie_recommender import metrics
+from movie_recommender.bm25 import BM25Index, reciprocal_rank_fusion
+from movie_recommender.metadata_index import MetadataIndex
+from movie_recommender.neighbors import NeighborGraph
+from movie_recommender.query_cache import QueryCache
+
+DEFAULT_K = 5
+DEFAULT_FIELDS = ("title", "release_date", "genres", "vote_average")
+DEFAULT_OVERVIEW_CHARS = 240
+# Limit of every other rendered field, e.g. long cast lists.
+_MAX_FIELD_CHARS = 80
+NO_RESULTS = "No matching movies found."
+# TMDB popularity separating blockbusters from indie movies.
+BLOCKBUSTER_POPULARITY = 20.0
+
+
+def _truncate(text: str, limit: int) -> str:
+    if len(text) <= limit:
+        return text
+    return text[:limit].rstrip() + "…"
+
+
+def _format_value(value: Any) -> str | None:
+    if value is None or (isinstance(value, float) and math.isnan(value)):
+        return None
+    if isinstance(value, float):
+        return f"{round(value, 1):g}"
+    if isinstance(value, list | tuple):
+        value = ", ".join(str(item) for item in value)
+    text = str(value).strip()
+    return _truncate(text, _MAX_FIELD_CHARS) if text else None
 
 
-def make_movie_recommendation_tool(store) -> BaseTool:
+def render_movies(
+    documents: Sequence[Document],
+    fields: Sequence[str] = DEFAULT_FIELDS,
+    overview_chars: int = DEFAULT_OVERVIEW_CHARS,
+) -> str:
+    """Render search results compactly for the model's context.
+
+    Every movie becomes one ``field: value`` line with the selected metadata
+    fields, followed by its truncated overview, instead of the repr of the full
+    Document with all metadata columns.
+
+    Args:
+        documents: The movies to render.
+        fields: Metadata fields to include, in order. Missing and empty values
+            are skipped.
+        overview_chars: Maximum number of characters of the overview. The
+            overview is omitted if 0.
+
+    Returns:
+        str: The rendered movies, separated by blank lines.
+    """
+    if not documents:
+        return NO_RESULTS
+    blocks = []
+    for doc in documents:
+        values = ((field, _format_value(doc.metadata.get(field))) for field in fields)
+        lines = ["; ".join(f"{field}: {value}" for field, value in values if value)]
+        if overview_chars > 0 and doc.page_content:
+            lines.append(f"overview: {_truncate(doc.page_content, overview_chars)}")
+        blocks.append("\n".join(line for line in lines if line))
+    return "\n\n".join(blocks)
+
+
+def build_filter(
+    year_from: int | None = None,
+    year_to: int | None = None,
+    language: str | None = None,
+    genres: Sequence[str] | None = None,
+    popularity: Literal["blockbuster", "indie"] | None = None,
+    blockbuster_popularity: float = BLOCKBUSTER_POPULARITY,
+) -> dict[str, Any] | None:
+    """Translate structured movie preferences into a metadata filter.
+
+    The filter uses the operators of ``PGVectorStore``, which turns it into
+    SQL ``WHERE`` clauses, and of :class:`MetadataIndex`, which evaluates it
+    on the NumPy stores.
+
+    Args:
+        year_from: Earliest release year.
+        year_to: Latest release year.
+        language: ISO 639-1 code of the original language, e.g. "en".
+        genres: Genres of which a movie must have at least one.
+        popularity: "blockbuster" or "indie".
+        blockbuster_popularity: Popularity from which a movie is a blockbuster.
+
+    Returns:
+        dict[str, Any] | None: The filter, or None without preferences.
+    """
+    clauses: list[dict[str, Any]] = []
+    if year_from is not None:
+        clauses.append({"release_year": {"$gte": year_from}})
+    if year_to is not None:
+        clauses.append({"release_year": {"$lte": year_to}})
+    if language:
+        clauses.append({"original_language": language.lower()})
+    genre_clauses = [{"genres": {"$ilike": f"%{genre}%"}} for genre in genres or []]
+    if len(genre_clauses) == 1:
+        clauses.extend(genre_clauses)
+    elif genre_clauses:
+        clauses.append({"$or": genre_clauses})
+    if popularity == "blockbuster":
+        clauses.append({"popularity": {"$gte": blockbuster_popularity}})
+    elif popularity == "indie":
+        clauses.append({"popularity": {"$lt": blockbuster_popularity}})
+    if not clauses:
+        return None
+    return clauses[0] if len(clauses) == 1 else {"$and": clauses}
+
+
+def make_movie_recommendation_tool(
+    store,
+    cache: QueryCache | None = None,
+    k: int = DEFAULT_K,
+    fields: Sequence[str] = DEFAULT_FIELDS,
+    overview_chars: int = DEFAULT_OVERVIEW_CHARS,
+    blockbuster_popularity: float = BLOCKBUSTER_POPULARITY,
+    lexical_index: BM25Index | None = None,
+    hybrid_candidates: int = 30,
+) -> BaseTool:
     """Factory function to create a movie recommendation tool.
 
     This function takes a vector store as input and returns a tool that can be used
-    by the agent to perform movie recommendations based on user queries.
+    by the agent to perform movie recommendations based on user queries. The tool
+    has a sync and an async implementation; the async one awaits the store's
+    ``asimilarity_search`` so async agents do not block the event loop.
+
+    The model only sees the compact rendering of :func:`render_movies`; the
+    matching Documents are attached to the tool message as its artifact.
+    Structured preferences are passed to the store as a metadata filter built
+    by :func:`build_filter`, so only matching movies are ranked.
+
+    With a lexical index, the search is hybrid: the top ``hybrid_candidates``
+    movies by vector similarity and by BM25 are merged by reciprocal-rank
+    fusion, so queries naming an actor, director or title find exact matches
+    the embedding model misses.
 
     Args:
         store: The vector store instance to use for similarity search.
+        cache: Optional query cache. Query embeddings and results are then
+            reused for repeated and near-duplicate queries.
+        k: Number of movies returned per query.
+        fields: Metadata fields shown to the model.
+        overview_chars: Maximum number of overview characters shown per movie.
+        blockbuster_popularity: Popularity from which a movie is a blockbuster.
+        lexical_index: Optional BM25 index over the movies of ``store``.
+        hybrid_candidates: Number of candidates of each retriever in a hybrid
+            search.
 
     Returns:
         tool: A LangChain tool that performs movie recommendations.
     """
 
-    @tool()
-    def movie_recommendation(query: str) -> list[Document]:
+    # With a lexical index, both retrievers contribute candidates for fusion.
+    candidates = max(k, hybrid_candidates) if lexical_index is not None else k
+
+    def search(query: str, filter: dict[str, Any] | None) -> list[Document]:
+        params = (k, json.dumps(filter, sort_keys=True))
+        vector = None
+        if cache is not None:
+            vector = cache.embed(query)
+            with metrics.timer("cache_lookup"):
+                res = cache.get(query, vector, params=params)
+            if res is not None:
+                return res
+        with metrics.timer("vector_search"):
+            if vector is None:
+                res = store.similarity_search(
+                    query, k=candidates, filter=_store_filter(filter)
+                )
+            else:
+                res = store.similarity_search_by_vector(
+                    vector.tolist(), k=candidates, filter=_store_filter(filter)
+                )
+        if lexical_index is not None:
+            with metrics.timer("lexical_search"):
+                ids = [doc_id for doc_id, _ in lexical_index.search(query, candidates)]
+                res = _fuse(res, ids, store.get_by_ids(ids), filter)
+        if cache is not None and vector is not None:
+            cache.put(query, vector, res, params=params)
+        return res
+
+    async def asearch(query: str, filter: dict[str, Any] | None) -> list[Document]:
+        params = (k, json.dumps(filter, sort_keys=True))
+        vector = None
+        if cache is not None:
+            vector = await cache.aembed(query)
+            with metrics.timer("cache_lookup"):
+                res = cache.get(query, vector, params=params)
+            if res is not None:
+                return res
+        with metrics.timer("vector_search"):
+            if vector is None:
+                res = await store.asimilarity_search(
+                    query, k=candidates, filter=_store_filter(filter)
+                )
+            else:
+                res = await store.asimilarity_search_by_vector(
+                    vector.tolist(), k=candidates, filter=_store_filter(filter)
+                )
+        if lexical_index is not None:
+            with metrics.timer("lexical_search"):
+                ids = [doc_id for doc_id, _ in lexical_index.search(query, candidates)]
+                res = _fuse(res, ids, await store.aget_by_ids(ids), filter)
+        if cache is not None and vector is not None:
+            cache.put(query, vector, res, params=params)
+        return res
+
+    def _fuse(
+        vector_docs: list[Document],
+        lexical_ids: list[str],
+        lexical_docs: list[Document],
+        filter: dict[str, Any] | None,
+    ) -> list[Document]:
+        found = {doc.id: doc for doc in lexical_docs}
+        lexical_docs = [found[doc_id] for doc_id in lexical_ids if doc_id in found]
+        if filter and lexical_docs:
+            mask = MetadataIndex([doc.metadata for doc in lexical_docs]).mask(filter)
+            lexical_docs = [
+                doc for doc, keep in zip(lexical_docs, mask, strict=True) if keep
+            ]
+        # Documents without an id cannot be matched across rankings.
+        by_id = {
+            doc.id: doc for doc in [*lexical_docs, *vector_docs] if doc.id is not None
+        }
+        ranking = reciprocal_rank_fusion(
+            [
+                [doc.id for doc in docs if doc.id is not None]
+                for docs in (vector_docs, lexical_docs)
+            ]
+        )
+        return [by_id[doc_id] for doc_id in ranking[:k]]
+
+    def _store_filter(filter: dict[str, Any] | None) -> Any:
+        # InMemoryVectorStore only accepts a predicate on documents.
+        if filter is None or not isinstance(store, InMemoryVectorStore):
+            return filter
+        return lambda doc: bool(MetadataIndex([doc.metadata]).mask(filter)[0])
+
+    def movie_recommendation(
+        query: str,
+        year_from: int | None = None,
+        year_to: int | None = None,
+        language: str | None = None,
+        genres: list[str] | None = None,
+        popularity: Literal["blockbuster", "indie"] | None = None,
+    ) -> tuple[str, list[Document]]:
         """Tool to recommend movies based on a user query.
 
         Searches the vector store for movies that match the user's query
-        using semantic similarity search.
+        using semantic similarity search, restricted to the given preferences.
 
         Args:
             query: The user's search query describing their movie preferences.
+            year_from: Earliest release year, e.g. 1990 for "90s or later".
+            year_to: Latest release year, e.g. 1999 for "up to the 90s".
+            language: ISO 639-1 code of the original language, e.g. "en", "fr".
+            genres: TMDB genres of which a movie must have at least one, e.g.
+                ["Comedy", "Science Fiction"].
+            popularity: "blockbuster" for popular mainstream movies or "indie"
+                for lesser-known ones.
 
         Returns:
-            list[Document]: A list of Document objects representing matching movies.
+            tuple[str, list[Document]]: The compact rendering of the matching
+                movies and the matching Documents.
         """
-        res = store.similarity_search(query)
-        return res
+        filter = build_filter(
+            year_from, year_to, language, genres, popularity, blockbuster_popularity
+        )
+        res = search(query, filter)
+        return render_movies(res, fields, overview_chars), res
+
+    async def amovie_recommendation(
+        query: str,
+        year_from: int | None = None,
+        year_to: int | None = None,
+        language: str | None = None,
+        genres: list[str] | None = None,
+        popularity: Literal["blockbuster", "indie"] | None = None,
+    ) -> tuple[str, list[Document]]:
+        filter = build_filter(
+            year_from, year_to, language, genres, popularity, blockbuster_popularity
+        )
+        res = await asearch(query, filter)
+        return render_movies(res, fields, overview_chars), res
+
+    return StructuredTool.from_function(
+        func=movie_recommendation,
+        coroutine=amovie_recommendation,
+        name="movie_recommendation",
+        response_format="content_and_artifact",
+    )
+
+
+def make_similar_movies_tool(
+    store: VectorStore,
+    graph: NeighborGraph,
+    k: int = DEFAULT_K,
+    fields: Sequence[str] = DEFAULT_FIELDS,
+    overview_chars: int = DEFAULT_OVERVIEW_CHARS,
+) -> BaseTool:
+    """Factory function to create a "more like this" tool.
+
+    The tool finds a movie by title or TMDB id and answers with its
+    precomputed nearest neighbours from ``graph``, so it needs neither a
+    query embedding nor a vector search, only a lookup and the retrieval of
+    the neighbours' documents from ``store``.
+
+    Args:
+        store: The vector store holding the movies of ``graph``.
+        graph: The neighbour graph, see
+            :func:`~movie_recommender.neighbors.build_neighbor_graph`.
+        k: Number of similar movies returned.
+        fields: Metadata fields shown to the model.
+        overview_chars: Maximum number of overview characters shown per movie.
+
+    Returns:
+        tool: A LangChain tool that finds movies similar to a given one.
+    """
+
+    def _neighbor_ids(title: str | None, movie_id: int | None) -> list[str] | None:
+        with metrics.timer("neighbor_lookup"):
+            doc_id = graph.find(title=title, source_id=movie_id)
+            if doc_id is None:
+                return None
+            return [neighbor for neighbor, _ in graph.similar(doc_id, k)]
+
+    def _in_order(ids: list[str], documents: list[Document]) -> list[Document]:
+        # Not every store returns documents in the order of the requested ids.
+        found = {doc.id: doc for doc in documents}
+        return [found[doc_id] for doc_id in ids if doc_id in found]
+
+    def _not_found(title: str | None, movie_id: int | None) -> str:
+        movie = f"with id {movie_id}" if movie_id is not None else f"titled {title!r}"
+        return f"No movie {movie} found. Search by description instead."
+
+    def similar_movies(
+        title: str | None = None, movie_id: int | None = None
+    ) -> tuple[str, list[Document]]:
+        """Tool to find movies similar to a movie the user names.
+
+        Use it when the user asks for movies like a given one, e.g. "something
+        like Alien", instead of describing that movie in a search query.
+
+        Args:
+            title: Title of the movie, e.g. "Alien".
+            movie_id: TMDB id of the movie, if the user gave it. Takes
+                precedence over the title.
+
+        Returns:
+            tuple[str, list[Document]]: The compact rendering of the similar
+                movies and their Documents.
+        """
+        ids = _neighbor_ids(title, movie_id)
+        if ids is None:
+            return _not_found(title, movie_id), []
+        res = _in_order(ids, store.get_by_ids(ids))
+        return render_movies(res, fields, overview_chars), res
+
+    async def asimilar_movies(
+        title: str | None = None, movie_id: int | None = None
+    ) -> tuple[str, list[Document]]:
+        ids = _neighbor_ids(title, movie_id)
+        if ids is None:
+            return _not_found(title, movie_id), []
+        res = _in_order(ids, await store.aget_by_ids(ids))
+        return render_movies(res, fields, overview_chars), res
 
-    return movie_recommendation
+    return StructuredTool.from_function(
+        func=similar_movies,
+        coroutine=asimilar_movies,
+        name="similar_movies",
+        response_format="content_and_artifact",
+    )
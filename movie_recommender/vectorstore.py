@@ -1,31 +1,121 @@
+import asyncio
+import logging
 import os
-from typing import Any
+import time
+import weakref
+from functools import cache, partial
+from typing import TYPE_CHECKING, Any
 
 from dotenv import load_dotenv
-from langchain_core.embeddings import Embeddings
-from langchain_core.vectorstores import VectorStore
-from langchain_huggingface import HuggingFaceEmbeddings
 
 from movie_recommender import config
-from movie_recommender.data_sources import KaggleCSVDataSource
-from movie_recommender.indexer import MovieIndexer
+
+# Heavy modules (torch, pandas, kagglehub, the stores) are imported where they
+# are used, so importing this module for one factory does not load them all.
+if TYPE_CHECKING:
+    from langchain_core.embeddings import Embeddings
+    from langchain_core.vectorstores import VectorStore
+    from langchain_postgres import PGEngine
+
+    from movie_recommender.indexer import MovieIndexer
+    from movie_recommender.manifest import IndexManifest
+    from movie_recommender.numpy_vectorstore import NumpyVectorStore
 
 load_dotenv()
+logger = logging.getLogger(__name__)
+
+# Metadata fields stored in their own table columns, so search filters on them
+# become SQL WHERE clauses on typed columns instead of JSON lookups.
+PG_FILTER_COLUMNS: dict[str, str] = {
+    "release_year": "INTEGER",
+    "original_language": "TEXT",
+    "genres": "TEXT",
+    "popularity": "DOUBLE PRECISION",
+}
+
+
+def get_embeddings(
+    use_cache: bool = True, workers: int = 1, backend: str | None = None
+) -> "Embeddings":
+    """Factory method to create the configured embeddings model.
+
+    Args:
+        use_cache: Whether to wrap the model in the persistent embedding cache
+            configured by ``EMBEDDING_CACHE_PATH``. An empty path disables it.
+        workers: Number of worker processes to embed documents with. With more
+            than one worker, the model is loaded once in each worker process.
+        backend: Inference backend of the model, "torch", "onnx" or
+            "onnx-int8" (default ``EMBEDDING_BACKEND``), see
+            :func:`~movie_recommender.embedding_backends.backend_model_kwargs`.
+
+    Returns:
+        Embeddings: The embeddings model, optionally parallelized and backed by
+            the cache. Its calls are timed, see
+            :class:`~movie_recommender.metrics.TimedEmbeddings`.
+
+    Raises:
+        ValueError: If the backend is not supported.
+    """
+    from langchain_huggingface import HuggingFaceEmbeddings
+
+    from movie_recommender.embedding_backends import backend_model_kwargs
+    from movie_recommender.embedding_cache import CachedEmbeddings
+    from movie_recommender.metrics import TimedEmbeddings
+    from movie_recommender.parallel_embeddings import ProcessPoolEmbeddings
+
+    model_name = os.getenv("EMBEDDING_MODEL", config.EMBEDDING_MODEL)
+    backend = backend or os.getenv("EMBEDDING_BACKEND", config.EMBEDDING_BACKEND)
+    factory = partial(
+        HuggingFaceEmbeddings,
+        model_name=model_name,
+        model_kwargs=backend_model_kwargs(backend, config.EMBEDDING_ONNX_FILE),
+    )
+    embedding: Embeddings
+    if workers > 1:
+        embedding = ProcessPoolEmbeddings(factory, workers=workers)
+    else:
+        embedding = factory()
+    embedding = TimedEmbeddings(embedding)
+    if use_cache and config.EMBEDDING_CACHE_PATH:
+        embedding = CachedEmbeddings(
+            embedding,
+            # Backends differ slightly, so each one caches its own vectors.
+            model_name=model_name if backend == "torch" else f"{model_name}@{backend}",
+            path=config.EMBEDDING_CACHE_PATH,
+            max_bytes=config.EMBEDDING_CACHE_MAX_BYTES,
+        )
+    return embedding
 
 
 def get_vector_store(
-    vector_store_name: str, embedding: Embeddings, **kwargs: Any
-) -> VectorStore:
+    vector_store_name: str, embedding: "Embeddings", **kwargs: Any
+) -> "VectorStore":
     """Factory method to create a vector store based on the given name.
 
-    Supports both in-memory and PostgreSQL-based vector stores.
+    Supports in-memory, NumPy-backed and PostgreSQL-based vector stores.
 
     Args:
         vector_store_name: Name of the vector store to create
-            ("in_memory" or "pgvectorstore").
+            ("in_memory", "numpy", "ivf", "int8" or "pgvectorstore").
         embedding: The embeddings model to use for the vector store.
-        **kwargs: Additional keyword arguments. For "pgvectorstore",
-            accepts "initialize_table" (bool) to control table creation.
+        **kwargs: Additional keyword arguments. For "numpy", "ivf" and "int8",
+            accepts "dtype" (np.float32 or np.float16) for the vector matrix
+            and "path" (default ``VECTOR_STORE_PATH``) of a snapshot that is
+            memory-mapped if it exists, unless "overwrite_existing" is True;
+            "ivf" also accepts "n_lists" and "n_probe" (default from
+            ``IVF_N_LISTS`` and ``IVF_N_PROBE``) to trade recall for latency;
+            "int8" also accepts "rerank_candidates" (default
+            ``QUANTIZED_RERANK_CANDIDATES``), the rows re-scored with full
+            precision after searching the int8 codes. For "pgvectorstore",
+            accepts "read_only" (bool, default False) to attach to an existing
+            table without any DDL through a read-only connection pool,
+            "initialize_table" (bool, default ``not read_only``) to create the
+            table if needed and "overwrite_existing" (bool, default False) to
+            drop an existing table first. Without overwriting, an existing
+            table is kept as is. The table has one column per
+            ``PG_FILTER_COLUMNS`` entry, so tables created before these columns
+            existed must be re-indexed. The connection pool is shared by all
+            stores of the process, see :func:`get_pg_engine`.
 
     Returns:
         VectorStore: An instance of the specified vector store.
@@ -37,53 +127,371 @@ def get_vector_store(
         from langchain_core.vectorstores import InMemoryVectorStore
 
         return InMemoryVectorStore(embedding=embedding)
-    if vector_store_name == "pgvectorstore":
-        from langchain_postgres import PGEngine, PGVectorStore
+    if vector_store_name in {"numpy", "ivf", "int8"}:
+        import numpy as np
 
-        connection_string = (
-            f"postgresql+asyncpg://{config.PG_USER}:{config.PG_PASSWORD}@{config.PG_HOST}"
-            f":{config.PG_PORT}/{config.PG_DB}"
-        )
+        from movie_recommender.ivf_vectorstore import IVFVectorStore
+        from movie_recommender.numpy_vectorstore import NumpyVectorStore
+        from movie_recommender.quantized_vectorstore import QuantizedVectorStore
 
-        pg_engine = PGEngine.from_connection_string(connection_string)
-        if kwargs.get("initialize_table", True):
-            pg_engine.init_vectorstore_table(
-                table_name=config.TABLE_NAME,
-                vector_size=config.VECTOR_SIZE,
-                overwrite_existing=True,
+        store_cls = NumpyVectorStore
+        options: dict[str, Any] = {"dtype": kwargs.get("dtype", np.float32)}
+        if vector_store_name == "ivf":
+            store_cls = IVFVectorStore
+            options["n_lists"] = kwargs.get("n_lists", config.IVF_N_LISTS or None)
+            options["n_probe"] = kwargs.get("n_probe", config.IVF_N_PROBE)
+        elif vector_store_name == "int8":
+            store_cls = QuantizedVectorStore
+            options["rerank_candidates"] = kwargs.get(
+                "rerank_candidates", config.QUANTIZED_RERANK_CANDIDATES
             )
 
+        path = kwargs.get("path", config.VECTOR_STORE_PATH)
+        if (
+            path
+            and not kwargs.get("overwrite_existing", False)
+            and store_cls.snapshot_exists(path)
+        ):
+            options.pop("dtype")
+            return store_cls.load(path, embedding, **options)
+        return store_cls(embedding=embedding, **options)
+    if vector_store_name == "pgvectorstore":
+        from langchain_postgres import Column, PGVectorStore
+
+        read_only = kwargs.get("read_only", False)
+        pg_engine = get_pg_engine(read_only=read_only)
+        if kwargs.get("initialize_table", not read_only):
+            from sqlalchemy.exc import ProgrammingError
+
+            try:
+                pg_engine.init_vectorstore_table(
+                    table_name=config.TABLE_NAME,
+                    vector_size=config.VECTOR_SIZE,
+                    metadata_columns=[
+                        Column(name, data_type)
+                        for name, data_type in PG_FILTER_COLUMNS.items()
+                    ],
+                    overwrite_existing=kwargs.get("overwrite_existing", False),
+                )
+            except ProgrammingError as err:
+                if "already exists" not in str(err):
+                    raise
+
         return PGVectorStore.create_sync(
             engine=pg_engine,
             table_name=config.TABLE_NAME,
             embedding_service=embedding,
+            metadata_columns=list(PG_FILTER_COLUMNS),
         )
     else:
         raise ValueError(f"Unsupported vector store: {vector_store_name}")
 
 
+async def aget_vector_store(
+    vector_store_name: str, embedding: "Embeddings", **kwargs: Any
+) -> "VectorStore":
+    """Async factory method to create a vector store based on the given name.
+
+    For "pgvectorstore", the engine runs on the caller's event loop instead of
+    the background loop thread that ``PGVectorStore.create_sync`` relies on, so
+    async searches do not hop between loops, see :func:`aget_pg_engine`. All
+    other stores are created as by :func:`get_vector_store`.
+
+    Args:
+        vector_store_name: Name of the vector store to create.
+        embedding: The embeddings model to use for the vector store.
+        **kwargs: Additional keyword arguments, see :func:`get_vector_store`.
+
+    Returns:
+        VectorStore: An instance of the specified vector store.
+
+    Raises:
+        ValueError: If the specified vector store is not supported.
+    """
+    if vector_store_name != "pgvectorstore":
+        return get_vector_store(vector_store_name, embedding, **kwargs)
+
+    from langchain_postgres import Column, PGVectorStore
+    from sqlalchemy.exc import ProgrammingError
+
+    read_only = kwargs.get("read_only", False)
+    pg_engine = await aget_pg_engine(read_only=read_only)
+    if kwargs.get("initialize_table", not read_only):
+        try:
+            await pg_engine.ainit_vectorstore_table(
+                table_name=config.TABLE_NAME,
+                vector_size=config.VECTOR_SIZE,
+                metadata_columns=[
+                    Column(name, data_type)
+                    for name, data_type in PG_FILTER_COLUMNS.items()
+                ],
+                overwrite_existing=kwargs.get("overwrite_existing", False),
+            )
+        except ProgrammingError as err:
+            if "already exists" not in str(err):
+                raise
+
+    return await PGVectorStore.create(
+        engine=pg_engine,
+        table_name=config.TABLE_NAME,
+        embedding_service=embedding,
+        metadata_columns=list(PG_FILTER_COLUMNS),
+    )
+
+
+# Engines bound to the event loops of async callers, see aget_pg_engine.
+_async_pg_engines: weakref.WeakKeyDictionary[
+    asyncio.AbstractEventLoop, dict[bool, "PGEngine"]
+] = weakref.WeakKeyDictionary()
+
+
+@cache
+def get_pg_engine(read_only: bool = False) -> "PGEngine":
+    """Return the process-wide Postgres engine for synchronous callers.
+
+    The engine and its connection pool are created on first use and reused by
+    every store, so the indexer, ``search()`` and the chat tool do not open
+    new connections per call. Its queries run on the background event loop of
+    ``PGEngine``.
+
+    Args:
+        read_only: Whether the pool's sessions are read-only, so attached
+            stores cannot modify the table or run DDL by accident.
+
+    Returns:
+        PGEngine: The shared engine.
+    """
+    from langchain_postgres import PGEngine
+
+    return PGEngine.from_connection_string(
+        _pg_connection_string(), **_pg_pool_options(read_only)
+    )
+
+
+async def aget_pg_engine(read_only: bool = False) -> "PGEngine":
+    """Return the Postgres engine shared by async callers on the current loop.
+
+    asyncpg connections belong to the event loop that opened them, so there is
+    one engine per running loop, reused for the lifetime of that loop.
+
+    Args:
+        read_only: Whether the pool's sessions are read-only.
+
+    Returns:
+        PGEngine: The shared engine of the running event loop.
+    """
+    from langchain_postgres import PGEngine
+    from sqlalchemy.ext.asyncio import create_async_engine
+
+    engines = _async_pg_engines.setdefault(asyncio.get_running_loop(), {})
+    if read_only not in engines:
+        engines[read_only] = PGEngine.from_engine(
+            create_async_engine(_pg_connection_string(), **_pg_pool_options(read_only))
+        )
+    return engines[read_only]
+
+
+def _pg_connection_string(driver: str = "postgresql+asyncpg") -> str:
+    return (
+        f"{driver}://{config.PG_USER}:{config.PG_PASSWORD}@{config.PG_HOST}"
+        f":{config.PG_PORT}/{config.PG_DB}"
+    )
+
+
+def _pg_pool_options(read_only: bool) -> dict[str, Any]:
+    server_settings = {"application_name": "movie_recommender"}
+    if read_only:
+        server_settings["default_transaction_read_only"] = "on"
+    return {
+        "pool_size": config.PG_POOL_SIZE,
+        "max_overflow": config.PG_MAX_OVERFLOW,
+        "pool_pre_ping": config.PG_POOL_PRE_PING,
+        "pool_recycle": config.PG_POOL_RECYCLE,
+        "connect_args": {
+            # asyncpg's prepared statement cache; 0 for transaction poolers.
+            "statement_cache_size": config.PG_STATEMENT_CACHE_SIZE,
+            "server_settings": server_settings,
+        },
+    }
+
+
 def index() -> None:
     """Index movie data from Kaggle dataset into a vector store.
 
     Loads configuration from environment variables, creates a data source,
-    initializes embeddings, and indexes the movie data into the specified
-    vector store.
+    initializes embeddings, and streams the movie data into the specified
+    vector store in batches of ``INDEX_BATCH_SIZE`` documents. NumPy-backed
+    stores are saved as a snapshot to ``VECTOR_STORE_PATH`` afterwards.
+
+    With ``INDEX_MODE=incremental`` the existing store is kept and only new,
+    changed and removed movies are written, as tracked by the manifest at
+    ``INDEX_MANIFEST_PATH``.
+
+    With ``PG_BULK_LOAD=true``, a full load into "pgvectorstore" copies the
+    rows with binary ``COPY`` and builds the ``PG_VECTOR_INDEX`` ("hnsw",
+    "ivfflat" or "none") once at the end, see
+    :class:`~movie_recommender.pg_bulk_load.PGBulkLoader`.
+
+    In both modes a BM25 index over all movies is rebuilt and saved to
+    ``LEXICAL_INDEX_PATH`` for hybrid search, unless the path is empty.
+
+    With ``NEIGHBOR_GRAPH_PATH`` set, the ``NEIGHBOR_GRAPH_K`` nearest
+    neighbours of every movie are precomputed for the "more like this" tool,
+    see :func:`~movie_recommender.neighbors.build_neighbor_graph`. This needs
+    the "numpy", "ivf" or "int8" store.
+
+    Raises:
+        ValueError: If incremental indexing is requested for a vector store
+            that does not outlive the process.
     """
+    from movie_recommender import metrics
+    from movie_recommender.bm25 import BM25IndexBuilder
+    from movie_recommender.data_sources import KaggleCSVDataSource
+    from movie_recommender.embedding_cache import CachedEmbeddings
+    from movie_recommender.indexer import MovieIndexer
+    from movie_recommender.manifest import IndexManifest
+    from movie_recommender.numpy_vectorstore import NumpyVectorStore
+
+    logging.basicConfig(level=logging.INFO)
+    metrics.configure(
+        [name for name in config.METRICS_SINKS.split(",") if name],
+        config.METRICS_PORT,
+    )
+    vector_store_name = os.getenv("VECTOR_STORE", config.VECTOR_STORE_NAME)
+    incremental = config.INDEX_MODE == "incremental"
+    if incremental and vector_store_name == "in_memory":
+        raise ValueError("Incremental indexing requires a persistent vector store.")
+
     data_source = KaggleCSVDataSource.from_env()
     loader = data_source.get_loader()
-    embedding = HuggingFaceEmbeddings(
-        model_name=os.getenv(
-            "EMBEDDING_MODEL", "sentence-transformers/all-MiniLM-L6-v2"
+    embedding = get_embeddings(workers=config.EMBEDDING_WORKERS)
+    try:
+        vector_store = get_vector_store(
+            vector_store_name, embedding, overwrite_existing=not incremental
         )
-    )
+        lexical_index = BM25IndexBuilder() if config.LEXICAL_INDEX_PATH else None
+        indexer = MovieIndexer(
+            loader=loader, vector_store=vector_store, lexical_index=lexical_index
+        )
+        manifest = IndexManifest(
+            config.INDEX_MANIFEST_PATH,
+            namespace=f"{vector_store_name}:{getattr(config, 'TABLE_NAME', '')}",
+        )
+        if incremental:
+            stats = indexer.index_incremental(
+                manifest,
+                id_key=config.CSV_ID_COLUMN,
+                batch_size=config.INDEX_BATCH_SIZE,
+            )
+            logger.info(
+                "Incremental index: %d inserted, %d updated, %d deleted, %d skipped",
+                stats.inserted,
+                stats.updated,
+                stats.deleted,
+                stats.skipped,
+            )
+        else:
+            # The store was rebuilt from scratch, so previous fingerprints are
+            # void. The rebuild records new ones for the next incremental run.
+            manifest.clear()
+            if vector_store_name == "pgvectorstore" and config.PG_BULK_LOAD:
+                _bulk_load(indexer, embedding, manifest)
+            else:
+                indexer.index(
+                    batch_size=config.INDEX_BATCH_SIZE,
+                    id_key=config.CSV_ID_COLUMN,
+                    manifest=manifest,
+                )
+        manifest.close()
+        if lexical_index is not None:
+            lexical_index.build().save(config.LEXICAL_INDEX_PATH)
+            logger.info("Saved lexical index to %s", config.LEXICAL_INDEX_PATH)
+        if isinstance(vector_store, NumpyVectorStore) and config.VECTOR_STORE_PATH:
+            vector_store.save(config.VECTOR_STORE_PATH)
+            logger.info("Saved vector store snapshot to %s", config.VECTOR_STORE_PATH)
+        if config.NEIGHBOR_GRAPH_PATH:
+            if isinstance(vector_store, NumpyVectorStore):
+                _save_neighbor_graph(vector_store)
+            else:
+                logger.warning("The neighbour graph needs the numpy, ivf or int8 store")
+        if isinstance(embedding, CachedEmbeddings):
+            logger.info(
+                "Embedding cache: %d hits, %d misses (%.1f%% hit rate)",
+                embedding.stats.hits,
+                embedding.stats.misses,
+                100 * embedding.stats.hit_rate,
+            )
+    finally:
+        # Shuts down the worker processes of a parallel embeddings model.
+        close = getattr(embedding, "close", None)
+        if close is not None:
+            close()
 
-    indexer = MovieIndexer(
-        loader=loader,
-        vector_store=get_vector_store(
-            os.getenv("VECTOR_STORE", "in_memory"), embedding
-        ),
+
+def _save_neighbor_graph(vector_store: "NumpyVectorStore") -> None:
+    """Build the neighbour graph of a store's movies and save it."""
+    import numpy as np
+
+    from movie_recommender.neighbors import build_neighbor_graph
+
+    start = time.perf_counter()
+    # Missing popularity values become NaN and then 0.
+    popularity = np.array(vector_store.metadata_values("popularity"), dtype=float)
+    graph = build_neighbor_graph(
+        vector_store.ids,
+        vector_store.vectors,
+        k=config.NEIGHBOR_GRAPH_K,
+        titles=vector_store.metadata_values("title"),
+        source_ids=vector_store.metadata_values(config.CSV_ID_COLUMN),
+        popularity=np.nan_to_num(popularity),
     )
-    indexer.index()
+    graph.save(config.NEIGHBOR_GRAPH_PATH)
+    logger.info(
+        "Saved %d nearest neighbours of %d movies to %s in %.1f s",
+        graph.k,
+        len(graph),
+        config.NEIGHBOR_GRAPH_PATH,
+        time.perf_counter() - start,
+    )
+
+
+def _bulk_load(
+    indexer: "MovieIndexer", embedding: "Embeddings", manifest: "IndexManifest"
+) -> None:
+    """Run a full index with COPY and build the vector index afterwards."""
+    from langchain_postgres.v2.indexes import HNSWIndex, IVFFlatIndex
+
+    from movie_recommender.pg_bulk_load import PGBulkLoader
+
+    with PGBulkLoader(
+        _pg_connection_string("postgresql"),
+        config.TABLE_NAME,
+        embedding,
+        metadata_columns=PG_FILTER_COLUMNS,
+        maintenance_work_mem=config.PG_MAINTENANCE_WORK_MEM,
+    ) as loader:
+        stats = indexer.index(
+            batch_size=config.INDEX_BATCH_SIZE,
+            id_key=config.CSV_ID_COLUMN,
+            writer=loader,
+            manifest=manifest,
+        )
+        logger.info("Copied %d rows (%.1f rows/s)", loader.rows, stats.docs_per_second)
+        if config.PG_VECTOR_INDEX == "none":
+            return
+        if config.PG_VECTOR_INDEX == "ivfflat":
+            # pgvector recommends rows / 1000 lists for up to a million rows.
+            index = IVFFlatIndex(lists=max(loader.rows // 1000, 1))
+        else:
+            index = HNSWIndex()
+        start = time.perf_counter()
+        loader.create_vector_index(index)
+        logger.info(
+            "Built %s index %s in %.1f s",
+            index.index_type,
+            loader.index_name,
+            time.perf_counter() - start,
+        )
 
 
 def search() -> None:
@@ -93,15 +501,11 @@ def search() -> None:
     to perform a similarity search for movies matching the query.
     Prints the search results to stdout.
     """
-    embedding = HuggingFaceEmbeddings(
-        model_name=os.getenv(
-            "EMBEDDING_MODEL", "sentence-transformers/all-MiniLM-L6-v2"
-        )
-    )
+    embedding = get_embeddings(use_cache=False)
     store = get_vector_store(
-        os.getenv("VECTOR_STORE", "in_memory"),
+        os.getenv("VECTOR_STORE", config.VECTOR_STORE_NAME),
         embedding=embedding,
-        initialize_table=False,
+        read_only=True,
     )
     res = store.similarity_search(
         "hard science fiction space exploration realistic grounded"
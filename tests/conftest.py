@@ -1,48 +1,54 @@
-from collections.abc import Callable, Sequence
-from typing import Any
+from collections.abc import Callable
 
 import pytest
-from langchain_core.language_models.base import LanguageModelInput
-from langchain_core.language_models.fake_chat_models import FakeListChatModel
-from langchain_core.messages import AIMessage
-from langchain_core.runnables import Runnable
-from langchain_core.tools import BaseTool
+from langchain_core.documents import Document
+from langchain_core.embeddings import DeterministicFakeEmbedding
 
+from benchmarks.fakes import FakeChatModelWithTools
+from movie_recommender.numpy_vectorstore import NumpyVectorStore
 
-class FakeChatModelWithTools(FakeListChatModel):
-    """Fake chat model that supports tool binding for testing.
 
-    Extends FakeListChatModel to implement bind_tools() method, which is
-    required when creating LangGraph agents. This allows the fake model
-    to work with create_agent() function.
+@pytest.fixture
+def fake_model() -> FakeChatModelWithTools:
+    """Create a fake chat model that supports tool binding.
+
+    Returns:
+        FakeChatModelWithTools: A fake model with predefined responses.
     """
+    return FakeChatModelWithTools(responses=["What about **The Holy Mountain**?"])
 
-    def bind_tools(
-        self,
-        tools: Sequence[dict[str, Any] | type | Callable | BaseTool],
-        *,
-        tool_choice: str | None = None,
-        **kwargs: Any,
-    ) -> Runnable[LanguageModelInput, AIMessage]:
-        """Mock bind_tools method to support agent creation.
 
-        Args:
-            tools: Sequence of tools to bind to the model.
-            **kwargs: Additional keyword arguments.
+@pytest.fixture
+def movie_store() -> NumpyVectorStore:
+    """Create a vector store holding two movies with ids "1" and "2".
 
-        Returns:
-            Runnable: Returns self to maintain the fake responses behavior.
-        """
-        # Return self to maintain the fake responses behavior
-        # The agent will use this model which will return predefined responses
-        return self
+    Returns:
+        NumpyVectorStore: The store, embedding with a deterministic fake model.
+    """
+    store = NumpyVectorStore(embedding=DeterministicFakeEmbedding(size=16))
+    store.add_documents(
+        [
+            Document(page_content="A crew explores a distant planet.", id="1"),
+            Document(page_content="Two friends on a summer road trip.", id="2"),
+        ]
+    )
+    return store
 
 
 @pytest.fixture
-def fake_model() -> FakeChatModelWithTools:
-    """Create a fake chat model that supports tool binding.
+def tool_call() -> Callable[[str], dict]:
+    """Build tool calls of the movie recommendation tool.
 
     Returns:
-        FakeChatModelWithTools: A fake model with predefined responses.
+        Callable[[str], dict]: Creates the tool call for a query.
     """
-    return FakeChatModelWithTools(responses=["What about **The Holy Mountain**?"])
+
+    def build(query: str) -> dict:
+        return {
+            "type": "tool_call",
+            "id": "call-1",
+            "name": "movie_recommendation",
+            "args": {"query": query},
+        }
+
+    return build
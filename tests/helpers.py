@@ -0,0 +1,19 @@
+"""Data generators shared by the tests."""
+
+import numpy as np
+
+
+def clustered_vectors(count: int, dim: int, seed: int = 0) -> np.ndarray:
+    """Generate vectors around 20 random centers, like clustered embeddings.
+
+    Args:
+        count: Number of vectors.
+        dim: Vector dimension.
+        seed: Seed of the random generator.
+
+    Returns:
+        np.ndarray: The vectors, one per row.
+    """
+    rng = np.random.default_rng(seed)
+    centers = rng.normal(size=(20, dim))
+    return centers[rng.integers(0, 20, count)] + 0.3 * rng.normal(size=(count, dim))
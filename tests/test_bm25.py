@@ -0,0 +1,75 @@
+"""Tests for the BM25 inverted index and reciprocal-rank fusion."""
+
+from pathlib import Path
+
+from langchain_core.documents import Document
+
+from movie_recommender.bm25 import (
+    BM25IndexBuilder,
+    reciprocal_rank_fusion,
+    tokenize,
+)
+
+MOVIES = [
+    Document(
+        page_content="A mystic leads a thief to a sacred mountain.",
+        metadata={"title": "The Holy Mountain", "director": "Alejandro Jodorowsky"},
+    ),
+    Document(
+        page_content="A gunfighter rides through the desert with his son.",
+        metadata={"title": "El Topo", "director": "Alejandro Jodorowsky"},
+    ),
+    Document(
+        page_content="A young woman in Paris decides to help others.",
+        metadata={"title": "Amélie", "director": "Jean-Pierre Jeunet"},
+    ),
+]
+
+
+def build(documents: list[Document] = MOVIES):
+    builder = BM25IndexBuilder()
+    builder.add_documents(documents, [str(i) for i in range(len(documents))])
+    return builder.build()
+
+
+def test_tokenize_folds_case_and_accents() -> None:
+    """Test that tokens are lowercased, accent-free and without stopwords."""
+    assert tokenize("Amélie in PARIS, by Jeunet") == ["amelie", "paris", "jeunet"]
+
+
+def test_search_ranks_matching_documents() -> None:
+    """Test that rare query terms select and rank the right movies."""
+    index = build()
+
+    assert {doc_id for doc_id, _ in index.search("something by Jodorowsky")} == {
+        "0",
+        "1",
+    }
+    assert index.search("jodorowsky desert", k=1)[0][0] == "1"
+    assert index.search("amelie")[0][0] == "2"
+    assert index.search("unknown words") == []
+
+
+def test_readding_a_document_replaces_it(tmp_path: Path) -> None:
+    """Test that updates replace documents and survive a save and load."""
+    builder = BM25IndexBuilder()
+    builder.add_documents(MOVIES, ["0", "1", "2"])
+    builder.add_documents([Document(page_content="A heist in Lyon.")], ["2"])
+    index = builder.build()
+    index.save(str(tmp_path / "bm25.npz"))
+    loaded = type(index).load(str(tmp_path / "bm25.npz"))
+
+    assert len(loaded) == 3
+    assert loaded.search("paris") == []
+    assert loaded.search("lyon heist") == index.search("lyon heist")
+    assert loaded.search("lyon")[0][0] == "2"
+
+
+def test_reciprocal_rank_fusion_rewards_agreement() -> None:
+    """Test that documents ranked by both retrievers come first."""
+    assert reciprocal_rank_fusion([["a", "b", "c"], ["c", "d", "b"]]) == [
+        "c",
+        "b",
+        "a",
+        "d",
+    ]
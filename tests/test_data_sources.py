@@ -2,8 +2,13 @@ import os
 from unittest.mock import patch
 
 import pandas as pd
+import pytest
 
-from movie_recommender.data_sources import KaggleCSVDataSource
+from movie_recommender.data_sources import (
+    CSVChunkLoader,
+    KaggleCSVDataSource,
+    ParquetSnapshotLoader,
+)
 
 
 def test_data_source_initialization():
@@ -49,3 +54,90 @@ def test_get_loader_mocked(mock_read_csv, mock_dataset_download):
     assert len(documents) == 2
     assert documents[0].page_content == "Description 1"
     assert documents[1].page_content == "Description 2"
+
+
+def test_chunk_loader_prunes_columns_and_required_nulls(tmp_path):
+    csv_path = tmp_path / "movies.csv"
+    pd.DataFrame(
+        {
+            "id": [1, 2, 3, 4],
+            "title": ["Movie 1", "Movie 2", None, "Movie 4"],
+            "overview": ["Description 1", "Description 2", "Description 3", None],
+            "tagline": [None, "Tagline 2", "Tagline 3", "Tagline 4"],
+            "popularity": [1.5, None, 3.0, 4.0],
+            "release_date": ["1999-03-31", None, None, None],
+        }
+    ).to_csv(csv_path, index=False)
+
+    loader = CSVChunkLoader(
+        str(csv_path),
+        content_column="overview",
+        metadata_columns=["id", "title", "popularity", "release_date"],
+        required_columns=["title"],
+        chunksize=1,
+    )
+    documents = list(loader.lazy_load())
+
+    assert [doc.page_content for doc in documents] == ["Description 1", "Description 2"]
+    assert documents[0].metadata == {
+        "id": 1,
+        "title": "Movie 1",
+        "popularity": 1.5,
+        "release_date": "1999-03-31",
+        "release_year": 1999,
+    }
+    assert documents[1].metadata["popularity"] is None
+    assert documents[1].metadata["release_year"] is None
+
+
+@patch("movie_recommender.data_sources.kagglehub.dataset_download")
+def test_get_loader_with_metadata_columns(mock_dataset_download):
+    mock_dataset_download.return_value = "/fake/data/dir"
+    data_source = KaggleCSVDataSource(
+        dataset_handle="user/dataset-name",
+        csv_filename="movies.csv",
+        content_column="overview",
+        metadata_columns=["id", "title"],
+    )
+
+    loader = data_source.get_loader()
+
+    assert isinstance(loader, CSVChunkLoader)
+    assert loader._csv_path == "/fake/data/dir/movies.csv"
+
+
+@patch("movie_recommender.data_sources.kagglehub.dataset_download")
+def test_get_loader_reads_parquet_snapshot(mock_dataset_download, tmp_path):
+    pytest.importorskip("pyarrow")
+    data_dir = tmp_path / "datasets" / "user" / "dataset-name" / "versions" / "3"
+    data_dir.mkdir(parents=True)
+    pd.DataFrame(
+        {
+            "id": [1, 2],
+            "title": ["Movie 1", "Movie 2"],
+            "overview": ["Description 1", None],
+            "status": ["Released", "Released"],
+        }
+    ).to_csv(data_dir / "movies.csv", index=False)
+    mock_dataset_download.return_value = str(data_dir)
+
+    data_source = KaggleCSVDataSource(
+        dataset_handle="user/dataset-name",
+        csv_filename="movies.csv",
+        content_column="overview",
+        metadata_columns=["id", "title"],
+        snapshot_dir=str(tmp_path / "snapshots"),
+    )
+    loader = data_source.get_loader()
+
+    snapshot = tmp_path / "snapshots" / "user__dataset-name" / "v3" / "movies.parquet"
+    assert isinstance(loader, ParquetSnapshotLoader)
+    assert snapshot.exists()
+    documents = loader.load()
+    assert len(documents) == 1
+    assert documents[0].page_content == "Description 1"
+    assert documents[0].metadata == {"id": 1, "title": "Movie 1"}
+
+    with patch("movie_recommender.data_sources.write_parquet_snapshot") as mock_write:
+        data_source.get_loader()
+    mock_write.assert_not_called()
@@ -0,0 +1,58 @@
+"""Tests for the selectable embedding backends and their parity check."""
+
+import numpy as np
+import pytest
+from langchain_core.embeddings import DeterministicFakeEmbedding, Embeddings
+
+from movie_recommender.embedding_backends import (
+    DEFAULT_INT8_FILE,
+    backend_model_kwargs,
+    check_parity,
+)
+
+TEXTS = ["space opera", "cozy romance", "heist thriller", "haunted hotel"]
+
+
+class NoisyEmbeddings(Embeddings):
+    """Wraps a model and perturbs its vectors, like a quantized backend."""
+
+    def __init__(self, inner: Embeddings, noise: float) -> None:
+        self.inner = inner
+        self.noise = noise
+
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        vectors = np.asarray(self.inner.embed_documents(texts))
+        rng = np.random.default_rng(0)
+        return (vectors + rng.normal(scale=self.noise, size=vectors.shape)).tolist()
+
+    def embed_query(self, text: str) -> list[float]:
+        return self.embed_documents([text])[0]
+
+
+def test_backend_model_kwargs() -> None:
+    """Test that backends map to SentenceTransformer arguments."""
+    assert backend_model_kwargs("torch") == {}
+    assert backend_model_kwargs("onnx") == {"backend": "onnx"}
+    assert backend_model_kwargs("onnx-int8") == {
+        "backend": "onnx",
+        "model_kwargs": {"file_name": DEFAULT_INT8_FILE},
+    }
+    assert backend_model_kwargs("onnx", "onnx/model_O3.onnx")["model_kwargs"] == {
+        "file_name": "onnx/model_O3.onnx"
+    }
+    with pytest.raises(ValueError):
+        backend_model_kwargs("tensorrt")
+
+
+def test_check_parity() -> None:
+    """Test that small perturbations pass and large ones fail the check."""
+    baseline = DeterministicFakeEmbedding(size=64)
+
+    identical = check_parity(baseline, baseline, TEXTS)
+    slightly_off = check_parity(baseline, NoisyEmbeddings(baseline, 0.001), TEXTS)
+    unrelated = check_parity(baseline, NoisyEmbeddings(baseline, 1.0), TEXTS)
+
+    assert identical.min_cosine == pytest.approx(1.0)
+    assert identical.neighbor_agreement == 1.0
+    assert slightly_off.passed() and not unrelated.passed()
+    assert unrelated.mean_cosine < slightly_off.min_cosine
@@ -0,0 +1,73 @@
+"""Tests for the persistent embedding cache."""
+
+from pathlib import Path
+
+import pytest
+from langchain_core.embeddings import DeterministicFakeEmbedding
+
+from movie_recommender.embedding_cache import CachedEmbeddings
+
+
+class CountingEmbedding(DeterministicFakeEmbedding):
+    """Deterministic fake embedding that records which texts it embedded."""
+
+    embedded: list[str] = []
+
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        self.embedded.extend(texts)
+        return super().embed_documents(texts)
+
+
+@pytest.fixture
+def counting_embedding() -> CountingEmbedding:
+    return CountingEmbedding(size=4, embedded=[])
+
+
+def test_cache_only_embeds_unseen_texts(
+    tmp_path: Path, counting_embedding: CountingEmbedding
+) -> None:
+    """Test that a second pass is served from disk, even by a new instance."""
+    path = str(tmp_path / "cache.sqlite3")
+    cache = CachedEmbeddings(counting_embedding, model_name="fake", path=path)
+    first = cache.embed_documents(["a", "b", "a"])
+    cache.close()
+
+    cache = CachedEmbeddings(counting_embedding, model_name="fake", path=path)
+    second = cache.embed_documents(["a", "b", "c"])
+
+    assert counting_embedding.embedded == ["a", "b", "c"]
+    assert second[:2] == first[:2]
+    assert cache.stats.hits == 2
+    assert cache.stats.misses == 1
+    assert cache.stats.hit_rate == pytest.approx(2 / 3)
+
+
+def test_cache_is_keyed_by_model(
+    tmp_path: Path, counting_embedding: CountingEmbedding
+) -> None:
+    """Test that entries of one model are not served for another."""
+    path = str(tmp_path / "cache.sqlite3")
+    CachedEmbeddings(counting_embedding, "model-a", path).embed_documents(["x"])
+    CachedEmbeddings(counting_embedding, "model-b", path).embed_documents(["x"])
+    assert counting_embedding.embedded == ["x", "x"]
+
+
+def test_cache_evicts_least_recently_used(
+    tmp_path: Path, counting_embedding: CountingEmbedding
+) -> None:
+    """Test that the cache stays within its byte budget."""
+    vector_bytes = 4 * 4
+    cache = CachedEmbeddings(
+        counting_embedding,
+        model_name="fake",
+        path=str(tmp_path / "cache.sqlite3"),
+        max_bytes=2 * vector_bytes,
+    )
+    cache.embed_documents(["a"])
+    cache.embed_documents(["b"])
+    cache.embed_documents(["c"])
+
+    assert cache.size_bytes == 2 * vector_bytes
+    assert cache.stats.evictions == 1
+    cache.embed_documents(["b", "c"])
+    assert cache.stats.misses == 3
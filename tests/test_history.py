@@ -0,0 +1,103 @@
+"""Tests for the token-budgeted conversation history."""
+
+import asyncio
+from collections.abc import Sequence
+
+from langchain_core.messages import (
+    AIMessage,
+    BaseMessage,
+    HumanMessage,
+    SystemMessage,
+    ToolMessage,
+)
+
+from movie_recommender.history import (
+    SUMMARY_PREFIX,
+    ConversationHistory,
+    compact_tool_output,
+)
+
+TOOL_OUTPUT = (
+    "[Document(metadata={'title': 'Alien', 'cast': 'Sigourney Weaver'}, "
+    "page_content='In deep space...'), Document(metadata={'title': 'Solaris'}, "
+    "page_content='A psychologist is sent to a station...')]"
+)
+
+
+def add_turn(history: ConversationHistory, text: str, tool_output: str) -> None:
+    history.add_user_message(HumanMessage(text))
+    history.add_messages(
+        [
+            AIMessage("", tool_calls=[{"name": "search", "args": {}, "id": text}]),
+            ToolMessage(tool_output, tool_call_id=text),
+            AIMessage(f"Answer to {text}"),
+        ]
+    )
+
+
+def test_compact_tool_output_keeps_titles() -> None:
+    """Test that Document lists are reduced to their titles."""
+    assert compact_tool_output(TOOL_OUTPUT) == "Previously found movies: Alien, Solaris"
+
+
+def test_consumed_tool_outputs_are_compacted() -> None:
+    """Test that only tool results of earlier turns are compacted."""
+    history = ConversationHistory([SystemMessage("system")])
+    add_turn(history, "first", TOOL_OUTPUT)
+    add_turn(history, "second", TOOL_OUTPUT)
+
+    tool_messages = [m for m in history.messages if isinstance(m, ToolMessage)]
+    assert tool_messages[0].content == "Previously found movies: Alien, Solaris"
+    assert tool_messages[1].content == TOOL_OUTPUT
+
+
+def test_budget_drops_oldest_turns_into_summary() -> None:
+    """Test that old turns are summarized away once the budget is exceeded."""
+    summaries: list[int] = []
+
+    def summarizer(summary: str, messages: Sequence[BaseMessage]) -> str:
+        summaries.append(len(messages))
+        return f"{summary}+"
+
+    history = ConversationHistory(
+        [SystemMessage("system")],
+        token_budget=120,
+        keep_last_turns=1,
+        summarizer=summarizer,
+    )
+    for i in range(10):
+        add_turn(history, f"turn {i}", TOOL_OUTPUT)
+
+    messages = history.messages
+    assert history.count_tokens() <= 120
+    assert messages[0].content == "system"
+    assert messages[1].text.startswith(SUMMARY_PREFIX)
+    assert isinstance(messages[2], HumanMessage)
+    assert summaries and all(count == 4 for count in summaries)
+
+
+def test_async_add_messages_uses_async_summarizer() -> None:
+    """Test that async compaction awaits the async summarizer."""
+
+    def summarizer(summary: str, messages: Sequence[BaseMessage]) -> str:
+        raise AssertionError("Blocking summarizer")
+
+    async def asummarizer(summary: str, messages: Sequence[BaseMessage]) -> str:
+        return f"{summary}+"
+
+    history = ConversationHistory(
+        [SystemMessage("system")],
+        token_budget=120,
+        keep_last_turns=1,
+        summarizer=summarizer,
+        asummarizer=asummarizer,
+    )
+
+    async def add_turns() -> None:
+        for i in range(10):
+            history.add_user_message(HumanMessage(f"turn {i}"))
+            await history.aadd_messages([AIMessage(TOOL_OUTPUT)])
+
+    asyncio.run(add_turns())
+    assert history.count_tokens() <= 120
+    assert history.messages[1].text.startswith(f"{SUMMARY_PREFIX} +")
@@ -0,0 +1,196 @@
+"""Tests for the MovieIndexer class."""
+
+from collections.abc import Iterator
+from pathlib import Path
+from typing import Any
+
+import pytest
+from langchain_core.document_loaders import BaseLoader
+from langchain_core.documents import Document
+from langchain_core.embeddings import DeterministicFakeEmbedding
+from langchain_core.vectorstores import InMemoryVectorStore
+
+from movie_recommender.bm25 import BM25IndexBuilder
+from movie_recommender.indexer import (
+    IncrementalIndexingStats,
+    IndexingStats,
+    MovieIndexer,
+    batch_documents,
+)
+from movie_recommender.manifest import IndexManifest, document_id
+
+
+class FakeLoader(BaseLoader):
+    """Loader that lazily yields a fixed number of movie documents."""
+
+    def __init__(self, count: int) -> None:
+        self.count = count
+        self.yielded = 0
+
+    def lazy_load(self) -> Iterator[Document]:
+        for i in range(self.count):
+            self.yielded += 1
+            yield Document(page_content=f"Overview {i}", metadata={"title": f"M{i}"})
+
+
+def test_batch_documents_splits_stream() -> None:
+    """Test that documents are grouped into fixed-size batches."""
+    docs = (Document(page_content=str(i)) for i in range(7))
+    sizes = [len(batch) for batch in batch_documents(docs, 3)]
+    assert sizes == [3, 3, 1]
+
+
+def test_batch_documents_rejects_invalid_size() -> None:
+    """Test that a non-positive batch size is rejected."""
+    with pytest.raises(ValueError):
+        list(batch_documents([], 0))
+
+
+def test_index_streams_batches() -> None:
+    """Test that every document is indexed in batches with progress reports."""
+    store = InMemoryVectorStore(embedding=DeterministicFakeEmbedding(size=8))
+    indexer = MovieIndexer(loader=FakeLoader(10), vector_store=store)
+    progress: list[int] = []
+
+    stats = indexer.index(
+        batch_size=4, on_progress=lambda s: progress.append(s.documents)
+    )
+
+    assert isinstance(stats, IndexingStats)
+    assert stats.documents == 10
+    assert stats.batches == 3
+    assert progress == [4, 8, 10]
+    assert len(store.store) == 10
+
+
+def test_index_add_limit_stops_loading() -> None:
+    """Test that add_limit stops consuming the loader early."""
+    store = InMemoryVectorStore(embedding=DeterministicFakeEmbedding(size=8))
+    loader = FakeLoader(100)
+    stats = MovieIndexer(loader=loader, vector_store=store).index(
+        batch_size=2, add_limit=5
+    )
+
+    assert stats.documents == 5
+    assert loader.yielded == 5
+    assert len(store.store) == 5
+
+
+class ListLoader(BaseLoader):
+    """Loader that lazily yields a given list of documents."""
+
+    def __init__(self, documents: list[Document]) -> None:
+        self.documents = documents
+
+    def lazy_load(self) -> Iterator[Document]:
+        yield from self.documents
+
+
+def movie(tmdb_id: float, overview: str) -> Document:
+    return Document(page_content=overview, metadata={"id": tmdb_id})
+
+
+def counts(stats: IncrementalIndexingStats) -> tuple[int, int, int, int]:
+    return stats.inserted, stats.updated, stats.deleted, stats.skipped
+
+
+def test_index_incremental_applies_delta(tmp_path: Path) -> None:
+    """Test that a second snapshot only writes the changed movies."""
+    store = InMemoryVectorStore(embedding=DeterministicFakeEmbedding(size=8))
+    manifest = IndexManifest(str(tmp_path / "manifest.sqlite3"), namespace="test")
+
+    first = [movie(1, "a"), movie(2, "b"), movie(3, "c")]
+    stats = MovieIndexer(ListLoader(first), store).index_incremental(
+        manifest, batch_size=2
+    )
+    assert counts(stats) == (3, 0, 0, 0)
+
+    second = [movie(1, "a"), movie(2, "b changed"), movie(4, "d")]
+    lexical_index = BM25IndexBuilder()
+    stats = MovieIndexer(ListLoader(second), store, lexical_index).index_incremental(
+        manifest, batch_size=2
+    )
+    assert counts(stats) == (1, 1, 1, 1)
+    contents = sorted(doc["text"] for doc in store.store.values())
+    assert contents == ["a", "b changed", "d"]
+    # The lexical index covers unchanged movies too, under the store's ids.
+    assert len(lexical_index.build()) == 3
+    assert lexical_index.build().search("a") == []
+    assert lexical_index.build().search("changed")[0][0] == document_id(second[1], "id")
+
+
+def test_incremental_runs_detect_deletions_when_the_clock_steps_back(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Test that run markers come from the manifest, not the wall clock."""
+    store = InMemoryVectorStore(embedding=DeterministicFakeEmbedding(size=8))
+    manifest = IndexManifest(str(tmp_path / "manifest.sqlite3"), namespace="test")
+    monkeypatch.setattr("time.time", lambda: 2_000_000_000.0)
+    MovieIndexer(ListLoader([movie(1, "a"), movie(2, "b")]), store).index_incremental(
+        manifest, batch_size=2
+    )
+
+    monkeypatch.setattr("time.time", lambda: 1_000_000_000.0)
+    stats = MovieIndexer(ListLoader([movie(1, "a")]), store).index_incremental(
+        manifest, batch_size=2
+    )
+
+    assert counts(stats) == (0, 0, 1, 1)
+    assert manifest.start_run() == 3
+
+
+def test_full_index_records_manifest_for_incremental_run(tmp_path: Path) -> None:
+    """Test that an incremental run after a full index rewrites nothing."""
+    store = InMemoryVectorStore(embedding=DeterministicFakeEmbedding(size=8))
+    manifest = IndexManifest(str(tmp_path / "manifest.sqlite3"), namespace="test")
+    movies = [movie(1, "a"), movie(2, "b"), movie(3, "c")]
+
+    MovieIndexer(ListLoader(movies), store).index(
+        batch_size=2, id_key="id", manifest=manifest
+    )
+    stats = MovieIndexer(ListLoader(movies), store).index_incremental(
+        manifest, batch_size=2
+    )
+
+    assert counts(stats) == (0, 0, 0, 3)
+    assert len(store.store) == 3
+
+
+def test_index_with_manifest_requires_id_key(tmp_path: Path) -> None:
+    """Test that recording fingerprints without stable ids is rejected."""
+    store = InMemoryVectorStore(embedding=DeterministicFakeEmbedding(size=8))
+    manifest = IndexManifest(str(tmp_path / "manifest.sqlite3"), namespace="test")
+    with pytest.raises(ValueError):
+        MovieIndexer(FakeLoader(2), store).index(manifest=manifest)
+
+
+def test_document_id_is_stable() -> None:
+    """Test that ids only depend on the source id, not on its dtype."""
+    assert document_id(movie(42, "x"), "id") == document_id(movie(42.0, "y"), "id")
+
+
+def test_index_sends_batches_to_writer() -> None:
+    """Test that a bulk writer receives the batches instead of the store."""
+
+    class RecordingWriter:
+        def __init__(self) -> None:
+            self.batches: list[list[str]] = []
+
+        def add_documents(
+            self, documents: list[Document], ids: list[str] | None = None, **kwargs: Any
+        ) -> list[str]:
+            assert ids is not None
+            self.batches.append(ids)
+            return ids
+
+    store = InMemoryVectorStore(embedding=DeterministicFakeEmbedding(size=8))
+    writer = RecordingWriter()
+    builder = BM25IndexBuilder()
+    indexer = MovieIndexer(FakeLoader(5), store, lexical_index=builder)
+
+    stats = indexer.index(batch_size=2, id_key="title", writer=writer)
+
+    assert stats.documents == 5
+    assert [len(ids) for ids in writer.batches] == [2, 2, 1]
+    assert not store.store
+    assert len(builder.build()) == 5
@@ -0,0 +1,91 @@
+"""Tests for the IVF approximate vector store."""
+
+from pathlib import Path
+
+import pytest
+from langchain_core.embeddings import DeterministicFakeEmbedding
+
+from movie_recommender.ivf_vectorstore import IVFVectorStore
+from movie_recommender.numpy_vectorstore import NumpyVectorStore
+from tests.helpers import clustered_vectors
+
+
+def test_ivf_recall_against_exact_search() -> None:
+    """Test that probing a few lists finds nearly all exact neighbours."""
+    vectors = clustered_vectors(3000, 32)
+    texts = [str(i) for i in range(len(vectors))]
+    embedding = DeterministicFakeEmbedding(size=32)
+    exact = NumpyVectorStore(embedding=embedding)
+    exact.add_embeddings(texts, vectors, ids=texts)
+    ivf = IVFVectorStore(embedding=embedding, n_lists=30, n_probe=6, min_index_size=0)
+    ivf.add_embeddings(texts, vectors, ids=texts)
+
+    queries = clustered_vectors(50, 32, seed=1)
+    hits = 0
+    for query in queries:
+        expected = {d.id for d in exact.similarity_search_by_vector(query, k=10)}
+        found = {d.id for d in ivf.similarity_search_by_vector(query, k=10)}
+        hits += len(expected & found)
+    assert hits / (10 * len(queries)) >= 0.9
+
+
+def test_ivf_with_all_lists_probed_is_exact() -> None:
+    """Test that probing every list gives the exact result after deletes."""
+    vectors = clustered_vectors(500, 16)
+    texts = [str(i) for i in range(len(vectors))]
+    embedding = DeterministicFakeEmbedding(size=16)
+    exact = NumpyVectorStore(embedding=embedding)
+    ivf = IVFVectorStore(embedding=embedding, n_lists=8, n_probe=8, min_index_size=0)
+    for store in (exact, ivf):
+        store.add_embeddings(texts, vectors, ids=texts)
+        store.delete(["0", "1", "2"])
+
+    query = vectors[3]
+    expected = [d.id for d in exact.similarity_search_by_vector(query, k=5)]
+    assert [d.id for d in ivf.similarity_search_by_vector(query, k=5)] == expected
+
+
+def test_ivf_snapshot_restores_index(tmp_path: Path) -> None:
+    """Test that a saved IVF store is searchable without retraining."""
+    vectors = clustered_vectors(500, 16)
+    texts = [str(i) for i in range(len(vectors))]
+    embedding = DeterministicFakeEmbedding(size=16)
+    ivf = IVFVectorStore(embedding=embedding, n_lists=8, n_probe=2, min_index_size=0)
+    ivf.add_embeddings(texts, vectors, ids=texts)
+    ivf.save(str(tmp_path))
+
+    loaded = IVFVectorStore.load(
+        str(tmp_path), embedding, n_lists=8, n_probe=2, min_index_size=0
+    )
+    assert not loaded._index_stale
+    query = vectors[7]
+    assert [d.id for d in loaded.similarity_search_by_vector(query, k=5)] == [
+        d.id for d in ivf.similarity_search_by_vector(query, k=5)
+    ]
+
+
+def test_ivf_filtered_search_matches_exact_search() -> None:
+    """Test that a filter matching few rows falls back to an exact search."""
+    vectors = clustered_vectors(2000, 16)
+    texts = [str(i) for i in range(len(vectors))]
+    metadatas = [{"year": 1990 + i % 30} for i in range(len(vectors))]
+    embedding = DeterministicFakeEmbedding(size=16)
+    exact = NumpyVectorStore(embedding=embedding)
+    exact.add_embeddings(texts, vectors, metadatas, ids=texts)
+    ivf = IVFVectorStore(embedding=embedding, n_lists=20, n_probe=1, min_index_size=100)
+    ivf.add_embeddings(texts, vectors, metadatas, ids=texts)
+
+    query = clustered_vectors(1, 16, seed=1)[0]
+    filter = {"year": 2005}
+    expected = exact.similarity_search_by_vector(query, k=10, filter=filter)
+    found = ivf.similarity_search_by_vector(query, k=10, filter=filter)
+
+    assert [doc.id for doc in found] == [doc.id for doc in expected]
+    assert all(doc.metadata["year"] == 2005 for doc in found)
+
+
+@pytest.mark.parametrize("options", [{"n_probe": 0}, {"n_lists": 0}])
+def test_ivf_rejects_empty_probes_and_lists(options: dict[str, int]) -> None:
+    """Test that settings that would search no cluster fail at construction."""
+    with pytest.raises(ValueError):
+        IVFVectorStore(embedding=DeterministicFakeEmbedding(size=4), **options)
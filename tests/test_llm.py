@@ -1,9 +1,50 @@
 """Tests for the MovieRecommenderLLM class."""
 
-from movie_recommender.llm import MovieRecommenderLLM
+import asyncio
+import json
+from collections.abc import Iterator
+from typing import Any
+
+from langchain_core.messages import AIMessageChunk, BaseMessage
+from langchain_core.outputs import ChatGenerationChunk
+from langchain_core.tools import tool
+
+from movie_recommender.history import SUMMARY_PREFIX
+from movie_recommender.llm import ChatEvent, MovieRecommenderLLM
 from tests.conftest import FakeChatModelWithTools
 
 
+class ToolCallingFakeModel(FakeChatModelWithTools):
+    """Fake model that first calls the search tool, then answers word by word."""
+
+    def _stream(
+        self, messages: list[BaseMessage], *args: Any, **kwargs: Any
+    ) -> Iterator[ChatGenerationChunk]:
+        if not any(message.type == "tool" for message in messages):
+            yield ChatGenerationChunk(
+                message=AIMessageChunk(
+                    content="",
+                    tool_call_chunks=[
+                        {
+                            "name": "search_movies",
+                            "args": json.dumps({"query": "space"}),
+                            "id": "call-1",
+                            "index": 0,
+                        }
+                    ],
+                )
+            )
+            return
+        for word in self.responses[0].split(" "):
+            yield ChatGenerationChunk(message=AIMessageChunk(content=word + " "))
+
+
+@tool
+def search_movies(query: str) -> str:
+    """Search movies matching a query."""
+    return "title: Alien"
+
+
 def test_create_llm_with_model(fake_model: FakeChatModelWithTools) -> None:
     """Test creating MovieRecommenderLLM with a pre-initialized model."""
     llm = MovieRecommenderLLM(model=fake_model)
@@ -27,3 +68,78 @@ def test_chat_with_fake_model(fake_model: FakeChatModelWithTools) -> None:
     response = llm.chat("Hi, can you help me find a movie to watch tonight?")
     assert response == "What about **The Holy Mountain**?"
     assert len(llm._conversation) == 4  # Initial + user + response
+
+
+def test_achat_with_fake_model(fake_model: FakeChatModelWithTools) -> None:
+    """Test the async chat method with a fake model."""
+    llm = MovieRecommenderLLM(model=fake_model)
+    response = asyncio.run(llm.achat("Something cozy for a rainy evening?"))
+    assert response == "What about **The Holy Mountain**?"
+    assert len(llm._conversation) == 4  # Initial + user + response
+
+
+class AsyncOnlyFakeModel(FakeChatModelWithTools):
+    """Fake model failing on blocking calls, to catch them on the event loop."""
+
+    def invoke(self, *args: Any, **kwargs: Any) -> Any:
+        raise AssertionError("Blocking model call")
+
+
+def test_achat_summarizes_history_without_blocking() -> None:
+    """Test that async turns summarize dropped turns with an async call."""
+    model = AsyncOnlyFakeModel(responses=["Noted.", "A summary."])
+    llm = MovieRecommenderLLM(
+        model=model, history_token_budget=1, summarize_history=True
+    )
+
+    async def chat() -> None:
+        for message in ("Hi!", "Something with dragons?", "Maybe animated?"):
+            await llm.achat(message)
+
+    asyncio.run(chat())
+    assert any(SUMMARY_PREFIX in message.text for message in llm._conversation)
+
+
+def test_prompt_tokens_are_recorded_per_turn(
+    fake_model: FakeChatModelWithTools,
+) -> None:
+    """Test that every turn records the prompt tokens it sent."""
+    llm = MovieRecommenderLLM(model=fake_model, history_token_budget=10_000)
+    llm.chat("Hi!")
+    llm.chat("Something with dragons?")
+    assert len(llm.turn_prompt_tokens) == 2
+    assert llm.turn_prompt_tokens[1] > llm.turn_prompt_tokens[0] > 0
+    assert llm.last_prompt_tokens == llm.turn_prompt_tokens[1]
+
+
+def test_stream_chat_yields_tokens_and_answer(
+    fake_model: FakeChatModelWithTools,
+) -> None:
+    """Test that streamed tokens add up to the answer recorded in history."""
+    llm = MovieRecommenderLLM(model=fake_model)
+
+    async def collect() -> list[ChatEvent]:
+        return [event async for event in llm.astream_chat("Something cozy?")]
+
+    events = asyncio.run(collect())
+
+    tokens = "".join(event.text for event in events if event.kind == "token")
+    assert tokens == "What about **The Holy Mountain**?"
+    assert events[-1] == ChatEvent("answer", tokens)
+    assert len(events) > 2
+    assert len(llm._conversation) == 4
+
+
+def test_stream_chat_reports_tool_progress() -> None:
+    """Test that tool calls and results are streamed before the answer."""
+    llm = MovieRecommenderLLM(
+        model=ToolCallingFakeModel(responses=["I recommend Alien"])
+    )
+    llm.set_tools([search_movies])
+    events = list(llm.stream_chat("Space horror?"))
+
+    kinds = [event.kind for event in events]
+    assert kinds[:2] == ["tool_call", "tool_result"]
+    assert events[0] == ChatEvent("tool_call", "search_movies", {"query": "space"})
+    assert kinds[-1] == "answer" and set(kinds[2:-1]) == {"token"}
+    assert events[-1].text.strip() == "I recommend Alien"
@@ -0,0 +1,47 @@
+"""Tests for the columnar metadata filter index."""
+
+import pytest
+
+from movie_recommender.metadata_index import MetadataIndex
+
+MOVIES = [
+    {
+        "release_year": 1979,
+        "original_language": "en",
+        "genres": "Horror, Science Fiction",
+    },
+    {
+        "release_year": 1972,
+        "original_language": "ru",
+        "genres": "Drama, Science Fiction",
+    },
+    {"release_year": 2001, "original_language": "fr", "genres": "Comedy, Romance"},
+    {"release_year": None, "original_language": "en", "genres": None},
+]
+
+
+def matching(filter: dict) -> list[int]:
+    return MetadataIndex(MOVIES).mask(filter).nonzero()[0].tolist()
+
+
+def test_field_operators() -> None:
+    """Test comparisons, membership and LIKE patterns on single fields."""
+    assert matching({"original_language": "en"}) == [0, 3]
+    assert matching({"release_year": {"$lt": 1980}}) == [0, 1]
+    assert matching({"release_year": {"$ne": 1979}}) == [1, 2]
+    assert matching({"release_year": {"$between": [1970, 1980]}}) == [0, 1]
+    assert matching({"original_language": {"$in": ["fr", "ru"]}}) == [1, 2]
+    assert matching({"original_language": {"$nin": ["en"]}}) == [1, 2]
+    assert matching({"genres": {"$ilike": "%science fiction%"}}) == [0, 1]
+    assert matching({"genres": {"$exists": False}}) == [3]
+
+
+def test_logical_operators() -> None:
+    """Test that clauses combine with $and, $or, $not and implicit and."""
+    assert matching({"original_language": "en", "release_year": {"$gte": 1970}}) == [0]
+    assert matching(
+        {"$or": [{"original_language": "fr"}, {"genres": {"$like": "Horror%"}}]}
+    ) == [0, 2]
+    assert matching({"$not": {"original_language": "en"}}) == [1, 2]
+    with pytest.raises(ValueError, match="Unsupported"):
+        matching({"release_year": {"$regex": "19.*"}})
@@ -0,0 +1,142 @@
+"""Tests for the stage timers and metrics sinks."""
+
+import contextvars
+import math
+import threading
+import urllib.request
+
+import pytest
+from langchain_core.embeddings import DeterministicFakeEmbedding
+from langchain_core.vectorstores import InMemoryVectorStore
+
+from movie_recommender import metrics
+from movie_recommender.indexer import MovieIndexer
+from movie_recommender.llm import MovieRecommenderLLM
+from tests.test_indexer import FakeLoader
+from tests.test_llm import ToolCallingFakeModel, search_movies
+
+
+def test_collect_gathers_spans_of_block_only() -> None:
+    """Test that only spans recorded inside a collect() block are collected."""
+    metrics.record("before", 1.0)
+    with metrics.collect() as spans:
+        with metrics.timer("outer"):
+            metrics.record("inner", 0.5)
+        metrics.record("inner", 0.25)
+    metrics.record("after", 1.0)
+
+    assert [span.stage for span in spans] == ["inner", "outer", "inner"]
+    totals = metrics.breakdown(spans)
+    assert totals["inner"] == (2, 0.75)
+    assert totals["outer"][0] == 1
+
+
+def test_collect_follows_copied_context_into_threads() -> None:
+    """Test that threads started with a copy of the context add to the spans."""
+    with metrics.collect() as spans:
+        context = contextvars.copy_context()
+        thread = threading.Thread(target=context.run, args=(metrics.record, "t", 0.1))
+        thread.start()
+        thread.join()
+    assert [span.stage for span in spans] == ["t"]
+
+
+def test_timed_records_every_item() -> None:
+    """Test that producing every item of an iterable is timed."""
+    with metrics.collect() as spans:
+        assert list(metrics.timed(iter([1, 2, 3]), "parse")) == [1, 2, 3]
+    assert metrics.breakdown(spans)["parse"][0] == 3
+
+
+def test_sinks_receive_records() -> None:
+    """Test that added sinks receive records until they are removed."""
+    sink = metrics.HistogramSink()
+    metrics.add_sink(sink)
+    try:
+        metrics.record("llm", 0.2)
+    finally:
+        metrics.remove_sink(sink)
+    metrics.record("llm", 0.2)
+    assert sink.count("llm") == 1
+    assert sink.total("llm") == pytest.approx(0.2)
+
+
+def test_histogram_quantiles_interpolate_within_buckets() -> None:
+    """Test the quantile estimates of the in-process histogram."""
+    sink = metrics.HistogramSink(buckets=[0.1, 0.2, 0.4])
+    for seconds in [0.05] * 50 + [0.15] * 45 + [0.3] * 5:
+        sink.record("search", seconds)
+
+    assert sink.quantile("search", 0.5) == pytest.approx(0.1)
+    assert 0.1 < sink.quantile("search", 0.9) < 0.2
+    assert 0.2 < sink.quantile("search", 0.99) <= 0.4
+    assert math.isnan(sink.quantile("missing", 0.5))
+    sink.record("search", 10.0)
+    assert sink.quantile("search", 1.0) == 0.4
+
+
+def test_prometheus_exposition_format() -> None:
+    """Test the text exposition of the Prometheus sink."""
+    sink = metrics.PrometheusSink(buckets=[0.1, 1.0])
+    sink.record("vector_search", 0.05)
+    sink.record("vector_search", 0.5)
+    sink.record('tool:"x"', 2.0)
+    lines = sink.exposition().splitlines()
+
+    name = metrics.METRIC_NAME
+    assert f"# TYPE {name} histogram" in lines
+    assert f'{name}_bucket{{stage="vector_search",le="0.1"}} 1' in lines
+    assert f'{name}_bucket{{stage="vector_search",le="1.0"}} 2' in lines
+    assert f'{name}_bucket{{stage="vector_search",le="+Inf"}} 2' in lines
+    assert f'{name}_sum{{stage="vector_search"}} 0.55' in lines
+    assert f'{name}_count{{stage="vector_search"}} 2' in lines
+    assert f'{name}_count{{stage="tool:\\"x\\""}} 1' in lines
+
+
+def test_prometheus_sink_serves_metrics() -> None:
+    """Test that the exposition is served at /metrics."""
+    sink = metrics.PrometheusSink()
+    sink.record("llm", 1.5)
+    server = sink.serve(0)
+    try:
+        url = f"http://127.0.0.1:{server.server_address[1]}/metrics"
+        with urllib.request.urlopen(url) as response:
+            body = response.read().decode()
+    finally:
+        server.shutdown()
+    assert body == sink.exposition()
+
+
+def test_configure_rejects_unknown_sink() -> None:
+    """Test that unsupported sink names are rejected."""
+    with pytest.raises(ValueError, match="statsd"):
+        metrics.configure(["statsd"])
+
+
+def test_chat_turn_records_llm_and_tool_calls() -> None:
+    """Test that every model and tool call of a streamed turn is timed."""
+    llm = MovieRecommenderLLM(
+        model=ToolCallingFakeModel(responses=["I recommend Alien"])
+    )
+    llm.set_tools([search_movies])
+    with metrics.collect() as spans:
+        list(llm.stream_chat("Space horror?"))
+
+    totals = metrics.breakdown(spans)
+    assert totals["llm"][0] == 2
+    assert totals["tool:search_movies"][0] == 1
+
+
+def test_indexer_records_stages() -> None:
+    """Test that parsing, embedding and writing batches are timed."""
+    store = InMemoryVectorStore(
+        embedding=metrics.TimedEmbeddings(DeterministicFakeEmbedding(size=8))
+    )
+    indexer = MovieIndexer(loader=FakeLoader(5), vector_store=store)
+    with metrics.collect() as spans:
+        indexer.index(batch_size=2)
+
+    totals = metrics.breakdown(spans)
+    assert totals["index_parse"][0] == 3
+    assert totals["index_write"][0] == 3
+    assert totals["embed_documents"][0] == 3
@@ -0,0 +1,74 @@
+"""Tests for the precomputed neighbour graph."""
+
+from pathlib import Path
+
+import numpy as np
+
+from movie_recommender.neighbors import NeighborGraph, build_neighbor_graph, title_key
+from movie_recommender.numpy_vectorstore import normalize
+
+
+def random_vectors(rows: int, dim: int = 8, seed: int = 0) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    return normalize(rng.normal(size=(rows, dim))).astype(np.float32)
+
+
+def test_blocked_graph_matches_brute_force() -> None:
+    """Test that tiles and running top-k merges find the exact neighbours."""
+    vectors = random_vectors(23)
+    ids = [f"m{i}" for i in range(23)]
+    graph = build_neighbor_graph(ids, vectors, k=4, block_rows=5, block_columns=6)
+
+    scores = vectors @ vectors.T
+    np.fill_diagonal(scores, -np.inf)
+    for row in range(23):
+        expected = np.argsort(-scores[row])[:4]
+        similar = graph.similar(ids[row])
+        assert [doc_id for doc_id, _ in similar] == [ids[i] for i in expected]
+        np.testing.assert_allclose(
+            [score for _, score in similar], scores[row, expected], atol=1e-3
+        )
+
+
+def test_graph_storage_is_compact() -> None:
+    """Test the dtypes of the stored neighbours and scores."""
+    graph = build_neighbor_graph(["a", "b", "c"], random_vectors(3), k=5)
+    assert graph.k == 2
+    assert graph._neighbors.dtype == np.int32
+    assert graph._scores.dtype == np.float16
+    assert build_neighbor_graph(["a"], random_vectors(1)).similar("a") == []
+
+
+def test_find_by_title_or_source_id() -> None:
+    """Test lookups by normalized title, popularity and source id."""
+    graph = build_neighbor_graph(
+        ["a", "b", "c"],
+        random_vectors(3),
+        k=2,
+        titles=["Amélie", "The Thing", "The Thing"],
+        source_ids=[194, 1091, 2000],
+        popularity=np.array([5.0, 30.0, 2.0]),
+    )
+    assert title_key("  AMELIE! ") == "amelie"
+    assert graph.find(title="amelie") == "a"
+    assert graph.find(title="the thing") == "b"
+    assert graph.find(source_id=2000) == "c"
+    assert graph.find(title="Alien") is None
+
+
+def test_save_and_load_round_trip(tmp_path: Path) -> None:
+    """Test that a saved graph loads with the same lookups."""
+    graph = build_neighbor_graph(
+        ["a", "b", "c"],
+        random_vectors(3),
+        k=2,
+        titles=["Alien", None, "Heat"],
+        source_ids=[348, None, 949],
+    )
+    path = str(tmp_path / "graph" / "neighbors.npz")
+    graph.save(path)
+    loaded = NeighborGraph.load(path)
+
+    assert loaded.similar("a") == graph.similar("a")
+    assert loaded.find(title="heat") == "c"
+    assert loaded.find(source_id="348") == "a"
@@ -0,0 +1,171 @@
+"""Tests for the NumPy-backed vector store."""
+
+from pathlib import Path
+
+import numpy as np
+import pytest
+from langchain_core.documents import Document
+from langchain_core.embeddings import DeterministicFakeEmbedding
+
+from movie_recommender.numpy_vectorstore import NumpyVectorStore, top_k
+from movie_recommender.snapshot_columns import MetadataColumns, StringColumn
+from movie_recommender.vectorstore import get_vector_store
+
+
+@pytest.fixture
+def store() -> NumpyVectorStore:
+    store = NumpyVectorStore(
+        embedding=DeterministicFakeEmbedding(size=16), initial_capacity=2
+    )
+    store.add_documents(
+        [
+            Document(page_content=f"overview {i}", metadata={"title": f"M{i}"})
+            for i in range(10)
+        ],
+        ids=[str(i) for i in range(10)],
+    )
+    return store
+
+
+def test_top_k_returns_highest_scores_in_order() -> None:
+    """Test that top_k selects and sorts the best rows."""
+    rows, scores = top_k(np.array([0.1, 0.9, 0.5, 0.7]), 2)
+    assert rows.tolist() == [1, 3]
+    assert scores.tolist() == [0.9, 0.7]
+
+
+def test_exact_match_is_ranked_first(store: NumpyVectorStore) -> None:
+    """Test that a document's own text retrieves it with similarity 1."""
+    results = store.similarity_search_with_score("overview 7", k=3)
+    assert len(results) == 3
+    assert results[0][0].id == "7"
+    assert results[0][0].metadata == {"title": "M7"}
+    assert results[0][1] == pytest.approx(1.0, abs=1e-5)
+
+
+def test_upsert_and_delete_keep_rows_dense(store: NumpyVectorStore) -> None:
+    """Test that overwriting and deleting ids keep ids and rows consistent."""
+    store.add_texts(["new overview 3"], [{"title": "M3b"}], ids=["3"])
+    store.delete(["0", "5"])
+
+    assert len(store) == 9 - 1
+    assert store.vectors.shape == (8, 16)
+    assert store.get_by_ids(["3"])[0].page_content == "new overview 3"
+    assert store.get_by_ids(["0", "5"]) == []
+    assert store.similarity_search("overview 9", k=1)[0].id == "9"
+
+
+def test_float16_matches_float32(store: NumpyVectorStore) -> None:
+    """Test that half-precision storage returns the same ranking."""
+    half = NumpyVectorStore(embedding=store.embeddings, dtype=np.float16)
+    half.add_embeddings(
+        [doc.page_content for doc in store.get_by_ids(store._ids)],
+        store.vectors,
+        ids=store._ids,
+    )
+    expected = [doc.id for doc in store.similarity_search("overview 4", k=5)]
+    assert [doc.id for doc in half.similarity_search("overview 4", k=5)] == expected
+
+
+def test_snapshot_roundtrip_is_memory_mapped(
+    store: NumpyVectorStore, tmp_path: Path
+) -> None:
+    """Test that a loaded snapshot searches like the original and copies on write."""
+    store.save(str(tmp_path))
+    loaded = NumpyVectorStore.load(str(tmp_path), store.embeddings)
+
+    assert isinstance(loaded._vectors, np.memmap)
+    assert isinstance(loaded._texts, StringColumn)
+    assert isinstance(loaded._texts._data, np.memmap)
+    assert loaded.get_by_ids(["4"]) == store.get_by_ids(["4"])
+    assert [d.id for d in loaded.similarity_search("overview 2", k=3)] == [
+        d.id for d in store.similarity_search("overview 2", k=3)
+    ]
+
+    loaded.delete(["2"])
+    loaded.add_texts(["overview 10"], ids=["10"])
+    assert not isinstance(loaded._vectors, np.memmap)
+    assert loaded.get_by_ids(["10", "2", "9"])[1].id == "9"
+    assert len(NumpyVectorStore.load(str(tmp_path), store.embeddings)) == 10
+
+
+def test_snapshot_save_publishes_new_version_atomically(
+    store: NumpyVectorStore, tmp_path: Path
+) -> None:
+    """Test that every save is a new version and old versions are pruned."""
+    store.save(str(tmp_path))
+    before = NumpyVectorStore.load(str(tmp_path), store.embeddings)
+    store.delete(["0"])
+    store.save(str(tmp_path))
+    store.save(str(tmp_path))
+
+    versions = sorted(p.name for p in tmp_path.iterdir() if p.is_dir())
+    current = (tmp_path / "CURRENT").read_text()
+    assert len(versions) == 2
+    assert current in versions
+    assert len(NumpyVectorStore.load(str(tmp_path), store.embeddings)) == 9
+    # A store loaded from a pruned version keeps reading its mapped vectors.
+    assert len(before.similarity_search("overview 2", k=3)) == 3
+
+
+def test_snapshot_columns_decode_only_returned_rows(tmp_path: Path) -> None:
+    """Test that loaded documents come from mapped columns, decoded per row."""
+    store = NumpyVectorStore(embedding=DeterministicFakeEmbedding(size=8))
+    metadatas = [
+        {"title": "Amélie", "year": 2001, "genres": ["Comedy", "Romance"]},
+        {"title": "Heat"},
+        {},
+    ]
+    store.add_texts(["a\nb", "", "c"], metadatas, ids=["b", "c", "a"])
+    store.save(str(tmp_path))
+    loaded = NumpyVectorStore.load(str(tmp_path), store.embeddings)
+
+    assert isinstance(loaded._texts, StringColumn)
+    assert isinstance(loaded._metadatas, MetadataColumns)
+    assert loaded.get_by_ids(["a", "x", "b", "c"]) == store.get_by_ids(["a", "b", "c"])
+    assert loaded.metadata_values("year") == [2001, None, None]
+    found = loaded.similarity_search("c", k=3, filter={"title": "Heat"})
+    assert [doc.id for doc in found] == ["c"]
+
+
+def test_snapshot_requires_pointer(tmp_path: Path) -> None:
+    """Test that a directory without a CURRENT pointer holds no snapshot."""
+    assert not NumpyVectorStore.snapshot_exists(str(tmp_path))
+    with pytest.raises(FileNotFoundError):
+        NumpyVectorStore.load(str(tmp_path), DeterministicFakeEmbedding(size=4))
+
+
+def test_factory_creates_numpy_store(tmp_path: Path) -> None:
+    """Test that the factory exposes the store under the 'numpy' name."""
+    embedding = DeterministicFakeEmbedding(size=4)
+    store = get_vector_store("numpy", embedding, path=str(tmp_path))
+    assert isinstance(store, NumpyVectorStore)
+    assert len(store) == 0
+
+    store.add_texts(["overview"], ids=["1"])
+    store.save(str(tmp_path))
+    loaded = get_vector_store("numpy", embedding, path=str(tmp_path))
+    assert isinstance(loaded, NumpyVectorStore)
+    assert len(loaded) == 1
+    rebuilt = get_vector_store(
+        "numpy", embedding, path=str(tmp_path), overwrite_existing=True
+    )
+    assert isinstance(rebuilt, NumpyVectorStore)
+    assert len(rebuilt) == 0
+
+
+def test_filtered_search_returns_only_matches(store: NumpyVectorStore) -> None:
+    """Test that a metadata filter restricts results without losing k."""
+    for doc_id in ("3", "4", "5"):
+        [doc] = store.get_by_ids([doc_id])
+        store.add_documents(
+            [Document(page_content=doc.page_content, metadata={"year": 2000})],
+            ids=[doc_id],
+        )
+
+    results = store.similarity_search("overview 7", k=2, filter={"year": 2000})
+    everything = store.similarity_search("overview 7", k=10, filter={"title": "M7"})
+
+    assert len(results) == 2
+    assert {doc.id for doc in results} <= {"3", "4", "5"}
+    assert [doc.id for doc in everything] == ["7"]
@@ -0,0 +1,44 @@
+"""Tests for the process pool embeddings."""
+
+from functools import partial
+from pathlib import Path
+
+import pytest
+from langchain_core.embeddings import DeterministicFakeEmbedding
+
+from movie_recommender.embedding_cache import CachedEmbeddings
+from movie_recommender.metrics import TimedEmbeddings
+from movie_recommender.parallel_embeddings import ProcessPoolEmbeddings
+
+
+def test_process_pool_preserves_order() -> None:
+    """Test that sharded results match single-process embeddings in order."""
+    factory = partial(DeterministicFakeEmbedding, size=8)
+    texts = [f"movie {i}" for i in range(25)]
+
+    with ProcessPoolEmbeddings(factory, workers=2, shard_size=4) as embedding:
+        vectors = embedding.embed_documents(texts)
+        query = embedding.embed_query("movie 3")
+
+    expected = factory().embed_documents(texts)
+    assert vectors == expected
+    assert query == expected[3]
+
+
+def test_process_pool_rejects_zero_workers() -> None:
+    """Test that workers=0 is an error instead of the CPU count."""
+    with pytest.raises(ValueError):
+        ProcessPoolEmbeddings(partial(DeterministicFakeEmbedding, size=8), workers=0)
+
+
+def test_wrappers_shut_down_the_pool(tmp_path: Path) -> None:
+    """Test that closing the cached, timed model closes the pool it wraps."""
+    pool = ProcessPoolEmbeddings(partial(DeterministicFakeEmbedding, size=8), workers=1)
+    embedding = CachedEmbeddings(
+        TimedEmbeddings(pool), "fake", str(tmp_path / "cache.sqlite3")
+    )
+
+    embedding.close()
+
+    with pytest.raises(RuntimeError):
+        pool.embed_query("movie")
@@ -0,0 +1,91 @@
+"""Tests for the COPY bulk loader of pgvector tables."""
+
+import contextlib
+import json
+import uuid
+from collections.abc import AsyncGenerator
+from typing import Any
+
+import pytest
+from langchain_core.documents import Document
+from langchain_core.embeddings import DeterministicFakeEmbedding
+
+from movie_recommender.pg_bulk_load import PGBulkLoader, copy_records
+
+COLUMNS = {
+    "release_year": "INTEGER",
+    "original_language": "TEXT",
+    "popularity": "DOUBLE PRECISION",
+}
+
+
+def test_copy_records_splits_metadata_into_columns_and_json() -> None:
+    """Test that column metadata is typed and the rest is stored as JSON."""
+    doc_id = str(uuid.uuid4())
+    doc = Document(
+        page_content="A heist.",
+        metadata={"title": "Heat", "release_year": 1995.0, "popularity": 42},
+    )
+
+    [record] = copy_records([doc], [doc_id], [[0.1, 0.2]], COLUMNS)
+
+    assert record[:3] == (uuid.UUID(doc_id), "A heist.", [0.1, 0.2])
+    assert record[3:6] == (1995, None, 42.0)
+    assert type(record[3]) is int and type(record[5]) is float
+    assert json.loads(record[6]) == {"title": "Heat"}
+    assert doc.metadata["release_year"] == 1995.0
+
+
+def test_copy_records_keeps_the_last_document_per_id() -> None:
+    """Test that duplicate ids collapse into one record, as upserts would."""
+    first, second = str(uuid.uuid4()), str(uuid.uuid4())
+    docs = [
+        Document(page_content="old", metadata={"release_year": 1995}),
+        Document(page_content="other"),
+        Document(page_content="new", metadata={"release_year": 1996}),
+    ]
+
+    records = copy_records(docs, [first, second, first], [[0.1], [0.2], [0.3]], COLUMNS)
+
+    assert [record[:3] for record in records] == [
+        (uuid.UUID(second), "other", [0.2]),
+        (uuid.UUID(first), "new", [0.3]),
+    ]
+    assert records[1][3] == 1996
+
+
+class RecordingConnection:
+    def __init__(self) -> None:
+        self.calls: list[tuple[str, Any]] = []
+
+    @contextlib.asynccontextmanager
+    async def transaction(self) -> AsyncGenerator[None]:
+        yield
+
+    async def copy_records_to_table(self, table: str, **kwargs: Any) -> None:
+        self.calls.append(("copy", (kwargs["schema_name"], table, kwargs["records"])))
+
+    async def execute(self, query: str) -> None:
+        self.calls.append(("execute", query))
+
+    async def close(self) -> None:
+        pass
+
+
+def test_batches_are_upserted_through_a_staging_table(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """Test that a batch is copied to staging and upserted by id."""
+    doc_id = str(uuid.uuid4())
+    connection = RecordingConnection()
+    with PGBulkLoader(
+        "postgresql://", "movies", DeterministicFakeEmbedding(size=2)
+    ) as loader:
+        monkeypatch.setattr(loader, "_connection", connection)
+        loader.add_documents([Document(page_content="a")] * 2, ids=[doc_id] * 2)
+
+    (_, (schema, table, records)), (_, insert) = connection.calls
+    assert (schema, table, len(records)) == ("pg_temp", "movies_staging", 1)
+    assert 'FROM pg_temp."movies_staging"' in insert
+    assert 'ON CONFLICT ("langchain_id") DO UPDATE' in insert
+    assert loader.rows == 1
@@ -0,0 +1,68 @@
+"""Tests for the shared Postgres engines of the vector store factory."""
+
+import asyncio
+from collections.abc import Iterator
+
+import pytest
+
+from movie_recommender import config
+from movie_recommender.vectorstore import (
+    _pg_pool_options,
+    aget_pg_engine,
+    get_pg_engine,
+)
+
+PG_SETTINGS = {
+    "PG_USER": "user",
+    "PG_PASSWORD": "secret",
+    "PG_HOST": "localhost",
+    "PG_PORT": "6024",
+    "PG_DB": "movies",
+    "PG_POOL_SIZE": 3,
+    "PG_MAX_OVERFLOW": 2,
+    "PG_POOL_PRE_PING": True,
+    "PG_POOL_RECYCLE": 600,
+    "PG_STATEMENT_CACHE_SIZE": 0,
+}
+
+
+@pytest.fixture(autouse=True)
+def pg_config(monkeypatch: pytest.MonkeyPatch) -> Iterator[None]:
+    for name, value in PG_SETTINGS.items():
+        monkeypatch.setattr(config, name, value, raising=False)
+    get_pg_engine.cache_clear()
+    yield
+    get_pg_engine.cache_clear()
+
+
+def test_sync_engine_is_shared_and_sized() -> None:
+    """Test that sync callers share one pooled engine per access mode."""
+    engine = get_pg_engine()
+
+    assert get_pg_engine() is engine
+    assert get_pg_engine(read_only=True) is not engine
+    assert "Pool size: 3 " in engine._pool.pool.status()
+
+
+def test_pool_options_follow_config() -> None:
+    """Test that pool sizing and read-only sessions come from the settings."""
+    options = _pg_pool_options(read_only=True)
+
+    assert options["pool_size"] == 3
+    assert options["max_overflow"] == 2
+    assert options["pool_recycle"] == 600
+    settings = options["connect_args"]["server_settings"]
+    assert settings["default_transaction_read_only"] == "on"
+
+
+def test_async_engine_is_shared_per_event_loop() -> None:
+    """Test that async callers share one engine per running event loop."""
+
+    async def engines() -> tuple:
+        return await aget_pg_engine(), await aget_pg_engine()
+
+    first, again = asyncio.run(engines())
+    other, _ = asyncio.run(engines())
+
+    assert first is again
+    assert other is not first
@@ -0,0 +1,81 @@
+"""Tests for the int8 quantized vector store."""
+
+from pathlib import Path
+
+import numpy as np
+from langchain_core.embeddings import DeterministicFakeEmbedding
+
+from movie_recommender.numpy_vectorstore import NumpyVectorStore, normalize
+from movie_recommender.quantized_vectorstore import QuantizedVectorStore, quantize_int8
+from movie_recommender.vectorstore import get_vector_store
+from tests.helpers import clustered_vectors
+
+
+def test_quantize_int8_round_trip_error_is_small() -> None:
+    """Test that dequantized codes are within half a step of the vectors."""
+    vectors = normalize(clustered_vectors(200, 32).astype(np.float32))
+    codes, scale = quantize_int8(vectors)
+
+    assert codes.dtype == np.int8
+    assert np.abs(codes).max() == 127
+    assert np.all(np.abs(codes * scale - vectors) <= scale / 2 + 1e-6)
+
+
+def test_quantized_search_with_reranking_matches_exact_search() -> None:
+    """Test that re-ranked results and scores equal those of exact search."""
+    vectors = clustered_vectors(3000, 32)
+    texts = [str(i) for i in range(len(vectors))]
+    embedding = DeterministicFakeEmbedding(size=32)
+    exact = NumpyVectorStore(embedding=embedding)
+    quantized = QuantizedVectorStore(embedding=embedding, rerank_candidates=50)
+    for store in (exact, quantized):
+        store.add_embeddings(texts, vectors, ids=texts)
+        store.delete(["0", "1", "2"])
+
+    for query in clustered_vectors(20, 32, seed=1):
+        expected = exact.similarity_search_with_score_by_vector(query, k=10)
+        found = quantized.similarity_search_with_score_by_vector(query, k=10)
+        assert [doc.id for doc, _ in found] == [doc.id for doc, _ in expected]
+        np.testing.assert_allclose(
+            [score for _, score in found], [score for _, score in expected]
+        )
+    assert quantized.codes_nbytes < exact.vectors.nbytes / 3
+
+
+def test_quantized_filtered_search_matches_exact_search() -> None:
+    """Test that filtered results only come from matching rows."""
+    vectors = clustered_vectors(2000, 16)
+    texts = [str(i) for i in range(len(vectors))]
+    metadatas = [{"year": 1990 + i % 30} for i in range(len(vectors))]
+    embedding = DeterministicFakeEmbedding(size=16)
+    exact = NumpyVectorStore(embedding=embedding)
+    quantized = QuantizedVectorStore(embedding=embedding, rerank_candidates=30)
+    for store in (exact, quantized):
+        store.add_embeddings(texts, vectors, metadatas, ids=texts)
+
+    query = clustered_vectors(1, 16, seed=1)[0]
+    filter = {"year": 2005}
+    expected = exact.similarity_search_by_vector(query, k=10, filter=filter)
+    found = quantized.similarity_search_by_vector(query, k=10, filter=filter)
+
+    assert [doc.id for doc in found] == [doc.id for doc in expected]
+
+
+def test_quantized_snapshot_restores_codes(tmp_path: Path) -> None:
+    """Test that the factory loads saved codes without quantizing again."""
+    vectors = clustered_vectors(500, 16)
+    texts = [str(i) for i in range(len(vectors))]
+    embedding = DeterministicFakeEmbedding(size=16)
+    quantized = get_vector_store("int8", embedding, path=str(tmp_path))
+    assert isinstance(quantized, QuantizedVectorStore)
+    quantized.add_embeddings(texts, vectors, ids=texts)
+    quantized.save(str(tmp_path))
+
+    loaded = get_vector_store("int8", embedding, path=str(tmp_path))
+    assert isinstance(loaded, QuantizedVectorStore)
+    assert not loaded._codes_stale
+    assert isinstance(loaded._codes, np.memmap)
+    query = vectors[7]
+    assert [d.id for d in loaded.similarity_search_by_vector(query, k=5)] == [
+        d.id for d in quantized.similarity_search_by_vector(query, k=5)
+    ]
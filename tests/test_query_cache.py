@@ -0,0 +1,91 @@
+"""Tests for the semantic query-result cache."""
+
+import asyncio
+from collections.abc import Callable
+
+import numpy as np
+from langchain_core.embeddings import DeterministicFakeEmbedding, Embeddings
+
+from movie_recommender.numpy_vectorstore import NumpyVectorStore
+from movie_recommender.query_cache import QueryCache
+from movie_recommender.tools import make_movie_recommendation_tool
+
+
+class CountingEmbeddings(Embeddings):
+    """Embeds "near:<text>" close to "<text>" and counts query embeddings."""
+
+    def __init__(self) -> None:
+        self.inner = DeterministicFakeEmbedding(size=16)
+        self.calls = 0
+
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        return [self.embed_query(text) for text in texts]
+
+    def embed_query(self, text: str) -> list[float]:
+        self.calls += 1
+        vector = np.array(self.inner.embed_query(text.removeprefix("near:")))
+        if text.startswith("near:"):
+            vector[0] += 0.01
+        return vector.tolist()
+
+
+def test_query_embedding_is_memoized() -> None:
+    """Test that repeated queries are embedded only once."""
+    embedding = CountingEmbeddings()
+    cache = QueryCache(embedding)
+
+    first = cache.embed("space opera")
+    second = asyncio.run(cache.aembed("space opera"))
+
+    assert embedding.calls == 1
+    np.testing.assert_array_equal(first, second)
+    assert cache.stats.embedding_hits == 1
+
+
+def test_exact_and_semantic_hits() -> None:
+    """Test that results are reused for identical and near-duplicate queries."""
+    cache = QueryCache(CountingEmbeddings(), similarity_threshold=0.99)
+    cache.put("heist", cache.embed("heist"), ["result"])
+
+    assert cache.get("heist", cache.embed("heist")) == ["result"]
+    assert cache.get("near:heist", cache.embed("near:heist")) == ["result"]
+    assert cache.get("heist", cache.embed("heist"), params=10) is None
+    assert cache.get("western", cache.embed("western")) is None
+    assert (cache.stats.exact_hits, cache.stats.semantic_hits) == (1, 1)
+    assert cache.stats.misses == 2
+
+
+def test_entries_expire_and_are_evicted() -> None:
+    """Test the TTL and LRU bounds of the cache."""
+    now = [0.0]
+    cache = QueryCache(
+        CountingEmbeddings(),
+        max_entries=2,
+        ttl_seconds=10,
+        similarity_threshold=1.1,
+        clock=lambda: now[0],
+    )
+    for query in ("a", "b", "c"):
+        cache.put(query, cache.embed(query), [query])
+
+    assert cache.get("a", cache.embed("a")) is None
+    assert cache.get("c", cache.embed("c")) == ["c"]
+    now[0] = 11.0
+    assert cache.get("c", cache.embed("c")) is None
+
+
+def test_tool_uses_cache(
+    movie_store: NumpyVectorStore, tool_call: Callable[[str], dict]
+) -> None:
+    """Test that a cached tool answers repeated queries without searching."""
+    cache = QueryCache(movie_store.embeddings)
+    tool = make_movie_recommendation_tool(movie_store, cache=cache)
+    call = tool_call("Two friends on a summer road trip.")
+
+    first = tool.invoke(call)
+    second = asyncio.run(tool.ainvoke(call))
+
+    assert first.artifact[0].id == "2"
+    assert second.content == first.content
+    assert cache.stats.misses == 1
+    assert cache.stats.exact_hits == 1
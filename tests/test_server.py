@@ -0,0 +1,94 @@
+"""Tests for the multi-session HTTP server."""
+
+import asyncio
+import json
+from collections.abc import Awaitable, Callable
+
+import pytest
+
+from movie_recommender.llm import MovieRecommenderLLM
+from tests.conftest import FakeChatModelWithTools
+
+pytest.importorskip("aiohttp")
+from aiohttp import test_utils  # noqa: E402
+
+from cli.server import create_app  # noqa: E402
+
+
+def run_with_client(
+    llm: MovieRecommenderLLM, test: Callable[[test_utils.TestClient], Awaitable[None]]
+) -> None:
+    async def run() -> None:
+        async with test_utils.TestClient(
+            test_utils.TestServer(create_app(llm))
+        ) as client:
+            await test(client)
+
+    asyncio.run(run())
+
+
+def test_sessions_keep_separate_conversations(
+    fake_model: FakeChatModelWithTools,
+) -> None:
+    """Test that concurrent sessions answer independently."""
+    llm = MovieRecommenderLLM(model=fake_model)
+
+    async def test(client: test_utils.TestClient) -> None:
+        created = [await client.post("/sessions") for _ in range(3)]
+        ids = [(await response.json())["session_id"] for response in created]
+        assert all(response.status == 201 for response in created)
+
+        replies = await asyncio.gather(
+            *(
+                client.post(f"/sessions/{i}/messages", json={"message": "Hi!"})
+                for i in ids
+            )
+        )
+        answers = [(await reply.json())["answer"] for reply in replies]
+        assert answers == ["What about **The Holy Mountain**?"] * 3
+
+        health = await (await client.get("/health")).json()
+        assert health["sessions"] == 3 and health["created"] == 3
+        assert (
+            "movie_recommender_stage_seconds"
+            in await (await client.get("/metrics")).text()
+        )
+
+    run_with_client(llm, test)
+    assert len(llm._conversation) == 2
+
+
+def test_streamed_answer_is_ndjson(fake_model: FakeChatModelWithTools) -> None:
+    """Test that a streamed answer ends with the complete answer event."""
+
+    async def test(client: test_utils.TestClient) -> None:
+        response = await client.post("/sessions", json={"introduce": True})
+        session = await response.json()
+        assert session["answer"] == "What about **The Holy Mountain**?"
+
+        response = await client.post(
+            f"/sessions/{session['session_id']}/messages",
+            json={"message": "Something cozy?", "stream": True},
+        )
+        events = [json.loads(line) for line in (await response.text()).splitlines()]
+        assert {event["kind"] for event in events[:-1]} == {"token"}
+        assert events[-1]["kind"] == "answer"
+
+    run_with_client(MovieRecommenderLLM(model=fake_model), test)
+
+
+def test_unknown_session_and_bad_requests(
+    fake_model: FakeChatModelWithTools,
+) -> None:
+    """Test the error responses."""
+
+    async def test(client: test_utils.TestClient) -> None:
+        response = await client.post("/sessions/nope/messages", json={"message": "x"})
+        assert response.status == 404
+        session_id = (await (await client.post("/sessions")).json())["session_id"]
+        response = await client.post(f"/sessions/{session_id}/messages", json={})
+        assert response.status == 400
+        assert (await client.delete(f"/sessions/{session_id}")).status == 204
+        assert (await client.delete(f"/sessions/{session_id}")).status == 404
+
+    run_with_client(MovieRecommenderLLM(model=fake_model), test)
@@ -0,0 +1,81 @@
+"""Tests for the session table and shared-bot sessions."""
+
+import asyncio
+
+from movie_recommender.llm import MovieRecommenderLLM
+from movie_recommender.sessions import SessionTable
+from tests.conftest import FakeChatModelWithTools
+
+
+class FakeClock:
+    """Manually advanced monotonic clock."""
+
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_new_session_shares_agent_but_not_history(
+    fake_model: FakeChatModelWithTools,
+) -> None:
+    """Test that sessions reuse the compiled agent with their own history."""
+    llm = MovieRecommenderLLM(model=fake_model)
+    first, second = llm.new_session(), llm.new_session()
+    first.chat("Hi!")
+
+    assert first.agent is second.agent is llm.agent
+    assert len(first._conversation) == 4
+    assert len(second._conversation) == len(llm._conversation) == 2
+
+
+def test_idle_sessions_expire(fake_model: FakeChatModelWithTools) -> None:
+    """Test that sessions unused for longer than the timeout are evicted."""
+    clock = FakeClock()
+    table = SessionTable(
+        MovieRecommenderLLM(model=fake_model).new_session,
+        idle_timeout=10,
+        clock=clock,
+    )
+    idle, active = table.create(), table.create()
+    clock.now = 8
+    assert table.get(active.id) is active
+    clock.now = 15
+
+    assert table.expire_idle() == 1
+    assert table.get(idle.id) is None
+    assert table.get(active.id) is active
+    clock.now = 30
+    assert table.get(active.id) is None
+    assert len(table) == 0
+    assert table.stats.expired == 2
+
+
+def test_full_table_evicts_least_recently_used_idle_session(
+    fake_model: FakeChatModelWithTools,
+) -> None:
+    """Test LRU eviction, skipping sessions with a running turn."""
+    table = SessionTable(
+        MovieRecommenderLLM(model=fake_model).new_session, max_sessions=2
+    )
+    busy, idle = table.create(), table.create()
+
+    async def create_while_busy() -> None:
+        async with busy.lock:
+            table.create()
+
+    asyncio.run(create_while_busy())
+    assert table.get(busy.id) is busy
+    assert table.get(idle.id) is None
+    assert table.stats.evicted == 1
+    assert len(table) == 2
+
+
+def test_close_session(fake_model: FakeChatModelWithTools) -> None:
+    """Test that closed sessions are gone."""
+    table = SessionTable(MovieRecommenderLLM(model=fake_model).new_session)
+    session = table.create()
+    assert table.close(session.id)
+    assert not table.close(session.id)
+    assert table.get(session.id) is None
@@ -0,0 +1,44 @@
+"""Tests for the CLI startup profile and its deferred imports."""
+
+import subprocess
+import sys
+import threading
+import time
+
+from cli.startup import StartupProfile
+
+
+def test_profile_records_stages_of_all_threads() -> None:
+    """Test that stages from several threads are recorded in start order."""
+    profile = StartupProfile()
+    with profile.stage("main step"):
+        worker = threading.Thread(
+            target=lambda: profile.mark("background step", time.perf_counter()),
+            name="warm-up",
+        )
+        worker.start()
+        worker.join()
+
+    stages = {stage.name: stage for stage in profile.stages}
+    assert stages["background step"].thread == "warm-up"
+    assert stages["main step"].thread == threading.current_thread().name
+    assert stages["main step"].seconds >= 0
+    assert profile.table().row_count == 2
+
+
+def test_cli_import_defers_heavy_modules() -> None:
+    """Test that importing the CLI loads neither LangChain, torch nor pandas."""
+    heavy = ("langchain", "langgraph", "langchain_core", "torch", "pandas")
+    loaded = subprocess.run(
+        [
+            sys.executable,
+            "-c",
+            "import sys, cli.main; "
+            f"print(','.join(m for m in {heavy!r} if m in sys.modules))",
+        ],
+        capture_output=True,
+        check=True,
+        text=True,
+    ).stdout.strip()
+
+    assert loaded == ""
@@ -0,0 +1,30 @@
+"""Tests for the synthetic TMDB dataset of the benchmark suite."""
+
+from benchmarks.synthetic_tmdb import write_synthetic_csv
+from movie_recommender.data_sources import TMDB_DTYPES, CSVChunkLoader
+
+
+def test_synthetic_csv_loads_like_tmdb(tmp_path) -> None:
+    """Test that the generated file parses with the TMDB dtypes."""
+    path = str(tmp_path / "tmdb.csv")
+    write_synthetic_csv(path, rows=500, seed=3)
+    loader = CSVChunkLoader(
+        path,
+        content_column="overview",
+        metadata_columns=list(TMDB_DTYPES),
+        required_columns=["id", "title"],
+        chunksize=200,
+    )
+
+    docs = list(loader.lazy_load())
+    again = tmp_path / "again.csv"
+    write_synthetic_csv(str(again), rows=500, seed=3)
+
+    assert 400 < len(docs) < 500  # Overviews are missing for about 5%.
+    assert len({doc.metadata["id"] for doc in docs}) == len(docs)
+    assert all(
+        1920 <= doc.metadata["release_year"] <= 2025
+        for doc in docs[:50]
+        if doc.metadata["release_year"] is not None
+    )
+    assert again.read_bytes() == (tmp_path / "tmdb.csv").read_bytes()
@@ -0,0 +1,148 @@
+"""Tests for the movie recommendation tool."""
+
+import asyncio
+from collections.abc import Callable
+
+from langchain_core.documents import Document
+from langchain_core.embeddings import DeterministicFakeEmbedding
+
+from movie_recommender.bm25 import BM25IndexBuilder
+from movie_recommender.history import compact_tool_output
+from movie_recommender.neighbors import build_neighbor_graph
+from movie_recommender.numpy_vectorstore import NumpyVectorStore
+from movie_recommender.tools import (
+    build_filter,
+    make_movie_recommendation_tool,
+    make_similar_movies_tool,
+    render_movies,
+)
+
+
+def test_tool_sync_and_async_agree(
+    movie_store: NumpyVectorStore, tool_call: Callable[[str], dict]
+) -> None:
+    """Test that the sync and async tool paths return the same movies."""
+    tool = make_movie_recommendation_tool(movie_store, k=2)
+    call = tool_call("Two friends on a summer road trip.")
+
+    sync_message = tool.invoke(call)
+    async_message = asyncio.run(tool.ainvoke(call))
+
+    assert sync_message.artifact[0].id == "2"
+    assert [doc.id for doc in async_message.artifact] == ["2", "1"]
+    assert async_message.content == sync_message.content
+
+
+def test_render_movies_projects_fields() -> None:
+    """Test that only the selected fields and a truncated overview are rendered."""
+    doc = Document(
+        page_content="In deep space, a crew answers a distress call. " * 10,
+        metadata={
+            "title": "Alien",
+            "release_date": "1979-05-25",
+            "vote_average": 8.149,
+            "genres": None,
+            "poster_path": "/alien.jpg",
+        },
+    )
+
+    rendered = render_movies([doc], overview_chars=20)
+
+    assert rendered == (
+        "title: Alien; release_date: 1979-05-25; vote_average: 8.1\n"
+        "overview: In deep space, a cre…"
+    )
+    assert compact_tool_output(rendered) == "Previously found movies: Alien"
+    assert render_movies([]) == "No matching movies found."
+
+
+def test_build_filter_combines_preferences() -> None:
+    """Test that structured preferences become a metadata filter."""
+    assert build_filter() is None
+    assert build_filter(language="EN") == {"original_language": "en"}
+    assert build_filter(year_from=1990, genres=["Drama", "Comedy"]) == {
+        "$and": [
+            {"release_year": {"$gte": 1990}},
+            {
+                "$or": [
+                    {"genres": {"$ilike": "%Drama%"}},
+                    {"genres": {"$ilike": "%Comedy%"}},
+                ]
+            },
+        ]
+    }
+
+
+def test_tool_applies_structured_filters(
+    movie_store: NumpyVectorStore, tool_call: Callable[[str], dict]
+) -> None:
+    """Test that the tool only returns movies matching the preferences."""
+    movie_store.add_documents(
+        [
+            Document(
+                page_content="Two friends on a summer road trip.",
+                metadata={"title": "Road Trip", "release_year": 1985},
+                id="2",
+            )
+        ]
+    )
+    tool = make_movie_recommendation_tool(movie_store)
+
+    call = tool_call("road trip")
+    call["args"]["year_to"] = 1989
+    message = tool.invoke(call)
+
+    assert [doc.id for doc in message.artifact] == ["2"]
+
+
+def test_hybrid_search_finds_lexical_matches(
+    movie_store: NumpyVectorStore, tool_call: Callable[[str], dict]
+) -> None:
+    """Test that a BM25 match the embedding misses is fused into the results."""
+    movie_store.add_documents(
+        [
+            Document(
+                page_content="A mystic leads a thief to a sacred mountain.",
+                metadata={"title": "The Holy Mountain", "director": "Jodorowsky"},
+                id="3",
+            )
+        ]
+    )
+    builder = BM25IndexBuilder()
+    builder.add_documents(movie_store.get_by_ids(["1", "2", "3"]), ["1", "2", "3"])
+    tool = make_movie_recommendation_tool(
+        movie_store, k=2, lexical_index=builder.build(), hybrid_candidates=1
+    )
+
+    message = tool.invoke(tool_call("Two friends on a summer road trip by Jodorowsky"))
+
+    assert {doc.id for doc in message.artifact} == {"2", "3"}
+
+
+def test_similar_movies_tool_uses_neighbor_graph() -> None:
+    """Test that similar movies are looked up in the graph, not searched."""
+    store = NumpyVectorStore(embedding=DeterministicFakeEmbedding(size=16))
+    store.add_documents(
+        [
+            Document(page_content="Space horror.", metadata={"title": "Alien"}, id="1"),
+            Document(page_content="Road trip.", metadata={"title": "Thelma"}, id="2"),
+            Document(page_content="More space.", metadata={"title": "Aliens"}, id="3"),
+        ]
+    )
+    graph = build_neighbor_graph(
+        store.ids, store.vectors, k=2, titles=store.metadata_values("title")
+    )
+    expected = [doc_id for doc_id, _ in graph.similar("1", 1)]
+    tool = make_similar_movies_tool(store, graph, k=1)
+
+    message = tool.invoke(
+        {
+            "type": "tool_call",
+            "id": "call-1",
+            "name": "similar_movies",
+            "args": {"title": "alien"},
+        }
+    )
+    assert [doc.id for doc in message.artifact] == expected
+    result = asyncio.run(tool.ainvoke({"title": "Jaws"}))
+    assert result.startswith("No movie titled 'Jaws' found.")